@@ -0,0 +1,325 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+from aiohttp import web
+from dashboard_data import DashboardData, ResponseCache, etag_matches, run_migrations
+from db_client import DBClient
+from log_config import setup_logging
+from profiler import Profiler, install_signal_handlers
+from config import ADMIN_TOKEN
+from option_resolver import OptionResolver
+from tradier_client import TradierClient
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+STREAM_INTERVAL = 2
+STREAM_ERROR_INTERVAL = 5
+STREAM_HEARTBEAT_INTERVAL = 15
+
+class StreamBroadcaster:
+    def __init__(self, dashboard):
+        self.dashboard = dashboard
+        self.subscribers = set()
+        self.latest_message = None
+        self.task = None
+    
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=1)
+        if self.latest_message:
+            queue.put_nowait(self.latest_message)
+        self.subscribers.add(queue)
+        
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        
+        return queue
+    
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+    
+    def _publish(self, message):
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+    
+    async def _run(self):
+        last_data_hash = None
+        
+        while self.subscribers:
+            try:
+                payload = await asyncio.to_thread(self.dashboard.get_stream_payload)
+                
+                if payload:
+                    current_hash = hash(json.dumps(payload, sort_keys=True))
+                    
+                    if current_hash != last_data_hash:
+                        self.latest_message = f"data: {json.dumps(payload)}\n\n"
+                        last_data_hash = current_hash
+                        self._publish(self.latest_message)
+                
+                await asyncio.sleep(STREAM_INTERVAL)
+            except Exception as e:
+                logger.error(f"Error in stream: {e}", exc_info=True)
+                error_payload = {
+                    'type': 'error',
+                    'message': str(e)
+                }
+                self._publish(f"data: {json.dumps(error_payload)}\n\n")
+                await asyncio.sleep(STREAM_ERROR_INTERVAL)
+        
+        self.latest_message = None
+    
+    async def close(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+CORS_ALLOW_METHODS = 'GET, POST, DELETE, OPTIONS'
+CORS_ALLOW_HEADERS = 'Content-Type, X-Admin-Token, If-None-Match'
+CORS_MAX_AGE = 600
+
+@web.middleware
+async def cors_middleware(request, handler):
+    if request.method == 'OPTIONS' and 'Access-Control-Request-Method' in request.headers:
+        # Preflight for the admin routes (custom X-Admin-Token header, POST/DELETE);
+        # answered here because no route registers an OPTIONS handler.
+        return web.Response(status=204, headers={
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': CORS_ALLOW_METHODS,
+            'Access-Control-Allow-Headers': CORS_ALLOW_HEADERS,
+            'Access-Control-Max-Age': str(CORS_MAX_AGE)
+        })
+    
+    response = await handler(request)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+def error_response(e, status=500):
+    return web.json_response({'error': str(e)}, status=status)
+
+def cached_by_data_version(handler):
+    @functools.wraps(handler)
+    async def wrapper(request):
+        dashboard = request.app['dashboard']
+        response_cache = request.app['response_cache']
+        
+        try:
+            version = await asyncio.to_thread(dashboard.get_data_version)
+        except Exception as e:
+            logger.warning(f"Could not read data version, serving uncached response: {e}")
+            return await handler(request)
+        
+        cache_key = str(request.rel_url)
+        etag = response_cache.make_etag(version, cache_key)
+        
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return web.Response(status=304, headers={'ETag': f'"{etag}"'})
+        
+        cached = response_cache.get(version, cache_key)
+        
+        if cached is not None:
+            body, content_type = cached
+            response = web.Response(body=body, content_type=content_type)
+        else:
+            response = await handler(request)
+            if response.status != 200:
+                return response
+            response_cache.put(version, cache_key, (response.body, response.content_type))
+        
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    return wrapper
+
+@cached_by_data_version
+async def get_trades(request):
+    try:
+        return web.json_response(await asyncio.to_thread(request.app['dashboard'].get_trades, request.query))
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        logger.error(f"Error fetching trades: {e}", exc_info=True)
+        return error_response(e)
+
+async def get_trade(request):
+    try:
+        trade = await asyncio.to_thread(request.app['dashboard'].get_trade, int(request.match_info['trade_id']))
+        
+        if trade is None:
+            return web.json_response({'error': 'Trade not found'}, status=404)
+        
+        return web.json_response(trade)
+    except Exception as e:
+        logger.error(f"Error fetching trade: {e}", exc_info=True)
+        return error_response(e)
+
+@cached_by_data_version
+async def get_positions(request):
+    try:
+        return web.json_response(await asyncio.to_thread(request.app['dashboard'].get_positions))
+    except Exception as e:
+        logger.error(f"Error fetching positions: {e}", exc_info=True)
+        return error_response(e)
+
+async def get_position(request):
+    try:
+        position = await asyncio.to_thread(
+            request.app['dashboard'].get_position,
+            request.match_info['ticker'],
+            float(request.match_info['strike']),
+            request.match_info['option_type']
+        )
+        
+        if position is None:
+            return web.json_response({'error': 'Position not found'}, status=404)
+        
+        return web.json_response(position)
+    except Exception as e:
+        logger.error(f"Error fetching position: {e}", exc_info=True)
+        return error_response(e)
+
+@cached_by_data_version
+async def get_stats(request):
+    try:
+        return web.json_response(await asyncio.to_thread(request.app['dashboard'].get_stats))
+    except Exception as e:
+        logger.error(f"Error fetching stats: {e}", exc_info=True)
+        return error_response(e)
+
+@cached_by_data_version
+async def get_pl_history(request):
+    try:
+        return web.json_response(await asyncio.to_thread(request.app['dashboard'].get_pl_history))
+    except Exception as e:
+        logger.error(f"Error fetching P/L history: {e}", exc_info=True)
+        return error_response(e)
+
+async def get_realized_pl(request):
+    try:
+        return web.json_response(await asyncio.to_thread(request.app['dashboard'].get_realized_pl))
+    except Exception as e:
+        logger.error(f"Error fetching realized P/L: {e}", exc_info=True)
+        return error_response(e)
+
+async def get_unrealized_pl(request):
+    try:
+        return web.json_response(await asyncio.to_thread(request.app['dashboard'].get_unrealized_pl))
+    except Exception as e:
+        logger.error(f"Error fetching unrealized P/L: {e}", exc_info=True)
+        return error_response(e)
+
+async def stream_data(request):
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    await response.prepare(request)
+    
+    broadcaster = request.app['broadcaster']
+    queue = broadcaster.subscribe()
+    
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                message = ": keep-alive\n\n"
+            await response.write(message.encode())
+    except ConnectionResetError:
+        pass
+    finally:
+        broadcaster.unsubscribe(queue)
+    
+    return response
+
+def admin_only(handler):
+    @functools.wraps(handler)
+    async def wrapper(request):
+        if not ADMIN_TOKEN:
+            return web.json_response({'error': 'Not found'}, status=404)
+        if request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+            return web.json_response({'error': 'Forbidden'}, status=403)
+        return await handler(request)
+    
+    return wrapper
+
+@admin_only
+async def start_profile(request):
+    seconds = request.query.get('seconds')
+    try:
+        return web.json_response(request.app['profiler'].start(
+            float(seconds) if seconds else None,
+            request.query.get('mode', 'cprofile'),
+            asyncio.get_running_loop().call_later
+        ))
+    except ValueError as e:
+        return error_response(e, 400)
+    except RuntimeError as e:
+        return error_response(e, 409)
+
+@admin_only
+async def stop_profile(request):
+    result = request.app['profiler'].stop()
+    
+    if result is None:
+        return web.json_response({'error': 'No profiling session running'}, status=409)
+    
+    return web.json_response(result)
+
+@admin_only
+async def memory_snapshot(request):
+    limit = int(request.query.get('limit', 25))
+    return web.json_response(await asyncio.to_thread(request.app['profiler'].memory_snapshot, limit))
+
+async def on_startup(app):
+    install_signal_handlers(app['profiler'], asyncio.get_running_loop())
+
+async def on_shutdown(app):
+    await app['broadcaster'].close()
+
+def create_app(dashboard=None):
+    if dashboard is None:
+        db_client = DBClient()
+        option_resolver = OptionResolver(TradierClient(priority="dashboard"))
+        run_migrations(db_client)
+        dashboard = DashboardData(db_client, option_resolver)
+    
+    app = web.Application(middlewares=[cors_middleware])
+    app['dashboard'] = dashboard
+    app['response_cache'] = ResponseCache()
+    app['broadcaster'] = StreamBroadcaster(dashboard)
+    app['profiler'] = Profiler("api")
+    app['profiler'].add_gauge("chain_cache_entries", lambda: len(dashboard.option_resolver.chain_cache))
+    app['profiler'].add_gauge("chain_cache_bytes", lambda: dashboard.option_resolver.chain_cache.bytes)
+    app['profiler'].add_gauge("response_cache_entries", lambda: len(app['response_cache'].entries))
+    app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
+    
+    app.router.add_get('/api/trades', get_trades)
+    app.router.add_get('/api/trades/{trade_id:\\d+}', get_trade)
+    app.router.add_get('/api/positions', get_positions)
+    app.router.add_get('/api/positions/{ticker}/{strike:\\d+\\.\\d+}/{option_type}', get_position)
+    app.router.add_get('/api/stats', get_stats)
+    app.router.add_get('/api/pl/history', get_pl_history)
+    app.router.add_get('/api/pl/realized', get_realized_pl)
+    app.router.add_get('/api/pl/unrealized', get_unrealized_pl)
+    app.router.add_get('/api/stream', stream_data)
+    app.router.add_post('/api/admin/profile', start_profile)
+    app.router.add_delete('/api/admin/profile', stop_profile)
+    app.router.add_post('/api/admin/memory', memory_snapshot)
+    
+    return app
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 4000))
+    host = os.environ.get('HOST', '0.0.0.0')
+    web.run_app(create_app(), host=host, port=port)
@@ -1,9 +1,15 @@
+import argparse
 import logging
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from db_client import DBClient
 from tradier_client import TradierClient
 from option_resolver import OptionResolver
+from position_reconciler import OCC_SYMBOL
+from price_history import DAILY_CLOSE, TimesalesCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,6 +21,8 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+MARKET_TZ = ZoneInfo("America/New_York")
+
 def extract_price_from_option_data(option_data):
     if not option_data:
         return None
@@ -34,16 +42,120 @@ def extract_price_from_option_data(option_data):
     
     return None
 
-def backfill_prices():
+def symbol_expiration(option_symbol):
+    match = OCC_SYMBOL.match(option_symbol or "")
+    if not match:
+        return None
+    return datetime.strptime(match.group(2), "%y%m%d").date()
+
+def group_by_chain(trades, option_resolver):
+    groups = defaultdict(list)
+    unresolved = []
+    today = option_resolver.clock().date()
+    
+    for trade in trades:
+        trade_id, ticker, strike, option_type, action, timestamp, option_symbol = trade
+        expiration = symbol_expiration(option_symbol)
+        if expiration is None or expiration < today:
+            # Same fallback as get_option_price: the nearest listed expiration.
+            expiration = option_resolver._find_closest_expiration(ticker)
+        if expiration is None:
+            unresolved.append(trade)
+        else:
+            groups[(ticker, expiration)].append(trade)
+    
+    return groups, unresolved
+
+def price_group(option_resolver, ticker, expiration, trades):
+    chain = option_resolver._get_option_chain(ticker, expiration, use_cache=False)
+    prices = {}
+    for trade_id, _, strike, option_type, *_ in trades:
+        option = option_resolver._find_option_in_chain(chain, float(strike), option_type, return_full_option=True)
+        price = extract_price_from_option_data(option)
+        if price:
+            prices[trade_id] = price
+    return prices
+
+def write_prices(db_client, prices, total_trades, dry_run, close_only=()):
+    failed_count = total_trades - len(prices)
+    
+    if dry_run:
+        for trade_id, price in sorted(prices.items()):
+            logger.info(f"  Would update trade ID {trade_id} with price ${price:.2f}{' (daily close)' if trade_id in close_only else ''}")
+    elif prices:
+        db_client.execute_many("UPDATE trades SET price = ? WHERE id = ? AND price IS NULL", [(price, trade_id) for trade_id, price in prices.items()])
+    
+    logger.info(f"\nBackfill {'dry run ' if dry_run else ''}completed:")
+    logger.info(f"  Total trades processed: {total_trades}")
+    logger.info(f"  {'Would update' if dry_run else 'Successfully updated'}: {len(prices)}")
+    logger.info(f"  Failed: {failed_count}")
+
+def market_time(timestamp):
+    # Trades are logged with naive local timestamps, which are taken to be
+    # market (US/Eastern) time; aware timestamps are converted.
+    when = datetime.fromisoformat(timestamp)
+    if when.tzinfo is not None:
+        when = when.astimezone(MARKET_TZ).replace(tzinfo=None)
+    return when
+
+def price_day(cache, option_symbol, day, trades):
+    prices = cache.prices_at(option_symbol, day, [when for _, when in trades])
+    return {trade_id: priced for (trade_id, _), priced in zip(trades, prices) if priced}
+
+def backfill_historical_prices(tradier_client, trades, concurrency, daily_close=False):
+    cache = TimesalesCache(tradier_client)
+    days = defaultdict(list)
+    skipped = 0
+    
+    for trade_id, ticker, strike, option_type, action, timestamp, option_symbol in trades:
+        try:
+            when = market_time(timestamp)
+        except (TypeError, ValueError):
+            when = None
+        if not option_symbol or when is None:
+            logger.warning(f"  ✗ Skipping trade ID {trade_id}: {ticker} {strike}{option_type} has no option symbol or timestamp")
+            skipped += 1
+            continue
+        days[(option_symbol, when.date())].append((trade_id, when))
+    
+    logger.info(f"Pricing {len(trades) - skipped} trades at their timestamps from {len(days)} symbol-days of timesales (cache {cache.cache_dir}, concurrency {concurrency})")
+    
+    prices = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="backfill") as executor:
+        futures = {
+            executor.submit(price_day, cache, option_symbol, day, day_trades): (option_symbol, day, len(day_trades))
+            for (option_symbol, day), day_trades in days.items()
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            option_symbol, day, count = futures[future]
+            try:
+                day_prices = future.result()
+                prices.update(day_prices)
+                logger.info(f"[{i}/{len(days)}] {option_symbol} {day}: priced {len(day_prices)} of {count} trades")
+            except Exception as e:
+                logger.error(f"[{i}/{len(days)}] ✗ Error pricing {option_symbol} {day}: {e}")
+    
+    logger.info(f"Timesales cache: {cache.hits} symbol-days read from disk, {cache.fetches} fetched from the API")
+    
+    close_only = {trade_id for trade_id, (_, source) in prices.items() if source == DAILY_CLOSE}
+    if close_only and daily_close:
+        logger.warning(f"{len(close_only)} trades are priced at their day's close, not at their timestamp (no minute bars that far back)")
+    elif close_only:
+        logger.warning(f"{len(close_only)} trades only have a daily close (no minute bars that far back) and are left unpriced; pass --daily-close to store the close")
+        prices = {trade_id: priced for trade_id, priced in prices.items() if trade_id not in close_only}
+        close_only = set()
+    return {trade_id: price for trade_id, (price, _) in prices.items()}, close_only
+
+def backfill_prices(dry_run=False, concurrency=4, historical=False, daily_close=False):
     try:
         db_client = DBClient()
-        tradier_client = TradierClient()
+        tradier_client = TradierClient(priority="backfill")
         option_resolver = OptionResolver(tradier_client)
         
         logger.info("Fetching trades with NULL prices from database...")
         
         result = db_client.execute_sync(
-            "SELECT id, ticker, strike, option_type, action, timestamp FROM trades WHERE price IS NULL ORDER BY timestamp ASC"
+            "SELECT id, ticker, strike, option_type, action, timestamp, option_symbol FROM trades WHERE price IS NULL ORDER BY timestamp ASC"
         )
         
         trades_without_prices = result.rows
@@ -55,52 +167,55 @@ def backfill_prices():
         
         logger.info(f"Found {total_trades} trades with missing prices. Starting backfill...")
         
-        updated_count = 0
-        failed_count = 0
+        if historical:
+            prices, close_only = backfill_historical_prices(tradier_client, trades_without_prices, concurrency, daily_close)
+            write_prices(db_client, prices, total_trades, dry_run, close_only)
+            return
         
-        for i, row in enumerate(trades_without_prices, 1):
-            trade_id = row[0]
-            ticker = row[1]
-            strike = float(row[2])
-            option_type = row[3]
-            action = row[4]
-            timestamp = row[5]
-            
-            logger.info(f"[{i}/{total_trades}] Processing trade ID {trade_id}: {action} {ticker} {strike}{option_type} (timestamp: {timestamp})")
-            
-            try:
-                option_data = option_resolver.get_option_price(ticker, strike, option_type)
-                
-                if option_data:
-                    price = extract_price_from_option_data(option_data)
-                    
-                    if price:
-                        db_client.execute_sync(
-                            "UPDATE trades SET price = ? WHERE id = ?",
-                            (price, trade_id)
-                        )
-                        logger.info(f"  ✓ Updated trade ID {trade_id} with price ${price:.2f}")
-                        updated_count += 1
-                    else:
-                        logger.warning(f"  ✗ Could not extract price from option data for trade ID {trade_id}")
-                        failed_count += 1
-                else:
-                    logger.warning(f"  ✗ Could not fetch option data for trade ID {trade_id}: {ticker} {strike}{option_type}")
-                    failed_count += 1
-                
-            except Exception as e:
-                logger.error(f"  ✗ Error processing trade ID {trade_id}: {e}")
-                failed_count += 1
-                continue
+        option_symbols = list({row[6] for row in trades_without_prices if row[6]})
+        quotes = option_resolver.get_quotes(option_symbols)
+        logger.info(f"Fetched quotes for {len(quotes)} of {len(option_symbols)} recorded contracts")
+        
+        prices = {}
+        remaining = []
+        for row in trades_without_prices:
+            price = extract_price_from_option_data(quotes.get(row[6]))
+            if price:
+                prices[row[0]] = price
+            else:
+                remaining.append(row)
         
-        logger.info(f"\nBackfill completed:")
-        logger.info(f"  Total trades processed: {total_trades}")
-        logger.info(f"  Successfully updated: {updated_count}")
-        logger.info(f"  Failed: {failed_count}")
+        groups, unresolved = group_by_chain(remaining, option_resolver)
+        for row in unresolved:
+            logger.warning(f"  ✗ No expiration found for trade ID {row[0]}: {row[1]} {row[2]}{row[3]}")
+        logger.info(f"Priced {len(prices)} trades from quotes; fetching {len(groups)} chains for the other {len(remaining) - len(unresolved)} trades (concurrency {concurrency})")
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="backfill") as executor:
+            futures = {
+                executor.submit(price_group, option_resolver, ticker, expiration, trades): (ticker, expiration, len(trades))
+                for (ticker, expiration), trades in groups.items()
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                ticker, expiration, count = futures[future]
+                try:
+                    group_prices = future.result()
+                    prices.update(group_prices)
+                    logger.info(f"[{i}/{len(groups)}] {ticker} {expiration}: priced {len(group_prices)} of {count} trades")
+                except Exception as e:
+                    logger.error(f"[{i}/{len(groups)}] ✗ Error pricing {ticker} {expiration}: {e}")
+        
+        write_prices(db_client, prices, total_trades, dry_run)
         
     except Exception as e:
         logger.error(f"Error during backfill: {e}", exc_info=True)
         sys.exit(1)
 
 if __name__ == "__main__":
-    backfill_prices()
+    parser = argparse.ArgumentParser(description="Fill in missing trade prices from current quotes and option chains, or historical timesales")
+    parser.add_argument("--dry-run", action="store_true", help="Report the prices that would be written without updating the database")
+    parser.add_argument("--concurrency", type=int, default=4, help="Option chains or symbol-days fetched in parallel")
+    parser.add_argument("--historical", action="store_true", help="Price each trade at its timestamp from cached timesales instead of current quotes")
+    parser.add_argument("--daily-close", action="store_true", help="With --historical, price trades older than the minute history at that day's close")
+    args = parser.parse_args()
+    
+    backfill_prices(dry_run=args.dry_run, concurrency=args.concurrency, historical=args.historical, daily_close=args.daily_close)
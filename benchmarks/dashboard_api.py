@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+ENDPOINTS = [
+    "/api/trades",
+    "/api/trades?ticker=SPY&action=SOLD",
+    "/api/trades?offset=50000&limit=100",
+    "/api/positions",
+    "/api/stats",
+    "/api/pl/history",
+    "/api/pl/realized",
+    "/api/pl/unrealized",
+]
+
+class QueryTimer:
+    def __init__(self, db_client):
+        self.total = 0.0
+        self.queries = 0
+        self.lock = threading.Lock()
+        original = db_client.execute_sync
+
+        def timed(query, params=None):
+            start = time.perf_counter()
+            try:
+                return original(query, params)
+            finally:
+                with self.lock:
+                    self.total += time.perf_counter() - start
+                    self.queries += 1
+        db_client.execute_sync = timed
+
+    def reset(self):
+        with self.lock:
+            self.total = 0.0
+            self.queries = 0
+
+def start_fake_tradier():
+    from fake_tradier import FakeTradierServer
+    
+    server = FakeTradierServer()
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="fake-tradier", daemon=True).start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    return server
+
+def start_api():
+    from werkzeug.serving import make_server
+    import app as api
+    
+    server = make_server("127.0.0.1", 0, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="api", daemon=True).start()
+    return api, f"http://127.0.0.1:{server.server_port}"
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+def fetch(session, url, timeout):
+    start = time.perf_counter()
+    try:
+        response = session.get(url, timeout=timeout)
+        return time.perf_counter() - start, response.status_code, len(response.content)
+    except requests.exceptions.Timeout:
+        return None, "timeout", 0
+
+def uncached(path, i):
+    # The API caches responses by data version and full path, so a unique
+    # parameter forces the query path on every request.
+    return f"{path}{'&' if '?' in path else '?'}_bench={i}"
+
+def measure_endpoint(session, base_url, path, timer, api, args):
+    timer.reset()
+    cold = []
+    status = None
+    size = 0
+    for i in range(args.iterations):
+        elapsed, status, size = fetch(session, base_url + uncached(path, f"{time.time_ns()}{i}"), args.timeout)
+        if elapsed is None:
+            break
+        cold.append(elapsed)
+    queries = timer.queries
+    db_ms = timer.total / max(1, len(cold)) * 1000
+    if not cold:
+        # The timed-out query is still running server-side; repeating it would
+        # only queue more work behind it.
+        return {"status": status, "bytes": 0, "queries_per_request": queries, "db_ms": None, "peak_alloc_mb": None}
+    
+    fetch(session, base_url + path, args.timeout)
+    cached = [fetch(session, base_url + path, args.timeout)[0] for _ in range(args.iterations)]
+    cached = [sample for sample in cached if sample is not None]
+    
+    # Traced in-process so the HTTP client's receive buffers don't count, after
+    # the server thread from the last request has had time to finish.
+    client = api.app.test_client()
+    time.sleep(0.2)
+    tracemalloc.start()
+    client.get(uncached(path, "traced"))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    result = {
+        "status": status,
+        "bytes": size,
+        "queries_per_request": round(queries / max(1, len(cold)), 1),
+        "db_ms": round(db_ms, 2),
+        "peak_alloc_mb": round(peak / 1e6, 2)
+    }
+    result.update(p50_ms=round(percentile(cold, 0.5) * 1000, 2), p95_ms=round(percentile(cold, 0.95) * 1000, 2))
+    if cached:
+        result["cached_p50_ms"] = round(percentile(cached, 0.5) * 1000, 2)
+    return result
+
+def measure_concurrent(base_url, path, clients, requests_per_client, timeout):
+    def worker(index):
+        session = requests.Session()
+        return [fetch(session, base_url + uncached(path, f"c{index}-{i}"), timeout)[0] for i in range(requests_per_client)]
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        samples = [sample for batch in executor.map(worker, range(clients)) for sample in batch if sample is not None]
+    elapsed = time.perf_counter() - start
+    if not samples:
+        return {"clients": clients, "requests": 0}
+    return {
+        "clients": clients,
+        "requests": len(samples),
+        "requests_per_second": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2)
+    }
+
+def measure_streams(base_url, args):
+    from benchmarks.sse_load import run
+    
+    results = asyncio.run(run(base_url + "/api/stream", args.sse_clients, args.sse_ramp, args.timeout, args.sse_hold))
+    latencies = sorted(results.pop("first_event_ms"))
+    if latencies:
+        results["first_event_p50_ms"] = round(percentile(latencies, 0.5), 1)
+        results["first_event_p95_ms"] = round(percentile(latencies, 0.95), 1)
+    results["clients"] = args.sse_clients
+    return results
+
+def trade_count(api):
+    return api.db_client.execute_sync("SELECT COUNT(*) FROM trades").rows[0][0]
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for path, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(path)
+        if not previous or "p50_ms" not in previous:
+            continue
+        if "p50_ms" not in current:
+            regressions.append(f"{path}: timed out (was {previous['p50_ms']}ms)")
+        elif current["p50_ms"] > previous["p50_ms"] * (1 + tolerance) and current["p50_ms"] - previous["p50_ms"] > 1:
+            regressions.append(f"{path}: p50 {current['p50_ms']}ms vs {previous['p50_ms']}ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard API against a local database, e.g. one built by benchmarks.synthetic_db")
+    parser.add_argument("--db", type=str, default="benchmarks/dashboard.db")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a request counts as timed out")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients for the concurrent /api/stats run (0 skips it)")
+    parser.add_argument("--sse-clients", type=int, default=50, help="Concurrent /api/stream clients (0 skips the stream run)")
+    parser.add_argument("--sse-ramp", type=float, default=2.0)
+    parser.add_argument("--sse-hold", type=float, default=10.0)
+    parser.add_argument("--json", type=str, help="Write results to this file")
+    parser.add_argument("--baseline", type=str, help="Earlier --json output to compare against; exits non-zero on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown against the baseline")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.db):
+        sys.exit(f"{args.db} not found; create it with python -m benchmarks.synthetic_db --out {args.db}")
+    
+    os.environ["TURSO_DATABASE_URL"] = os.path.abspath(args.db)
+    tradier = start_fake_tradier()
+    
+    started = time.perf_counter()
+    api, base_url = start_api()
+    logging.disable(logging.CRITICAL)
+    api.tradier_client.base_url = tradier.base_url
+    timer = QueryTimer(api.db_client)
+    session = requests.Session()
+    
+    results = {
+        "trades": trade_count(api),
+        "startup_ms": round((time.perf_counter() - started) * 1000, 1),
+        "endpoints": {}
+    }
+    print(f"{results['trades']} trades in {args.db}, API started in {results['startup_ms']} ms\n")
+    print(f"{'endpoint':<40} {'p50 ms':>9} {'p95 ms':>9} {'cached':>8} {'db ms':>9} {'queries':>8} {'alloc MB':>9} {'KB':>8}")
+    for path in ENDPOINTS:
+        endpoint = measure_endpoint(session, base_url, path, timer, api, args)
+        results["endpoints"][path] = endpoint
+        print(
+            f"{path:<40} {endpoint.get('p50_ms', 'timeout'):>9} {endpoint.get('p95_ms', '-'):>9} {endpoint.get('cached_p50_ms', '-'):>8} "
+            f"{endpoint['db_ms'] or '-':>9} {endpoint['queries_per_request']:>8} {endpoint['peak_alloc_mb'] or '-':>9} {endpoint['bytes'] / 1024:>8.1f}"
+        )
+    
+    if args.concurrency:
+        results["concurrent_stats"] = measure_concurrent(base_url, "/api/stats", args.concurrency, args.iterations, args.timeout)
+        print(f"\n/api/stats with {args.concurrency} concurrent clients: {results['concurrent_stats']}")
+    
+    if args.sse_clients:
+        results["streams"] = measure_streams(base_url, args)
+        print(f"/api/stream with {args.sse_clients} clients: {results['streams']}")
+    
+    results["max_rss_mb"] = round(rss_mb(), 1)
+    print(f"\nmax RSS: {results['max_rss_mb']} MB")
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS")
+            for regression in regressions:
+                print(f"  {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    code = main()
+    sys.stdout.flush()
+    # Queries abandoned after a timeout keep running in server threads;
+    # exit without waiting for them.
+    os._exit(code)
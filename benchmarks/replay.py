@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+
+os.makedirs("logs", exist_ok=True)
+
+from replay import ReplayEngine, load_chain_snapshots, load_messages, print_report
+
+TICKERS = ["SPY", "QQQ", "IWM", "AAPL", "TSLA", "NVDA"]
+
+def option_symbol(ticker, expiration, option_type, strike):
+    return f"{ticker}{expiration.strftime('%y%m%d')}{option_type}{int(strike * 1000):08d}"
+
+def generate(count, strikes, seed, snapshot_interval):
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 3, 9, 30)
+    expiration = (start + timedelta(days=4)).date()
+    underlying = {ticker: rng.uniform(100, 500) for ticker in TICKERS}
+    steps = max(1, count // len(TICKERS))
+    
+    snapshots = []
+    prices = {}
+    for step in range(steps + 1):
+        timestamp = start + timedelta(seconds=step * snapshot_interval)
+        for ticker in TICKERS:
+            underlying[ticker] *= 1 + rng.gauss(0, 0.001)
+            spot = underlying[ticker]
+            base = round(spot)
+            options = []
+            for offset in range(-(strikes // 4), strikes // 4):
+                strike = float(base + offset)
+                for option_type, intrinsic in (("C", max(0.0, spot - strike)), ("P", max(0.0, strike - spot))):
+                    mid = round(intrinsic + 1.5 + rng.random() * 0.2, 2)
+                    symbol = option_symbol(ticker, expiration, option_type, strike)
+                    prices[(step, symbol)] = mid
+                    options.append({
+                        "symbol": symbol,
+                        "strike": strike,
+                        "option_type": "call" if option_type == "C" else "put",
+                        "bid": round(mid - 0.05, 2),
+                        "ask": round(mid + 0.05, 2),
+                        "last": mid
+                    })
+            snapshots.append({"timestamp": timestamp.isoformat(), "symbol": ticker, "expiration": expiration.isoformat(), "options": options})
+    
+    messages = []
+    open_trades = []
+    for i in range(count):
+        step = min(steps, i // len(TICKERS))
+        timestamp = start + timedelta(seconds=step * snapshot_interval, milliseconds=i % 1000)
+        if open_trades and rng.random() < 0.45:
+            ticker, strike, option_type, contracts = open_trades.pop(rng.randrange(len(open_trades)))
+            symbol = option_symbol(ticker, expiration, option_type, strike)
+            price = prices.get((step, symbol), 1.0) - 0.05
+            content = f"SOLD {ticker} {strike:g}{option_type} ${price:.2f} [{contracts} contracts]"
+        else:
+            ticker = rng.choice(TICKERS)
+            strike = float(round(underlying[ticker]) + rng.randint(-3, 3))
+            option_type = rng.choice("CP")
+            symbol = option_symbol(ticker, expiration, option_type, strike)
+            drift = rng.choice([0.0, 0.05, -0.05, 0.1, 0.3])
+            price = prices.get((step, symbol), 1.0) + drift
+            contracts = rng.randint(1, 5)
+            content = f"BOUGHT {ticker} {strike:g}{option_type} ${price:.2f} [{contracts} contracts]"
+            open_trades.append((ticker, strike, option_type, contracts))
+        messages.append({"id": str(10**17 + i), "content": content, "timestamp": timestamp.isoformat() + "+00:00"})
+    
+    return messages, snapshots
+
+def write_jsonl(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a synthetic signal archive through the bot pipeline against a simulated broker")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--strikes", type=int, default=80, help="Contracts per chain snapshot")
+    parser.add_argument("--snapshot-interval", type=int, default=60, help="Seconds between recorded chain snapshots")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--write", type=str, help="Directory to save messages.jsonl and chains.jsonl for use with main.py --replay")
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    messages, snapshots = generate(args.messages, args.strikes, args.seed, args.snapshot_interval)
+    
+    if args.write:
+        os.makedirs(args.write, exist_ok=True)
+        write_jsonl(os.path.join(args.write, "messages.jsonl"), messages)
+        write_jsonl(os.path.join(args.write, "chains.jsonl"), snapshots)
+        messages = load_messages(os.path.join(args.write, "messages.jsonl"))
+        snapshots = load_chain_snapshots(os.path.join(args.write, "chains.jsonl"))
+    else:
+        from discord_scraper import Message
+        messages = [Message(message) for message in messages]
+    
+    engine = ReplayEngine(messages, snapshots)
+    print_report(asyncio.run(engine.run()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import logging
+import random
+import time
+from risk_engine import RiskEngine
+
+logging.basicConfig(level=logging.ERROR)
+
+class SimulatedPositionTracker:
+    def __init__(self, positions):
+        self.positions = positions
+        self.reserved = {}
+        self.listeners = []
+
+    def _get_position_key(self, ticker, strike, option_type):
+        return (ticker.upper(), float(strike), option_type.upper())
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def get_position(self, ticker, strike, option_type):
+        pos = self.positions.get(self._get_position_key(ticker, strike, option_type))
+        return pos["quantity"] if pos else 0
+
+    def reserve(self, ticker, strike, option_type, quantity):
+        key = self._get_position_key(ticker, strike, option_type)
+        self.reserved[key] = self.reserved.get(key, 0) + quantity
+
+    def release(self, ticker, strike, option_type, quantity):
+        key = self._get_position_key(ticker, strike, option_type)
+        remaining = self.reserved.get(key, 0) - quantity
+        if remaining > 0:
+            self.reserved[key] = remaining
+        else:
+            self.reserved.pop(key, None)
+
+    def get_sellable_quantity(self, ticker, strike, option_type):
+        key = self._get_position_key(ticker, strike, option_type)
+        return max(0, self.get_position(ticker, strike, option_type) - self.reserved.get(key, 0))
+
+    def update_position(self, ticker, strike, option_type, action, quantity, price=None, option_symbol=None):
+        key = self._get_position_key(ticker, strike, option_type)
+        self.positions[key]["quantity"] -= quantity
+        for callback in self.listeners:
+            callback(key, self.positions[key])
+
+class SimulatedOrderExecutor:
+    def __init__(self):
+        self.orders = 0
+
+    def execute_order(self, trade_data, option_symbol):
+        self.orders += 1
+        return {"success": True, "order_id": self.orders, "status": "ok", "actual_quantity": trade_data["contracts"]}
+
+def build_positions(count):
+    positions = {}
+    for i in range(count):
+        key = (f"T{i}", 100.0 + i, "C")
+        positions[key] = {"quantity": 1 + i % 5, "avg_entry_price": 2.0, "option_symbol": f"T{i}C"}
+    return positions
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure risk engine per-tick evaluation cost on simulated quotes")
+    parser.add_argument("--positions", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=1_000_000)
+    parser.add_argument("--trigger-rate", type=float, default=0.0001, help="Fraction of ticks that cross a stop or target")
+    args = parser.parse_args()
+    
+    tracker = SimulatedPositionTracker(build_positions(args.positions))
+    executor = SimulatedOrderExecutor()
+    engine = RiskEngine(tracker, executor, stop_loss_pct=0.5, take_profit_pct=1.0)
+    
+    rng = random.Random(42)
+    symbols = [pos["option_symbol"] for pos in tracker.positions.values()]
+    ticks = []
+    for _ in range(args.ticks):
+        price = 0.5 if rng.random() < args.trigger_rate else 1.0 + rng.random() * 2.0
+        ticks.append((rng.choice(symbols), {"bid": price, "ask": price + 0.05, "last": price}))
+    
+    on_tick = engine.on_tick
+    start = time.perf_counter()
+    for symbol, quote in ticks:
+        on_tick(symbol, quote)
+    elapsed = time.perf_counter() - start
+    
+    quotes = {symbol: {"bid": 1.5, "ask": 1.55, "last": 1.5} for symbol in symbols}
+    sweep_start = time.perf_counter()
+    engine.evaluate(quotes)
+    sweep_elapsed = time.perf_counter() - sweep_start
+    
+    print(f"positions:            {args.positions}")
+    print(f"ticks:                {args.ticks}")
+    print(f"exits triggered:      {executor.orders}")
+    print(f"ticks per second:     {args.ticks / elapsed:,.0f}")
+    print(f"mean cost per tick:   {elapsed / args.ticks * 1e6:.3f} us")
+    print(f"full sweep of {len(quotes)} positions: {sweep_elapsed * 1e6:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DISCORD_TOKEN", "benchmark")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.makedirs("logs", exist_ok=True)
+
+from discord_scraper import Message
+from fake_tradier import FakeTradierServer, FaultProfile, option_quote, spot_price, strike_step, upcoming_fridays
+from replay import MemoryDB, SimulatedBroker
+
+TICKERS = ["SPY", "QQQ", "IWM", "AAPL", "TSLA", "NVDA"]
+
+STAGES = [
+    ("parse", "parser", "parse"),
+    ("resolve", "option_resolver", "get_option_price"),
+    ("resolve", "option_resolver", "resolve_option_symbol"),
+    ("order_ack", "order_executor", "execute_order"),
+    ("log", "db_logger", "log_trade"),
+    ("position", "position_tracker", "update_position"),
+]
+
+class FakeDiscordSource:
+    def __init__(self, messages, rate, seed):
+        rng = random.Random(seed)
+        self.messages = messages
+        self.offsets = []
+        offset = 0.0
+        for _ in messages:
+            offset += rng.expovariate(rate)
+            self.offsets.append(offset)
+        self.arrivals = {}
+        self.position = 0
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def pending(self):
+        return self.position < len(self.messages)
+
+    async def get_new_messages(self):
+        elapsed = time.perf_counter() - self.started
+        if self.offsets[self.position] > elapsed:
+            await asyncio.sleep(self.offsets[self.position] - elapsed)
+            elapsed = time.perf_counter() - self.started
+        
+        due = []
+        while self.pending() and self.offsets[self.position] <= elapsed:
+            message = self.messages[self.position]
+            self.arrivals[message.id] = self.started + self.offsets[self.position]
+            due.append(message)
+            self.position += 1
+        return due
+
+    async def close(self):
+        pass
+
+class LatentDB:
+    def __init__(self, db, latency):
+        self.db = db
+        self.latency = latency
+
+    def execute_sync(self, query, params=None):
+        time.sleep(self.latency)
+        return self.db.execute_sync(query, params)
+
+    def execute_batch(self, statements):
+        time.sleep(self.latency)
+        return self.db.execute_batch(statements)
+
+def generate_signals(count, seed, prefix):
+    rng = random.Random(seed)
+    expiration = upcoming_fridays(1)[0]
+    now = datetime.now(timezone.utc)
+    held = []
+    messages = []
+    
+    for i in range(count):
+        if held and rng.random() < 0.4:
+            ticker, strike, option_type, contracts = held.pop(rng.randrange(len(held)))
+            price = option_quote(ticker, expiration, option_type, strike)["bid"]
+            content = f"SOLD {ticker} {strike:g}{option_type} ${price:.2f} [{contracts} contracts]"
+        else:
+            ticker = rng.choice(TICKERS)
+            spot = spot_price(ticker)
+            step = strike_step(spot)
+            strike = round(spot / step) * step + rng.randint(-5, 5) * step
+            option_type = rng.choice("CP")
+            contracts = rng.randint(1, 5)
+            price = option_quote(ticker, expiration, option_type, strike)["last"]
+            content = f"BOUGHT {ticker} {strike:g}{option_type} ${price:.2f} [{contracts} contracts]"
+            held.append((ticker, strike, option_type, contracts))
+        messages.append(Message({"id": f"{prefix}{i:08d}", "content": content, "timestamp": (now + timedelta(milliseconds=i)).isoformat()}))
+    
+    return messages
+
+def start_fake_server(args):
+    faults = FaultProfile(args.latency, args.error_rate, args.rate_429, args.timeout_rate, seed=args.seed)
+    server = FakeTradierServer(strikes=args.strikes, faults=faults)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="fake-tradier", daemon=True).start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    return server
+
+def build_broker(args, server):
+    if args.broker == "http":
+        from tradier_client import TradierClient
+        
+        client = TradierClient()
+        client.base_url = server.base_url
+        client.account_id = client.account_id or "VA00000000"
+        return client
+    
+    fake = FakeTradierServer(strikes=args.strikes)
+    taken = (datetime.now() - timedelta(minutes=1)).isoformat()
+    snapshots = [
+        {"timestamp": taken, "symbol": ticker, "expiration": expiration, "options": fake.chain(ticker, expiration)}
+        for ticker in TICKERS for expiration in upcoming_fridays(fake.expirations)
+    ]
+    return SimulatedBroker(snapshots)
+
+def build_db(args):
+    if args.db == "turso":
+        from db_client import DBClient
+        db = DBClient()
+    else:
+        db = MemoryDB()
+    return LatentDB(db, args.db_latency / 1000.0) if args.db_latency else db
+
+def instrument(bot, timings):
+    for stage, component, method in STAGES:
+        target = getattr(bot, component)
+        original = getattr(target, method)
+
+        def timed(*args, _original=original, _stage=stage, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                timings[_stage].append(time.perf_counter() - start)
+        setattr(target, method, timed)
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+async def run_rate(args, server, rate, index):
+    from main import TradingBot
+    
+    bot = TradingBot(tradier_client=build_broker(args, server), db_client=build_db(args), live=False)
+    bot._prepare_database()
+    if not args.cold:
+        for ticker in TICKERS:
+            bot.option_resolver.warm_up(ticker)
+    
+    source = FakeDiscordSource(generate_signals(args.messages, args.seed + index, f"{index:02d}"), rate, args.seed + index)
+    bot.scraper = source
+    timings = defaultdict(list)
+    instrument(bot, timings)
+    
+    latencies = []
+    service = []
+    outcomes = Counter()
+    source.start()
+    while source.pending():
+        for message in await bot.scraper.get_new_messages():
+            start = time.perf_counter()
+            outcomes[await bot.process_message(message)] += 1
+            done = time.perf_counter()
+            service.append(done - start)
+            latencies.append(done - source.arrivals[message.id])
+    elapsed = time.perf_counter() - source.started
+    
+    return {
+        "rate": rate,
+        "messages": len(latencies),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "latency_ms": {name: round(percentile(latencies, pct) * 1000, 2) for name, pct in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))},
+        "service_ms": {name: round(percentile(service, pct) * 1000, 2) for name, pct in (("p50", 0.5), ("p99", 0.99))},
+        "stages_ms": {stage: {"p50": round(percentile(samples, 0.5) * 1000, 3), "p99": round(percentile(samples, 0.99) * 1000, 3)} for stage, samples in timings.items()},
+        "outcomes": dict(outcomes.most_common())
+    }
+
+def print_results(results):
+    print(f"{'rate/s':>8} {'msgs':>6} {'done/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'svc p50':>8}  outcomes")
+    for result in results:
+        latency = result["latency_ms"]
+        outcomes = ", ".join(f"{outcome} {count}" for outcome, count in result["outcomes"].items())
+        print(f"{result['rate']:>8g} {result['messages']:>6} {result['throughput']:>8} {latency['p50']:>8} {latency['p90']:>8} {latency['p99']:>8} {latency['max']:>8} {result['service_ms']['p50']:>8}  {outcomes}")
+    
+    print("\nstage p50 / p99 ms at the highest rate:")
+    for stage, values in results[-1]["stages_ms"].items():
+        print(f"  {stage:<10} {values['p50']:>8} / {values['p99']}")
+
+def check_budget(results, args):
+    failures = []
+    for result in results:
+        if result["rate"] > args.budget_max_rate:
+            continue
+        latency = result["latency_ms"]
+        if args.budget_p50_ms is not None and latency["p50"] > args.budget_p50_ms:
+            failures.append(f"p50 {latency['p50']}ms > {args.budget_p50_ms}ms at {result['rate']:g}/s")
+        if args.budget_p99_ms is not None and latency["p99"] > args.budget_p99_ms:
+            failures.append(f"p99 {latency['p99']}ms > {args.budget_p99_ms}ms at {result['rate']:g}/s")
+        errors = result["outcomes"].get("error", 0) + result["outcomes"].get("order_failed", 0)
+        if errors > args.max_failed_orders:
+            failures.append(f"{errors} failed or errored signals at {result['rate']:g}/s")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure signal-to-order latency through the full bot pipeline at increasing signal rates")
+    parser.add_argument("--rates", type=str, default="5,20,50,100", help="Comma-separated signal rates per second (Poisson arrivals)")
+    parser.add_argument("--messages", type=int, default=200, help="Signals per rate")
+    parser.add_argument("--broker", choices=["sim", "http"], default="sim", help="In-process simulated broker, or the real Tradier client against fake_tradier.py")
+    parser.add_argument("--db", choices=["memory", "turso"], default="memory", help="In-memory SQLite, or DBClient with TURSO_DATABASE_URL (a scratch database or a local file)")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Milliseconds added to every database round trip")
+    parser.add_argument("--latency", type=str, default="lognormal:30:0.4", help="Fake Tradier latency for --broker http")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--strikes", type=int, default=40)
+    parser.add_argument("--cold", action="store_true", help="Skip warming the expiration and chain caches")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--budget-p50-ms", type=float, default=None)
+    parser.add_argument("--budget-p99-ms", type=float, default=None)
+    parser.add_argument("--budget-max-rate", type=float, default=float("inf"), help="Only enforce budgets at or below this rate")
+    parser.add_argument("--max-failed-orders", type=int, default=0)
+    parser.add_argument("--json", type=str, help="Write results to this file")
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    server = start_fake_server(args) if args.broker == "http" else None
+    rates = [float(rate) for rate in args.rates.split(",")]
+    results = [asyncio.run(run_rate(args, server, rate, index)) for index, rate in enumerate(rates)]
+    
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    
+    failures = check_budget(results, args)
+    if failures:
+        print("\nFAIL")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    if args.budget_p50_ms is not None or args.budget_p99_ms is not None:
+        print("\nPASS")
+
+if __name__ == "__main__":
+    main()
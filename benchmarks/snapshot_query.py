@@ -0,0 +1,86 @@
+import argparse
+import statistics
+import time
+from app import dashboard, db_client
+
+REALIZED_JOIN = """
+    FROM trades s
+    JOIN trades b ON s.ticker = b.ticker 
+        AND s.strike = b.strike 
+        AND s.option_type = b.option_type
+        AND s.action = 'SOLD'
+        AND b.action = 'BOUGHT'
+        AND s.timestamp > b.timestamp
+    WHERE s.price IS NOT NULL AND b.price IS NOT NULL
+"""
+
+SEQUENTIAL_QUERIES = [
+    "SELECT COUNT(*) FROM trades",
+    "SELECT COUNT(*) FROM trades WHERE action = 'BOUGHT'",
+    "SELECT COUNT(*) FROM trades WHERE action = 'SOLD'",
+    "SELECT SUM((s.price - b.price) * s.contracts * 100) as realized_pl" + REALIZED_JOIN,
+    "SELECT MAX(timestamp) FROM trades",
+    "SELECT ticker, strike, option_type, quantity, avg_entry_price, last_updated FROM positions WHERE quantity > 0",
+    "SELECT MAX(last_updated) FROM positions",
+    "SELECT s.ticker, s.strike, s.option_type, s.contracts, b.price, s.price, (s.price - b.price) * s.contracts * 100"
+    + REALIZED_JOIN + " ORDER BY s.timestamp DESC",
+    """
+    SELECT 
+        DATE(timestamp) as date,
+        SUM(CASE WHEN action = 'BOUGHT' THEN -price * contracts * 100 ELSE 0 END) +
+        SUM(CASE WHEN action = 'SOLD' THEN price * contracts * 100 ELSE 0 END) as daily_pl
+    FROM trades
+    WHERE price IS NOT NULL
+    GROUP BY DATE(timestamp)
+    ORDER BY date ASC
+    """,
+]
+
+def add_round_trip_latency(latency_ms):
+    # The embedded database answers in microseconds; a remote Turso database
+    # pays a network round trip per statement, which is what the snapshot saves.
+    execute_sync = db_client.execute_sync
+    
+    def delayed(query, params=None):
+        time.sleep(latency_ms / 1000)
+        return execute_sync(query, params)
+    
+    db_client.execute_sync = delayed
+
+def run_sequential():
+    for query in SEQUENTIAL_QUERIES:
+        db_client.execute_sync(query)
+
+def measure(fn, iterations):
+    fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean": statistics.mean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential dashboard queries against the single snapshot query")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated network latency added to every database round trip")
+    args = parser.parse_args()
+    
+    if args.latency_ms:
+        add_round_trip_latency(args.latency_ms)
+    
+    results = {
+        f"sequential ({len(SEQUENTIAL_QUERIES)} round trips)": measure(run_sequential, args.iterations),
+        "snapshot (1 round trip)": measure(dashboard.fetch_snapshot, args.iterations),
+    }
+    
+    for name, stats in results.items():
+        print(f"{name:<32} mean {stats['mean']:8.2f} ms  p50 {stats['p50']:8.2f} ms  p95 {stats['p95']:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
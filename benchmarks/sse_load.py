@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import statistics
+import time
+import aiohttp
+
+async def hold_stream(session, url, first_event_timeout, hold_seconds, results):
+    start = time.perf_counter()
+    try:
+        # Flask sends headers with the first event, so the wait for the response
+        # is part of the first-event timeout too.
+        response = await asyncio.wait_for(session.get(url), timeout=first_event_timeout)
+        async with response:
+            if response.status != 200:
+                results["failed"] += 1
+                return
+            results["connected"] += 1
+            await asyncio.wait_for(response.content.readuntil(b"\n\n"), timeout=first_event_timeout)
+            results["first_event_ms"].append((time.perf_counter() - start) * 1000)
+            
+            deadline = start + hold_seconds
+            while time.perf_counter() < deadline:
+                remaining = deadline - time.perf_counter()
+                try:
+                    await asyncio.wait_for(response.content.readuntil(b"\n\n"), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            results["held"] += 1
+    except asyncio.TimeoutError:
+        results["timed_out"] += 1
+    except Exception:
+        results["failed"] += 1
+
+async def run(url, clients, ramp_seconds, first_event_timeout, hold_seconds):
+    results = {"connected": 0, "held": 0, "timed_out": 0, "failed": 0, "first_event_ms": []}
+    connector = aiohttp.TCPConnector(limit=0, force_close=True)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=first_event_timeout)
+    
+    # Stream events carry the full realized P/L list, which outgrows aiohttp's
+    # default 64 KB line buffer on large trade histories.
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, read_bufsize=2**26) as session:
+        tasks = []
+        for i in range(clients):
+            tasks.append(asyncio.create_task(hold_stream(session, url, first_event_timeout, hold_seconds, results)))
+            if ramp_seconds:
+                await asyncio.sleep(ramp_seconds / clients)
+        await asyncio.gather(*tasks)
+    
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold many concurrent /api/stream connections and report how many the server sustains")
+    parser.add_argument("--url", default="http://localhost:4000/api/stream")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which to open all connections")
+    parser.add_argument("--first-event-timeout", type=float, default=10.0)
+    parser.add_argument("--hold", type=float, default=15.0, help="Seconds each client keeps its stream open")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args.url, args.clients, args.ramp, args.first_event_timeout, args.hold))
+    
+    latencies = sorted(results["first_event_ms"])
+    print(f"clients requested:     {args.clients}")
+    print(f"connected:             {results['connected']}")
+    print(f"held for {args.hold:.0f}s:          {results['held']}")
+    print(f"timed out:             {results['timed_out']}")
+    print(f"failed:                {results['failed']}")
+    if latencies:
+        print(f"first event p50:       {statistics.median(latencies):.1f} ms")
+        print(f"first event p95:       {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+os.environ.setdefault("DISCORD_TOKEN", "benchmark")
+os.environ.setdefault("WARMUP_TICKERS", "SPY,QQQ")
+os.environ.setdefault("RECONCILE_ENABLED", "false")
+os.makedirs("logs", exist_ok=True)
+
+IMPORT_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "print(time.perf_counter() - start, 'aiohttp' in sys.modules, 'libsql' in sys.modules)\n"
+)
+
+class SimulatedDB:
+    def __init__(self, latency, positions):
+        self.latency = latency
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.lock = threading.Lock()
+        self.positions = positions
+
+    def execute_sync(self, query, params=None):
+        time.sleep(self.latency)
+        with self.lock:
+            cursor = self.conn.execute(query, params or ())
+            rows = cursor.fetchall()
+            self.conn.commit()
+            if "CREATE TABLE IF NOT EXISTS positions" in query:
+                self._seed()
+
+        class Result:
+            pass
+        result = Result()
+        result.rows = rows
+        return result
+
+    def execute_batch(self, statements):
+        time.sleep(self.latency)
+        with self.lock:
+            for query, params in statements:
+                self.conn.execute(query, params or ())
+            self.conn.commit()
+
+    def _seed(self):
+        if self.conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]:
+            return
+        for i in range(self.positions):
+            self.conn.execute(
+                "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?)",
+                (["SPY", "QQQ", "IWM", "AAPL"][i % 4], 100.0 + i, "C", 1, 1.0, "2026-01-01T00:00:00")
+            )
+
+class SimulatedTradier:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def make_request(self, method, endpoint, params=None, data=None):
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+        if endpoint.endswith("/expirations"):
+            return {"expirations": {"date": ["2030-01-18"]}}
+        if endpoint.endswith("/chains"):
+            return {"options": {"option": [{"symbol": f"{params['symbol']}300118C00100000", "strike": 100.0, "option_type": "call"}]}}
+        return {}
+
+def build_bot(args):
+    from main import TradingBot
+    
+    bot = TradingBot()
+    db = SimulatedDB(args.db_latency, args.positions)
+    for component in (bot.position_tracker, bot.db_logger):
+        component.db_client = db
+    if bot.fill_tracker:
+        bot.fill_tracker.db_client = db
+    
+    tradier = SimulatedTradier(args.tradier_latency)
+    bot.tradier_client._make_request = tradier.make_request
+
+    async def connect():
+        await asyncio.sleep(args.discord_latency)
+        bot.scraper.session = None
+    bot.scraper.connect = connect
+    return bot
+
+async def sequential_startup(bot, fixed_sleep):
+    bot._prepare_database()
+    await bot.scraper.connect()
+    await asyncio.sleep(fixed_sleep)
+
+async def timed(startup):
+    start = time.perf_counter()
+    await startup
+    return time.perf_counter() - start
+
+async def run_startups(args):
+    sequential = []
+    concurrent = []
+    
+    for _ in range(args.runs):
+        sequential.append(await timed(sequential_startup(build_bot(args), args.fixed_sleep)))
+        
+        bot = build_bot(args)
+        concurrent.append(await timed(bot.initialize()))
+        await bot.shutdown()
+    
+    return sequential, concurrent
+
+def measure_import(runs):
+    samples = []
+    flags = None
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True).stdout.split()
+        samples.append(float(output[0]))
+        flags = output[1:]
+    return statistics.median(samples), flags
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bot startup time with simulated Discord, Turso and Tradier latency")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--positions", type=int, default=40)
+    parser.add_argument("--db-latency", type=float, default=0.08, help="Seconds per Turso round trip")
+    parser.add_argument("--discord-latency", type=float, default=0.25, help="Seconds for Discord authentication")
+    parser.add_argument("--tradier-latency", type=float, default=0.12, help="Seconds per Tradier request")
+    parser.add_argument("--fixed-sleep", type=float, default=2.0, help="Fixed sleep the previous startup path ended with")
+    args = parser.parse_args()
+    
+    import_time, (aiohttp_loaded, libsql_loaded) = measure_import(args.runs)
+    
+    logging.disable(logging.CRITICAL)
+    sequential, concurrent = asyncio.run(run_startups(args))
+    
+    sequential_ms = statistics.median(sequential) * 1000
+    concurrent_ms = statistics.median(concurrent) * 1000
+    
+    print(f"import main:                     {import_time * 1000:.0f} ms (aiohttp loaded: {aiohttp_loaded}, libsql loaded: {libsql_loaded})")
+    print(f"sequential startup + fixed sleep: {sequential_ms:.0f} ms")
+    print(f"sequential startup, no sleep:     {sequential_ms - args.fixed_sleep * 1000:.0f} ms")
+    print(f"concurrent startup to ready:      {concurrent_ms:.0f} ms (configured tickers warmed before ready, held tickers after)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+
+from dashboard_data import run_migrations
+from fake_tradier import option_quote, option_symbol, spot_price, strike_step, upcoming_fridays
+
+TICKERS = ["SPY", "QQQ", "IWM", "AAPL", "TSLA", "NVDA", "AMD", "META", "MSFT", "AMZN", "GOOGL", "NFLX", "SPX", "DIA", "COIN", "SMH"]
+
+INSERT_TRADE = """
+    INSERT INTO trades (timestamp, message_id, ticker, strike, option_type, action, contracts, price, option_symbol, order_id, status, account_id, order_type)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+class SQLiteDB:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+
+    def execute_sync(self, query, params=None):
+        rows = self.conn.execute(query, params or ()).fetchall()
+        self.conn.commit()
+
+        class Result:
+            pass
+        result = Result()
+        result.rows = rows
+        return result
+
+def next_friday(day):
+    return day + timedelta(days=(4 - day.weekday()) % 7)
+
+def generate_trades(rng, count, days, open_positions):
+    today = date.today()
+    spots = {ticker: spot_price(ticker) for ticker in TICKERS}
+    trading_days = sum(1 for i in range(days) if (today - timedelta(days=i + 1)).weekday() < 5)
+    per_day = max(2, -(-count // max(1, trading_days)))
+    message_id = 10**18
+    order_id = 10**7
+    produced = 0
+    
+    for day_index in range(days, 0, -1):
+        day = today - timedelta(days=day_index)
+        if day.weekday() >= 5:
+            continue
+        for ticker in TICKERS:
+            spots[ticker] *= 1 + rng.gauss(0, 0.01)
+        
+        expiration = next_friday(day).isoformat()
+        opened = day.isoformat() + "T09:30:00"
+        batch = []
+        for _ in range(per_day // 2):
+            ticker = rng.choice(TICKERS)
+            step = strike_step(spot_price(ticker))
+            strike = round(spots[ticker] / step) * step + rng.randint(-6, 6) * step
+            option_type = rng.choice("CP")
+            contracts = rng.randint(1, 10)
+            entry = round(max(0.05, rng.uniform(0.3, 6.0)), 2)
+            exit_price = round(max(0.01, entry * (1 + rng.gauss(0.02, 0.35))), 2)
+            bought_at = datetime.fromisoformat(opened) + timedelta(seconds=rng.randint(0, 19000))
+            sold_at = bought_at + timedelta(seconds=rng.randint(60, 3600))
+            symbol = option_symbol(ticker, expiration, option_type, strike)
+            for action, timestamp, price, order_type in (("BOUGHT", bought_at, entry, "market"), ("SOLD", sold_at, exit_price, "limit")):
+                message_id += 1
+                order_id += 1
+                batch.append((timestamp.isoformat(), str(message_id), ticker, strike, option_type, action, contracts, price, symbol, str(order_id), "ok", "VA00000000", order_type))
+        batch = batch[:count - produced]
+        produced += len(batch)
+        yield batch
+        if produced >= count:
+            break
+    
+    expiration = upcoming_fridays(1)[0]
+    batch = []
+    for i in range(open_positions):
+        ticker = TICKERS[i % len(TICKERS)]
+        spot = spot_price(ticker)
+        step = strike_step(spot)
+        strike = round(spot / step) * step + (i // len(TICKERS) - open_positions // len(TICKERS) // 2) * step
+        option_type = "C" if i % 2 else "P"
+        quote = option_quote(ticker, expiration, option_type, strike)
+        message_id += 1
+        order_id += 1
+        batch.append((datetime.now().isoformat(), str(message_id), ticker, strike, option_type, "BOUGHT", rng.randint(1, 10), quote["ask"], quote["symbol"], str(order_id), "ok", "VA00000000", "market"))
+    yield batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a local SQLite/libsql database with synthetic trades and positions for dashboard benchmarks")
+    parser.add_argument("--out", type=str, default="benchmarks/dashboard.db")
+    parser.add_argument("--trades", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=730, help="Calendar days of history to spread trades across")
+    parser.add_argument("--positions", type=int, default=200, help="Open positions (priced by the fake Tradier server)")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    
+    if os.path.exists(args.out):
+        os.remove(args.out)
+    
+    start = time.perf_counter()
+    db = SQLiteDB(args.out)
+    run_migrations(db)
+    db.conn.execute("PRAGMA journal_mode = WAL")
+    db.conn.execute("PRAGMA synchronous = OFF")
+    
+    rng = random.Random(args.seed)
+    total = 0
+    positions = {}
+    for batch in generate_trades(rng, args.trades, args.days, args.positions):
+        db.conn.executemany(INSERT_TRADE, batch)
+        total += len(batch)
+    for timestamp, _, ticker, strike, option_type, action, contracts, price, *_ in batch:
+        positions[(ticker, strike, option_type)] = (contracts, price, timestamp)
+    
+    db.conn.executemany(
+        "INSERT OR REPLACE INTO positions (ticker, strike, option_type, quantity, avg_entry_price, last_updated) VALUES (?, ?, ?, ?, ?, ?)",
+        [(ticker, strike, option_type, quantity, price, timestamp) for (ticker, strike, option_type), (quantity, price, timestamp) in positions.items()]
+    )
+    db.conn.commit()
+    db.conn.execute("ANALYZE")
+    db.conn.close()
+    
+    size_mb = os.path.getsize(args.out) / 1e6
+    print(f"wrote {total} trades and {len(positions)} open positions to {args.out} ({size_mb:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
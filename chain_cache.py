@@ -0,0 +1,99 @@
+import bisect
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+class CompactChain:
+    # The cache only ever serves symbol lookups, so a chain is kept as sorted
+    # strike arrays (in cents) per side plus the matching symbols, instead of
+    # Tradier's dict of ~30 fields per contract.
+    __slots__ = ("strikes", "symbols", "nbytes")
+
+    def __init__(self, options):
+        contracts = {"C": [], "P": []}
+        for option in options:
+            side = "C" if (option.get("option_type") or "").lower() == "call" else "P"
+            if option.get("symbol"):
+                contracts[side].append((int(round(float(option.get("strike") or 0) * 100)), option["symbol"]))
+        
+        self.strikes = {}
+        self.symbols = {}
+        for side, rows in contracts.items():
+            rows.sort()
+            self.strikes[side] = array("i", (strike for strike, _ in rows))
+            self.symbols[side] = tuple(symbol for _, symbol in rows)
+        self.nbytes = sum(
+            sys.getsizeof(self.strikes[side]) + sys.getsizeof(self.symbols[side]) + sum(sys.getsizeof(symbol) for symbol in self.symbols[side])
+            for side in contracts
+        )
+
+    def __len__(self):
+        return len(self.symbols["C"]) + len(self.symbols["P"])
+
+    def find(self, strike, option_type, return_full_option=False):
+        side = option_type.upper()
+        strikes = self.strikes.get(side)
+        if strikes is None:
+            return None
+        cents = int(round(strike * 100))
+        i = bisect.bisect_left(strikes, cents)
+        if i == len(strikes) or strikes[i] != cents:
+            return None
+        symbol = self.symbols[side][i]
+        if return_full_option:
+            return {"symbol": symbol, "strike": cents / 100, "option_type": "call" if side == "C" else "put"}
+        return symbol
+
+class LRUCache:
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, max_age=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or (max_age is not None and self.clock() - entry[0] >= max_age):
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self.entries[key] = (self.clock(), value, size)
+            self.bytes += size
+            while len(self.entries) > 1 and (
+                (self.max_entries and len(self.entries) > self.max_entries) or (self.max_bytes and self.bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,247 @@
+import bisect
+import logging
+import math
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+from array import array
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# One index record per snapshot: epoch seconds, offset and compressed length in
+# the .chain file, and the number of contracts.
+INDEX_RECORD = struct.Struct("<dQII")
+PRICE_FIELDS = ("bid", "ask", "last")
+
+def as_utc(when):
+    # Snapshots are stored and partitioned by UTC; naive times are taken as UTC.
+    return when.replace(tzinfo=timezone.utc) if when.tzinfo is None else when.astimezone(timezone.utc)
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+def encode_snapshot(options):
+    strikes = array("d")
+    prices = {field: array("f") for field in PRICE_FIELDS}
+    volume = array("I")
+    option_types = bytearray()
+    symbols = []
+    for option in options:
+        strikes.append(float(option.get("strike") or 0))
+        for field in PRICE_FIELDS:
+            value = option.get(field)
+            prices[field].append(float(value) if value is not None else math.nan)
+        volume.append(min(int(option.get("volume") or 0), 0xFFFFFFFF))
+        option_types.append(ord("C") if (option.get("option_type") or "").lower() == "call" else ord("P"))
+        symbols.append(option.get("symbol") or "")
+    
+    columns = [strikes.tobytes()] + [prices[field].tobytes() for field in PRICE_FIELDS]
+    columns += [volume.tobytes(), bytes(option_types), "\n".join(symbols).encode()]
+    return zlib.compress(b"".join(columns), 6)
+
+class ChainSnapshot:
+    __slots__ = ("timestamp", "ticker", "expiration", "strike", "bid", "ask", "last", "volume", "option_type", "symbols")
+
+    def __init__(self, timestamp, ticker, expiration, payload, count):
+        self.timestamp = timestamp
+        self.ticker = ticker
+        self.expiration = expiration
+        raw = memoryview(zlib.decompress(payload))
+        offset = 0
+        for name, typecode in (("strike", "d"), ("bid", "f"), ("ask", "f"), ("last", "f"), ("volume", "I")):
+            column = array(typecode)
+            column.frombytes(raw[offset:offset + count * column.itemsize])
+            offset += count * column.itemsize
+            setattr(self, name, column)
+        self.option_type = bytes(raw[offset:offset + count])
+        self.symbols = bytes(raw[offset + count:]).decode().split("\n") if count else []
+
+    def __len__(self):
+        return len(self.strike)
+
+    def options(self):
+        def price(value):
+            return None if math.isnan(value) else round(value, 4)
+        
+        return [
+            {
+                "symbol": self.symbols[i],
+                "strike": self.strike[i],
+                "option_type": "call" if self.option_type[i] == ord("C") else "put",
+                "bid": price(self.bid[i]),
+                "ask": price(self.ask[i]),
+                "last": price(self.last[i]),
+                "volume": self.volume[i]
+            }
+            for i in range(len(self.strike))
+        ]
+
+    def to_dict(self):
+        return {"timestamp": self.timestamp.isoformat(), "symbol": self.ticker, "expiration": self.expiration, "options": self.options()}
+
+class ChainSegment:
+    # One trading day of snapshots for a (ticker, expiration). Both files are
+    # memory-mapped, so looking up a snapshot reads one index page and one block.
+    def __init__(self, ticker, expiration, path):
+        self.ticker = ticker
+        self.expiration = expiration
+        with open(path + ".idx", "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = len(self.index) // INDEX_RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def timestamp(self, i):
+        return INDEX_RECORD.unpack_from(self.index, i * INDEX_RECORD.size)[0]
+
+    def snapshot(self, i):
+        timestamp, offset, length, count = INDEX_RECORD.unpack_from(self.index, i * INDEX_RECORD.size)
+        return ChainSnapshot(datetime.fromtimestamp(timestamp, timezone.utc), self.ticker, self.expiration, self.data[offset:offset + length], count)
+
+    def bisect(self, when):
+        target = as_utc(when).timestamp()
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamp(mid) <= target:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def close(self):
+        self.index.close()
+        self.data.close()
+
+class ChainArchive:
+    def __init__(self, root):
+        self.root = root
+        self.segments = {}
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            (ticker, expiration)
+            for ticker in os.listdir(self.root)
+            for expiration in os.listdir(os.path.join(self.root, ticker))
+        )
+
+    def _days(self, ticker, expiration):
+        directory = os.path.join(self.root, ticker, expiration)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".chain")] for name in os.listdir(directory) if name.endswith(".chain"))
+
+    def _segment(self, ticker, expiration, day):
+        key = (ticker, expiration, day)
+        if key not in self.segments:
+            path = os.path.join(self.root, ticker, expiration, f"{day}.chain")
+            if not os.path.getsize(path) or os.path.getsize(path + ".idx") < INDEX_RECORD.size:
+                return None
+            self.segments[key] = ChainSegment(ticker, expiration, path)
+        return self.segments[key]
+
+    def snapshots(self, ticker, expiration, start=None, end=None):
+        ticker = ticker.upper()
+        start = as_utc(start) if start else None
+        end = as_utc(end) if end else None
+        for day in self._days(ticker, expiration):
+            if (start and day < start.date().isoformat()) or (end and day > end.date().isoformat()):
+                continue
+            segment = self._segment(ticker, expiration, day)
+            if segment is None:
+                continue
+            first = segment.bisect(start) - 1 if start else 0
+            for i in range(max(first, 0), len(segment)):
+                timestamp = segment.timestamp(i)
+                if start and timestamp < start.timestamp():
+                    continue
+                if end and timestamp > end.timestamp():
+                    break
+                yield segment.snapshot(i)
+
+    def at(self, ticker, expiration, when):
+        ticker = ticker.upper()
+        when = as_utc(when)
+        days = self._days(ticker, expiration)
+        for day in reversed(days[:bisect.bisect_right(days, when.date().isoformat())]):
+            segment = self._segment(ticker, expiration, day)
+            if segment is None:
+                continue
+            i = segment.bisect(when)
+            if i:
+                return segment.snapshot(i - 1)
+        return None
+
+    def export(self):
+        for ticker, expiration in self.keys():
+            for snapshot in self.snapshots(ticker, expiration):
+                yield snapshot.to_dict()
+
+    def close(self):
+        for segment in self.segments.values():
+            segment.close()
+        self.segments.clear()
+
+class ChainRecorder:
+    # Chains are encoded and appended on a background thread so recording
+    # never adds disk I/O to the order path; if the writer falls behind,
+    # snapshots are dropped rather than queued without bound.
+    def __init__(self, root, clock=utc_now, max_pending=1000):
+        self.root = root
+        self.clock = clock
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.thread = threading.Thread(target=self._run, name="chain-recorder", daemon=True)
+        self.thread.start()
+
+    def record(self, ticker, expiration, options):
+        if not options:
+            return
+        try:
+            self.pending.put_nowait((self.clock(), ticker.upper(), str(expiration), options))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"Error recording chain snapshot for {item[1]} exp {item[2]}: {e}")
+
+    def _write(self, timestamp, ticker, expiration, options):
+        timestamp = as_utc(timestamp)
+        directory = os.path.join(self.root, ticker, expiration)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{timestamp.date().isoformat()}.chain")
+        payload = encode_snapshot(options)
+        
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(payload)
+        # The index entry is appended only after its block is on disk, so a
+        # crash can leave unreferenced bytes but never a dangling entry.
+        with open(path + ".idx", "ab") as f:
+            f.write(INDEX_RECORD.pack(timestamp.timestamp(), offset, len(payload), len(options)))
+        
+        self.recorded += 1
+        self.bytes_written += len(payload) + INDEX_RECORD.size
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+        logger.info(f"Chain recorder wrote {self.recorded} snapshots ({self.bytes_written / 1024:.0f} KB), dropped {self.dropped}")
@@ -0,0 +1,53 @@
+import logging
+import threading
+import time
+import requests
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def check(self):
+        with self.lock:
+            if self.state == "closed":
+                return
+            
+            if self.state == "open":
+                remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"Circuit open for Tradier {self.name} requests, retrying in {remaining:.0f}s")
+                self.state = "half_open"
+                self.trial_in_flight = False
+            
+            if self.trial_in_flight:
+                raise CircuitOpenError(f"Circuit half-open for Tradier {self.name} requests, trial request in flight")
+            self.trial_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            if self.state != "closed":
+                logger.info(f"Circuit closed for Tradier {self.name} requests")
+            self.state = "closed"
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                logger.warning(f"Circuit opened for Tradier {self.name} requests after {self.failures} failures, failing fast for {self.reset_timeout}s")
@@ -20,6 +20,7 @@ TURSO_AUTH_TOKEN = os.getenv("TURSO_AUTH_TOKEN", "")
 
 TRADIER_BASE_URL_PAPER = "https://sandbox.tradier.com/v1"
 TRADIER_BASE_URL_LIVE = "https://api.tradier.com/v1"
+TRADIER_BASE_URL_OVERRIDE = os.getenv("TRADIER_BASE_URL", "")
 
 def get_tradier_api_key():
     return TRADIER_PAPER_API_KEY if TRADING_MODE == "paper" else TRADIER_LIVE_API_KEY
@@ -28,5 +29,48 @@ def get_tradier_account_id():
     return TRADIER_PAPER_ACCOUNT_ID if TRADING_MODE == "paper" else TRADIER_LIVE_ACCOUNT_ID
 
 def get_tradier_base_url():
+    if TRADIER_BASE_URL_OVERRIDE:
+        return TRADIER_BASE_URL_OVERRIDE
     return TRADIER_BASE_URL_PAPER if TRADING_MODE == "paper" else TRADIER_BASE_URL_LIVE
 
+
+PRICING_DEADLINE_SECONDS = float(os.getenv("PRICING_DEADLINE_SECONDS", "3"))
+PRICING_MAX_WORKERS = int(os.getenv("PRICING_MAX_WORKERS", "8"))
+
+QUOTE_STREAM_ENABLED = os.getenv("QUOTE_STREAM_ENABLED", "false").lower() == "true"
+TRADIER_STREAM_URL = os.getenv("TRADIER_STREAM_URL", "wss://ws.tradier.com/v1/markets/events")
+QUOTE_STREAM_MAX_AGE = float(os.getenv("QUOTE_STREAM_MAX_AGE", "5"))
+
+RISK_ENGINE_ENABLED = os.getenv("RISK_ENGINE_ENABLED", "false").lower() == "true"
+RISK_STOP_LOSS_PCT = float(os.getenv("RISK_STOP_LOSS_PCT", "0"))
+RISK_TAKE_PROFIT_PCT = float(os.getenv("RISK_TAKE_PROFIT_PCT", "0"))
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STATE_FILE = os.getenv("RATE_LIMIT_STATE_FILE", "/tmp/tradier_rate_limit.json")
+
+FILL_TRACKING_ENABLED = os.getenv("FILL_TRACKING_ENABLED", "true").lower() == "true"
+FILL_POLL_INTERVAL = float(os.getenv("FILL_POLL_INTERVAL", "2"))
+
+RECONCILE_ENABLED = os.getenv("RECONCILE_ENABLED", "true").lower() == "true"
+RECONCILE_INTERVAL = float(os.getenv("RECONCILE_INTERVAL", "300"))
+
+WARMUP_TICKERS = [t.strip().upper() for t in os.getenv("WARMUP_TICKERS", "").split(",") if t.strip()]
+READY_FILE = os.getenv("READY_FILE", "")
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+PROFILE_DEFAULT_SECONDS = float(os.getenv("PROFILE_DEFAULT_SECONDS", "30"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+PRICE_HISTORY_DIR = os.getenv("PRICE_HISTORY_DIR", "cache/timesales")
+CHAIN_RECORD_DIR = os.getenv("CHAIN_RECORD_DIR", "")
+
+CHAIN_CACHE_MAX_ENTRIES = int(os.getenv("CHAIN_CACHE_MAX_ENTRIES", "256"))
+CHAIN_CACHE_MAX_BYTES = int(os.getenv("CHAIN_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+EXPIRATION_CACHE_MAX_ENTRIES = int(os.getenv("EXPIRATION_CACHE_MAX_ENTRIES", "1024"))
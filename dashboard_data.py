@@ -0,0 +1,573 @@
+import base64
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from config import PRICING_DEADLINE_SECONDS, PRICING_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+TRADE_COLUMNS = ['id', 'timestamp', 'message_id', 'ticker', 'strike', 'option_type',
+                 'action', 'contracts', 'price', 'option_symbol', 'order_id',
+                 'status', 'account_id', 'order_type']
+
+POSITION_COLUMNS = ['ticker', 'strike', 'option_type', 'quantity', 'avg_entry_price', 'last_updated']
+
+POSITION_SYMBOL_SQL = """
+    (SELECT t.option_symbol FROM trades t
+     WHERE t.ticker = positions.ticker
+         AND t.strike = positions.strike
+         AND t.option_type = positions.option_type
+         AND t.action = 'BOUGHT'
+     ORDER BY t.timestamp DESC
+     LIMIT 1)
+"""
+
+REALIZED_PL_JOIN = """
+    FROM trades s
+    JOIN trades b ON s.ticker = b.ticker
+        AND s.strike = b.strike
+        AND s.option_type = b.option_type
+        AND s.action = 'SOLD'
+        AND b.action = 'BOUGHT'
+        AND s.timestamp > b.timestamp
+    WHERE s.price IS NOT NULL AND b.price IS NOT NULL
+"""
+
+REALIZED_PL_QUERY = """
+    SELECT
+        s.ticker,
+        s.strike,
+        s.option_type,
+        s.contracts,
+        b.price as entry_price,
+        s.price as exit_price,
+        (s.price - b.price) * s.contracts * 100 as realized_pl
+""" + REALIZED_PL_JOIN + """
+    ORDER BY s.timestamp DESC
+"""
+
+PL_HISTORY_QUERY = """
+    SELECT
+        DATE(timestamp) as date,
+        SUM(CASE WHEN action = 'BOUGHT' THEN -price * contracts * 100 ELSE 0 END) +
+        SUM(CASE WHEN action = 'SOLD' THEN price * contracts * 100 ELSE 0 END) as daily_pl
+    FROM trades
+    WHERE price IS NOT NULL
+    GROUP BY DATE(timestamp)
+    ORDER BY date ASC
+"""
+
+SNAPSHOT_QUERY = """
+    SELECT json_object(
+        'stats', json((
+            SELECT json_object(
+                'total_trades', COUNT(*),
+                'bought_trades', COALESCE(SUM(CASE WHEN action = 'BOUGHT' THEN 1 ELSE 0 END), 0),
+                'sold_trades', COALESCE(SUM(CASE WHEN action = 'SOLD' THEN 1 ELSE 0 END), 0),
+                'last_trade_timestamp', MAX(timestamp)
+            )
+            FROM trades
+        )),
+        'positions', json((
+            SELECT json_group_array(json_array(ticker, strike, option_type, quantity, avg_entry_price, last_updated, """ + POSITION_SYMBOL_SQL + """))
+            FROM positions
+            WHERE quantity > 0
+        )),
+        'last_position_update', (SELECT MAX(last_updated) FROM positions),
+        'realized', json((
+            SELECT json_group_array(json_array(ticker, strike, option_type, contracts, entry_price, exit_price, realized_pl))
+            FROM (""" + REALIZED_PL_QUERY + """)
+        )),
+        'history', json((
+            SELECT json_group_array(json_array(date, daily_pl))
+            FROM (""" + PL_HISTORY_QUERY + """)
+        ))
+    )
+"""
+
+def run_migrations(db_client):
+    try:
+        create_trades_table = """
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            strike REAL NOT NULL,
+            option_type TEXT NOT NULL,
+            action TEXT NOT NULL,
+            contracts INTEGER NOT NULL,
+            price REAL,
+            option_symbol TEXT NOT NULL,
+            order_id TEXT,
+            status TEXT,
+            account_id TEXT,
+            order_type TEXT
+        )
+        """
+        
+        create_positions_table = """
+        CREATE TABLE IF NOT EXISTS positions (
+            ticker TEXT NOT NULL,
+            strike REAL NOT NULL,
+            option_type TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            avg_entry_price REAL,
+            last_updated TEXT NOT NULL,
+            PRIMARY KEY (ticker, strike, option_type)
+        )
+        """
+        
+        db_client.execute_sync(create_trades_table)
+        logger.info("Trades table created/verified")
+        
+        db_client.execute_sync(create_positions_table)
+        logger.info("Positions table created/verified")
+        
+        db_client.execute_sync(
+            "CREATE INDEX IF NOT EXISTS idx_trades_timestamp_id ON trades (timestamp, id)"
+        )
+        logger.info("Trades pagination index created/verified")
+        
+        # New trades and positions already move the data version; in-place
+        # writers (fill status, price backfills, reconciliation) bump this
+        # counter through triggers so cached responses can't outlive them.
+        db_client.execute_sync(
+            "CREATE TABLE IF NOT EXISTS data_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+        )
+        db_client.execute_sync("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+        for table in ("trades", "positions"):
+            for event in ("UPDATE", "DELETE"):
+                db_client.execute_sync(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_bumps_version AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE data_version SET version = version + 1 WHERE id = 1;
+                    END
+                """)
+        logger.info("Data version triggers created/verified")
+        
+        logger.info("Database migrations completed successfully")
+    except Exception as e:
+        logger.error(f"Error running migrations: {e}", exc_info=True)
+        raise
+
+def row_to_dict(row, columns):
+    if hasattr(row, '__iter__') and not isinstance(row, (str, bytes)):
+        return {col: row[i] if i < len(row) else None for i, col in enumerate(columns)}
+    return {col: getattr(row, col, None) for col in columns}
+
+def realized_row_to_dict(row):
+    return {
+        'ticker': row[0],
+        'strike': row[1],
+        'option_type': row[2],
+        'contracts': row[3],
+        'entry_price': row[4],
+        'exit_price': row[5],
+        'realized_pl': row[6]
+    }
+
+def build_pl_history(rows):
+    history = []
+    cumulative_pl = 0
+    
+    for row in rows:
+        date = row[0]
+        daily_pl = row[1] if row[1] else 0
+        cumulative_pl += daily_pl
+        history.append({
+            'date': date,
+            'daily_pl': daily_pl,
+            'cumulative_pl': cumulative_pl
+        })
+    
+    return history
+
+def build_trade_filters(args):
+    clauses = []
+    params = []
+    
+    ticker = args.get('ticker')
+    action = args.get('action')
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    
+    if ticker:
+        clauses.append("ticker = ?")
+        params.append(ticker.upper())
+    
+    if action:
+        clauses.append("action = ?")
+        params.append(action.upper())
+    
+    if start_date:
+        clauses.append("timestamp >= ?")
+        params.append(start_date)
+    
+    if end_date:
+        clauses.append("timestamp <= ?")
+        params.append(end_date)
+    
+    return clauses, params
+
+def where_sql(clauses):
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+def encode_cursor(timestamp, trade_id):
+    raw = json.dumps([timestamp, trade_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    timestamp, trade_id = json.loads(base64.urlsafe_b64decode(padded))
+    return str(timestamp), int(trade_id)
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate.strip('"') == etag:
+            return True
+    return False
+
+class ResponseCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.version = None
+        self.lock = threading.Lock()
+    
+    def make_etag(self, version, cache_key):
+        return hashlib.sha1(f"{version}|{cache_key}".encode()).hexdigest()
+    
+    def get(self, version, cache_key):
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+            return self.entries.get(cache_key)
+    
+    def put(self, version, cache_key, value):
+        with self.lock:
+            if version != self.version:
+                return
+            if len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[cache_key] = value
+
+class DashboardData:
+    def __init__(self, db_client, option_resolver, pricing_deadline=PRICING_DEADLINE_SECONDS, max_workers=PRICING_MAX_WORKERS):
+        self.db_client = db_client
+        self.option_resolver = option_resolver
+        self.pricing_deadline = pricing_deadline
+        self.pricing_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pricing")
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.last_prices = {}
+    
+    def get_data_version(self):
+        result = self.db_client.execute_sync("""
+            SELECT
+                (SELECT MAX(id) FROM trades),
+                (SELECT MAX(last_updated) FROM positions),
+                (SELECT COUNT(*) FROM positions),
+                (SELECT version FROM data_version WHERE id = 1)
+        """)
+        row = result.rows[0]
+        return f"{row[0]}:{row[1]}:{row[2]}:{row[3]}"
+    
+    def get_trades(self, args):
+        try:
+            limit = int(args.get('limit', 100))
+            offset = int(args.get('offset', 0))
+        except (ValueError, TypeError):
+            raise ValueError("limit and offset must be integers")
+        cursor = args.get('cursor')
+        # Counting every matching row costs far more than a page on a large
+        # table, so the total is only computed when a caller asks for it.
+        include_total = not cursor and str(args.get('include_total', 'false')).lower() == 'true'
+        
+        clauses, params = build_trade_filters(args)
+        filter_clauses, filter_params = list(clauses), list(params)
+        
+        if cursor:
+            try:
+                cursor_timestamp, cursor_id = decode_cursor(cursor)
+            except (ValueError, TypeError):
+                raise ValueError("Invalid cursor")
+            clauses.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([cursor_timestamp, cursor_timestamp, cursor_id])
+            offset = 0
+        
+        query = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades{where_sql(clauses)} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
+        
+        result = self.db_client.execute_sync(query, params)
+        
+        rows = result.rows[:limit]
+        has_more = len(result.rows) > limit
+        trades = [row_to_dict(row, TRADE_COLUMNS) for row in rows]
+        
+        total = None
+        if include_total:
+            if offset == 0 and not has_more:
+                total = len(trades)
+            else:
+                count_result = self.db_client.execute_sync(
+                    f"SELECT COUNT(*) FROM trades{where_sql(filter_clauses)}",
+                    filter_params
+                )
+                total = count_result.rows[0][0] if count_result.rows else 0
+        
+        next_cursor = None
+        if has_more and trades:
+            last_trade = trades[-1]
+            next_cursor = encode_cursor(last_trade['timestamp'], last_trade['id'])
+        
+        return {
+            'trades': trades,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'next_cursor': next_cursor
+        }
+    
+    def get_trade(self, trade_id):
+        result = self.db_client.execute_sync(
+            f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades WHERE id = ?",
+            [trade_id]
+        )
+        
+        if not result.rows:
+            return None
+        
+        return row_to_dict(result.rows[0], TRADE_COLUMNS)
+    
+    def get_positions(self):
+        result = self.db_client.execute_sync(
+            f"SELECT {', '.join(POSITION_COLUMNS)} FROM positions WHERE quantity > 0"
+        )
+        
+        return {'positions': [row_to_dict(row, POSITION_COLUMNS) for row in result.rows]}
+    
+    def get_position(self, ticker, strike, option_type):
+        result = self.db_client.execute_sync(
+            f"SELECT {', '.join(POSITION_COLUMNS)} FROM positions WHERE ticker = ? AND strike = ? AND option_type = ?",
+            [ticker.upper(), strike, option_type.upper()]
+        )
+        
+        if not result.rows:
+            return None
+        
+        return row_to_dict(result.rows[0], POSITION_COLUMNS)
+    
+    def get_stats(self):
+        counts_result = self.db_client.execute_sync("""
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(CASE WHEN action = 'BOUGHT' THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN action = 'SOLD' THEN 1 ELSE 0 END), 0)
+            FROM trades
+        """)
+        total_trades, bought_trades, sold_trades = counts_result.rows[0] if counts_result.rows else (0, 0, 0)
+        
+        realized_pl_result = self.db_client.execute_sync(
+            "SELECT SUM((s.price - b.price) * s.contracts * 100) as realized_pl" + REALIZED_PL_JOIN
+        )
+        realized_pl = realized_pl_result.rows[0][0] if realized_pl_result.rows and realized_pl_result.rows[0][0] else 0
+        
+        return {
+            'total_trades': total_trades,
+            'bought_trades': bought_trades,
+            'sold_trades': sold_trades,
+            'realized_pl': realized_pl
+        }
+    
+    def get_pl_history(self):
+        result = self.db_client.execute_sync(PL_HISTORY_QUERY)
+        return {'history': build_pl_history(result.rows)}
+    
+    def get_realized_pl(self):
+        result = self.db_client.execute_sync(REALIZED_PL_QUERY)
+        return {'realized_pl': [realized_row_to_dict(row) for row in result.rows]}
+    
+    def _current_price(self, option_data):
+        if not option_data:
+            return None
+        if option_data.get("last") and option_data.get("last") > 0:
+            return float(option_data.get("last"))
+        elif option_data.get("bid") and option_data.get("ask"):
+            return (float(option_data.get("bid", 0)) + float(option_data.get("ask", 0))) / 2.0
+        elif option_data.get("ask"):
+            return float(option_data.get("ask", 0))
+        return None
+    
+    def _price_ticker(self, ticker, contracts):
+        prices = {}
+        for (strike, option_type), option_data in self.option_resolver.get_option_prices(ticker, contracts).items():
+            current_price = self._current_price(option_data)
+            if current_price:
+                prices[(ticker, strike, option_type)] = current_price
+        self.last_prices.update(prices)
+        return prices
+    
+    def _price_symbols(self, positions):
+        quotes = self.option_resolver.get_quotes([position['option_symbol'] for position in positions])
+        
+        prices = {}
+        unmatched_by_ticker = {}
+        for position in positions:
+            key = (position['ticker'], position['strike'], position['option_type'])
+            current_price = self._current_price(quotes.get(position['option_symbol']))
+            if current_price:
+                prices[key] = current_price
+            else:
+                unmatched_by_ticker.setdefault(position['ticker'], []).append((position['strike'], position['option_type']))
+        self.last_prices.update(prices)
+        
+        for ticker, contracts in unmatched_by_ticker.items():
+            prices.update(self._price_ticker(ticker, contracts))
+        
+        return prices
+    
+    def _submit(self, key, fn, *args):
+        with self.inflight_lock:
+            future = self.inflight.get(key)
+            if future is None or future.done():
+                future = self.pricing_executor.submit(fn, *args)
+                self.inflight[key] = future
+            return future
+    
+    def price_positions(self, positions):
+        positions = [position for position in positions if position['avg_entry_price']]
+        
+        with_symbols = [position for position in positions if position.get('option_symbol')]
+        contracts_by_ticker = {}
+        for position in positions:
+            if not position.get('option_symbol'):
+                contracts_by_ticker.setdefault(position['ticker'], []).append((position['strike'], position['option_type']))
+        
+        futures = {}
+        if with_symbols:
+            symbols = tuple(sorted(position['option_symbol'] for position in with_symbols))
+            futures[self._submit(('quotes', symbols), self._price_symbols, with_symbols)] = f"{len(symbols)} quoted contracts"
+        for ticker, contracts in contracts_by_ticker.items():
+            futures[self._submit(('chain', ticker), self._price_ticker, ticker, contracts)] = ticker
+        
+        done, not_done = wait(futures, timeout=self.pricing_deadline)
+        
+        if not_done:
+            logger.warning(f"Pricing deadline of {self.pricing_deadline}s exceeded for {', '.join(futures[f] for f in not_done)}, using last known prices")
+        
+        fresh_prices = {}
+        for future in done:
+            try:
+                fresh_prices.update(future.result())
+            except Exception as e:
+                logger.warning(f"Error fetching prices for {futures[future]}: {e}")
+        
+        unrealized = []
+        
+        for position in positions:
+            ticker = position['ticker']
+            strike = position['strike']
+            option_type = position['option_type']
+            quantity = position['quantity']
+            avg_entry_price = position['avg_entry_price']
+            
+            key = (ticker, strike, option_type)
+            stale = key not in fresh_prices
+            current_price = self.last_prices.get(key) if stale else fresh_prices[key]
+            
+            if current_price:
+                unrealized_pl = (current_price - avg_entry_price) * quantity * 100
+                unrealized.append({
+                    'ticker': ticker,
+                    'strike': strike,
+                    'option_type': option_type,
+                    'quantity': quantity,
+                    'avg_entry_price': avg_entry_price,
+                    'current_price': current_price,
+                    'unrealized_pl': unrealized_pl,
+                    'stale': stale
+                })
+        
+        return unrealized
+    
+    def get_unrealized_pl(self):
+        positions_result = self.db_client.execute_sync(
+            f"SELECT ticker, strike, option_type, quantity, avg_entry_price, {POSITION_SYMBOL_SQL} FROM positions WHERE quantity > 0"
+        )
+        columns = ['ticker', 'strike', 'option_type', 'quantity', 'avg_entry_price', 'option_symbol']
+        return {'unrealized_pl': self.price_positions([row_to_dict(row, columns) for row in positions_result.rows])}
+    
+    def fetch_snapshot(self):
+        result = self.db_client.execute_sync(SNAPSHOT_QUERY)
+        return json.loads(result.rows[0][0])
+    
+    def get_all_data(self):
+        try:
+            snapshot = self.fetch_snapshot()
+            
+            stats = snapshot['stats']
+            positions = [row_to_dict(row, POSITION_COLUMNS) for row in snapshot['positions']]
+            realized_pl_data = [realized_row_to_dict(row) for row in snapshot['realized']]
+            total_realized = sum(item['realized_pl'] for item in realized_pl_data)
+            
+            unrealized_pl_data = self.price_positions(
+                [row_to_dict(row, POSITION_COLUMNS + ['option_symbol']) for row in snapshot['positions']]
+            )
+            total_unrealized = sum(item['unrealized_pl'] for item in unrealized_pl_data)
+            
+            ticker_pl = {}
+            for item in realized_pl_data:
+                ticker = item['ticker']
+                if ticker not in ticker_pl:
+                    ticker_pl[ticker] = 0
+                ticker_pl[ticker] += item['realized_pl']
+            
+            ticker_pl_data = [{'ticker': k, 'pl': v} for k, v in ticker_pl.items()]
+            
+            return {
+                'stats': {
+                    'total_trades': stats['total_trades'],
+                    'bought_trades': stats['bought_trades'],
+                    'sold_trades': stats['sold_trades'],
+                    'realized_pl': total_realized or 0
+                },
+                'pl': {
+                    'realized': total_realized,
+                    'unrealized': total_unrealized,
+                    'realized_pl': realized_pl_data,
+                    'unrealized_pl': unrealized_pl_data
+                },
+                'positions': positions,
+                'pl_history': build_pl_history(snapshot['history']),
+                'ticker_pl': ticker_pl_data,
+                'last_trade_timestamp': stats['last_trade_timestamp'],
+                'last_position_update': snapshot['last_position_update']
+            }
+        except Exception as e:
+            logger.error(f"Error fetching all data: {e}", exc_info=True)
+            return None
+    
+    def get_stream_payload(self):
+        data = self.get_all_data()
+        if not data:
+            return None
+        
+        return {
+            'type': 'update',
+            'data': {
+                'stats': data['stats'],
+                'pl': data['pl'],
+                'positions': data['positions'],
+                'pl_history': data['pl_history'],
+                'ticker_pl': data['ticker_pl']
+            }
+        }
@@ -1,12 +1,23 @@
 import os
 import logging
-import libsql
+import queue
+import threading
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+REMOTE_SCHEMES = ("libsql://", "https://", "http://", "wss://", "ws://")
+
+def is_local_file_url(database_url):
+    return not database_url.startswith(REMOTE_SCHEMES) and database_url not in (":memory:", "file::memory:")
+
 class DBClient:
     _instance = None
     _conn = None
+    _pool = None
+    _pool_conns = []
+    _lock = threading.Lock()
+    local_pool_size = 8
     
     def __new__(cls):
         if cls._instance is None:
@@ -16,27 +27,74 @@ class DBClient:
     def __init__(self):
         pass
     
+    def _database_url(self):
+        database_url = os.getenv("TURSO_DATABASE_URL")
+        if not database_url:
+            raise ValueError("TURSO_DATABASE_URL environment variable is not set")
+        return database_url
+    
     def _get_connection(self):
         if self._conn is None:
-            database_url = os.getenv("TURSO_DATABASE_URL")
-            auth_token = os.getenv("TURSO_AUTH_TOKEN")
-            
-            if not database_url:
-                raise ValueError("TURSO_DATABASE_URL environment variable is not set")
-            if not auth_token:
-                raise ValueError("TURSO_AUTH_TOKEN environment variable is not set")
+            database_url = self._database_url()
             
             try:
-                self._conn = libsql.connect(database_url, auth_token=auth_token)
-                logger.info("Successfully connected to Turso database")
+                import libsql
+                if database_url.startswith(REMOTE_SCHEMES):
+                    auth_token = os.getenv("TURSO_AUTH_TOKEN")
+                    if not auth_token:
+                        raise ValueError("TURSO_AUTH_TOKEN environment variable is not set")
+                    self._conn = libsql.connect(database_url, auth_token=auth_token)
+                    logger.info("Successfully connected to Turso database")
+                else:
+                    self._conn = libsql.connect(database_url)
+                    logger.info(f"Connected to local database {database_url}")
             except Exception as e:
                 logger.error(f"Failed to connect to Turso database: {e}")
                 raise
         
         return self._conn
     
+    def _checkout_local(self, database_url):
+        with self._lock:
+            if self._pool is None:
+                self._pool = queue.LifoQueue()
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                pass
+            
+            if len(self._pool_conns) < self.local_pool_size:
+                import libsql
+                conn = libsql.connect(database_url)
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA busy_timeout = 5000")
+                self._pool_conns.append(conn)
+                logger.info(f"Opened local database connection {len(self._pool_conns)}/{self.local_pool_size} to {database_url}")
+                return conn
+        
+        return self._pool.get()
+    
+    @contextmanager
+    def _connection(self):
+        database_url = self._database_url()
+        if not is_local_file_url(database_url):
+            yield self._get_connection()
+            return
+        
+        # Local files get a small pool of connections so WAL readers can run
+        # alongside the writer instead of queueing on one connection.
+        conn = self._checkout_local(database_url)
+        pool = self._pool
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+    
     def execute_sync(self, query, params=None):
-        conn = self._get_connection()
+        with self._connection() as conn:
+            return self._execute(conn, query, params)
+    
+    def _execute(self, conn, query, params):
         cursor = conn.cursor()
         
         try:
@@ -57,7 +115,47 @@ class DBClient:
             logger.error(f"Database query error: {e}")
             raise
     
+    def execute_batch(self, statements):
+        with self._connection() as conn:
+            self._execute_batch(conn, statements)
+    
+    def _execute_batch(self, conn, statements):
+        cursor = conn.cursor()
+        
+        try:
+            for query, params in statements:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+            
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Database batch error, rolled back {len(statements)} statements: {e}")
+            raise
+    
+    def execute_many(self, query, rows):
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.executemany(query, rows)
+                conn.commit()
+                return cursor.rowcount
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Database executemany error, rolled back {len(rows)} rows: {e}")
+                raise
+    
     def close(self):
+        with self._lock:
+            pool_conns = list(self._pool_conns)
+            self._pool_conns.clear()
+            self._pool = None
+        for conn in pool_conns:
+            conn.close()
+        
         if self._conn:
             self._conn.close()
             self._conn = None
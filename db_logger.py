@@ -6,9 +6,13 @@ from db_client import DBClient
 logger = logging.getLogger(__name__)
 
 class DBLogger:
-    def __init__(self, db_client=None, option_resolver=None):
+    def __init__(self, db_client=None, option_resolver=None, ensure_tables=True):
         self.db_client = db_client or DBClient()
         self.option_resolver = option_resolver
+        if ensure_tables:
+            self.initialize()
+    
+    def initialize(self):
         self._ensure_tables_exist()
     
     def _ensure_tables_exist(self):
@@ -35,7 +39,7 @@ class DBLogger:
             self.db_client.execute_sync(create_trades_table)
             logger.info("Trades table initialized")
         except Exception as e:
-            logger.error(f"Error creating trades table: {e}")
+            logger.error("Error creating trades table: %s", e)
             raise
     
     def _fetch_price_if_missing(self, trade_data):
@@ -53,7 +57,7 @@ class DBLogger:
             if not all([ticker, strike, option_type]):
                 return None
             
-            logger.info(f"Attempting to fetch missing price for {ticker} {strike}{option_type}")
+            logger.info("Attempting to fetch missing price for %s %s%s", ticker, strike, option_type)
             option_data = self.option_resolver.get_option_price(ticker, strike, option_type)
             
             if option_data:
@@ -72,7 +76,7 @@ class DBLogger:
             
             return None
         except Exception as e:
-            logger.warning(f"Error fetching price in DBLogger fallback: {e}")
+            logger.warning("Error fetching price in DBLogger fallback: %s", e)
             return None
     
     def log_trade(self, message_id, trade_data, option_symbol, order_result):
@@ -84,7 +88,7 @@ class DBLogger:
             if price is None:
                 price = self._fetch_price_if_missing(trade_data)
                 if price is not None:
-                    logger.info(f"Fetched price via fallback: ${price:.2f} for {trade_data.get('ticker')} {trade_data.get('strike')}{trade_data.get('option_type')}")
+                    logger.info("Fetched price via fallback: $%.2f for %s %s%s", price, trade_data.get('ticker'), trade_data.get('strike'), trade_data.get('option_type'))
             
             order_type = order_result.get("order_type", "market")
             
@@ -114,7 +118,7 @@ class DBLogger:
                 )
             )
             
-            logger.info(f"Logged trade to database: {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']} - Order ID: {order_result.get('order_id', 'N/A')}")
+            logger.info("Logged trade to database: %s %s%s - Order ID: %s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'], order_result.get('order_id', 'N/A'))
         except Exception as e:
-            logger.error(f"Error logging trade to database: {e}", exc_info=True)
+            logger.error("Error logging trade to database: %s", e, exc_info=True)
 
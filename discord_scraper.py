@@ -1,4 +1,3 @@
-import aiohttp
 import asyncio
 import logging
 import os
@@ -28,7 +27,7 @@ class Message:
             try:
                 self.timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
             except (ValueError, AttributeError) as e:
-                logger.warning(f"Failed to parse timestamp for message {self.id}: {e}")
+                logger.warning("Failed to parse timestamp for message %s: %s", self.id, e)
                 self.timestamp = None
         else:
             self.timestamp = None
@@ -45,7 +44,7 @@ class DiscordScraper:
 
     def load_processed_message_ids(self):
         if not os.path.exists(self.processed_ids_file):
-            logger.info(f"Processed messages file {self.processed_ids_file} does not exist. Starting fresh.")
+            logger.info("Processed messages file %s does not exist. Starting fresh.", self.processed_ids_file)
             return
 
         try:
@@ -57,24 +56,26 @@ class DiscordScraper:
                             msg_id = int(line)
                             self.processed_message_ids.add(msg_id)
                         except ValueError:
-                            logger.warning(f"Invalid message ID in file: {line}")
+                            logger.warning("Invalid message ID in file: %s", line)
                             continue
             
-            logger.info(f"Loaded {len(self.processed_message_ids)} processed message IDs from {self.processed_ids_file}")
+            logger.info("Loaded %s processed message IDs from %s", len(self.processed_message_ids), self.processed_ids_file)
         except Exception as e:
-            logger.error(f"Error loading processed message IDs: {e}")
+            logger.error("Error loading processed message IDs: %s", e)
 
     def save_processed_message_id(self, message_id):
         try:
             with open(self.processed_ids_file, 'a') as f:
                 f.write(f"{message_id}\n")
         except Exception as e:
-            logger.error(f"Error saving processed message ID {message_id}: {e}")
+            logger.error("Error saving processed message ID %s: %s", message_id, e)
 
     async def connect(self):
         if not self.token:
             raise ValueError("DISCORD_TOKEN not set")
         
+        import aiohttp
+        
         self.session = aiohttp.ClientSession()
         
         headers = {
@@ -91,14 +92,14 @@ class DiscordScraper:
                     logger.error("Failed to authenticate with Discord. Check your token.")
                     raise ValueError("Invalid Discord token")
                 elif response.status != 200:
-                    logger.error(f"Failed to connect to Discord: {response.status}")
+                    logger.error("Failed to connect to Discord: %s", response.status)
                     raise ConnectionError(f"Discord API returned status {response.status}")
                 
                 user_data = await response.json()
-                logger.info(f"Discord API connected as {user_data.get('username', 'Unknown')}")
-                logger.info(f"Monitoring channel ID: {self.channel_id}")
+                logger.info("Discord API connected as %s", user_data.get('username', 'Unknown'))
+                logger.info("Monitoring channel ID: %s", self.channel_id)
         except aiohttp.ClientError as e:
-            logger.error(f"Error connecting to Discord API: {e}")
+            logger.error("Error connecting to Discord API: %s", e)
             raise
 
     async def get_new_messages(self):
@@ -119,10 +120,10 @@ class DiscordScraper:
                     logger.error("Unauthorized: Invalid Discord token")
                     return []
                 elif response.status == 404:
-                    logger.error(f"Channel {self.channel_id} not found")
+                    logger.error("Channel %s not found", self.channel_id)
                     return []
                 elif response.status != 200:
-                    logger.error(f"Failed to fetch messages: {response.status}")
+                    logger.error("Failed to fetch messages: %s", response.status)
                     return []
                 
                 messages_data = await response.json()
@@ -141,19 +142,19 @@ class DiscordScraper:
                                 self.save_processed_message_id(msg.id)
                             else:
                                 filtered_count += 1
-                                logger.debug(f"Filtered message {msg.id} from {message_date} (not today)")
+                                logger.debug("Filtered message %s from %s (not today)", msg.id, message_date)
                         else:
-                            logger.warning(f"Message {msg.id} has no timestamp, skipping")
+                            logger.warning("Message %s has no timestamp, skipping", msg.id)
                 
                 if filtered_count > 0:
-                    logger.debug(f"Filtered {filtered_count} messages from previous days")
+                    logger.debug("Filtered %d messages from previous days", filtered_count)
                 
                 if messages:
-                    logger.info(f"Found {len(messages)} new messages from today")
+                    logger.info("Found %s new messages from today", len(messages))
                 
                 return messages
         except Exception as e:
-            logger.error(f"Error fetching messages: {e}")
+            logger.error("Error fetching messages: %s", e)
             return []
 
     async def close(self):
@@ -0,0 +1,424 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+import zlib
+from collections import Counter
+from datetime import date, datetime, timedelta
+from aiohttp import web
+from position_reconciler import OCC_SYMBOL
+from rate_limiter import DEFAULT_LIMITS, endpoint_group
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATHS = ("/v1/markets/events", "/v1/markets/events/session")
+TIMESALES_DAYS = 35
+
+def parse_latency(spec):
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(value) / 1000.0 for value in args.split(":") if value] if kind != "lognormal" else None
+    
+    if kind == "fixed":
+        delay = values[0] if values else 0.0
+        return lambda rng: delay
+    if kind == "uniform":
+        low, high = values
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = args.split(":")
+        mu = math.log(float(median) / 1000.0)
+        return lambda rng: rng.lognormvariate(mu, float(sigma))
+    raise ValueError(f"Unknown latency spec: {spec} (use fixed:MS, uniform:LO_MS:HI_MS or lognormal:MEDIAN_MS:SIGMA)")
+
+class FaultProfile:
+    def __init__(self, latency="fixed:0", error_rate=0.0, rate_limit_rate=0.0, timeout_rate=0.0, timeout_seconds=15.0, seed=None):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.rng = random.Random(seed)
+
+    def delay(self):
+        return max(0.0, self.latency(self.rng))
+
+    def choose(self):
+        roll = self.rng.random()
+        for fault, rate in (("timeout", self.timeout_rate), ("rate_limit", self.rate_limit_rate), ("error", self.error_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+def spot_price(symbol):
+    return 50.0 + zlib.crc32(symbol.encode()) % 450
+
+def strike_step(spot):
+    return 1.0 if spot < 300 else 5.0
+
+def upcoming_fridays(count, today=None):
+    today = today or date.today()
+    first = today + timedelta(days=(4 - today.weekday()) % 7)
+    return [(first + timedelta(weeks=i)).isoformat() for i in range(count)]
+
+def option_symbol(root, expiration, option_type, strike):
+    return f"{root}{expiration[2:4]}{expiration[5:7]}{expiration[8:10]}{option_type}{int(round(strike * 1000)):08d}"
+
+def option_quote(root, expiration, option_type, strike):
+    spot = spot_price(root)
+    days = max(1, (date.fromisoformat(expiration) - date.today()).days)
+    intrinsic = max(0.0, spot - strike) if option_type == "C" else max(0.0, strike - spot)
+    time_value = spot * 0.02 * math.sqrt(days / 7) * math.exp(-abs(strike - spot) / (spot * 0.05))
+    mid = round(intrinsic + max(0.05, time_value), 2)
+    spread = max(0.01, round(mid * 0.02, 2))
+    symbol = option_symbol(root, expiration, option_type, strike)
+    seed = zlib.crc32(symbol.encode())
+    return {
+        "symbol": symbol,
+        "description": f"{root} {expiration} {strike:g} {'Call' if option_type == 'C' else 'Put'}",
+        "type": "option",
+        "root_symbol": root,
+        "underlying": root,
+        "strike": strike,
+        "option_type": "call" if option_type == "C" else "put",
+        "expiration_date": expiration,
+        "bid": round(max(0.0, mid - spread), 2),
+        "ask": round(mid + spread, 2),
+        "last": mid,
+        "volume": seed % 5000,
+        "open_interest": (seed >> 8) % 20000
+    }
+
+def historical_price(symbol, day, minute):
+    # Deterministic random walk around today's price so replays and caches can be checked.
+    match = OCC_SYMBOL.match(symbol)
+    if match:
+        root, expiry, option_type, strike = match.groups()
+        base = option_quote(root, f"20{expiry[:2]}-{expiry[2:4]}-{expiry[4:]}", option_type, int(strike) / 1000.0)["last"]
+    else:
+        base = spot_price(symbol)
+    seed = zlib.crc32(f"{symbol}{day.isoformat()}".encode())
+    drift = math.sin(seed % 628 / 100.0 + minute / 45.0) * 0.15
+    return round(max(0.01, base * (1 + drift)), 2)
+
+def session_minutes(start, end):
+    return range(max(start, 9 * 60 + 30), min(end, 16 * 60) + 1)
+
+class FakeTradierServer:
+    def __init__(self, host="127.0.0.1", port=0, strikes=40, expirations=4, faults=None, limits=None, enforce_limits=False, fill_delay=0.0):
+        self.host = host
+        self.port = port
+        self.runner = None
+        self.sessions = set()
+        self.subscriptions = {}
+        self.strikes = strikes
+        self.expirations = expirations
+        self.faults = faults or FaultProfile()
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.enforce_limits = enforce_limits
+        self.fill_delay = fill_delay
+        self.chains = {}
+        self.orders = []
+        self.positions = {}
+        self.windows = {}
+        self.stats = Counter()
+        self.app = self._make_app()
+
+    def _make_app(self):
+        app = web.Application(middlewares=[self.fault_middleware])
+        app.router.add_post("/v1/markets/events/session", self.create_session)
+        app.router.add_get("/v1/markets/events", self.events)
+        app.router.add_get("/v1/markets/clock", self.clock)
+        app.router.add_get("/v1/markets/options/expirations", self.option_expirations)
+        app.router.add_get("/v1/markets/options/strikes", self.option_strikes)
+        app.router.add_get("/v1/markets/options/chains", self.option_chain)
+        app.router.add_route("*", "/v1/markets/quotes", self.quotes)
+        app.router.add_get("/v1/markets/timesales", self.timesales)
+        app.router.add_get("/v1/markets/history", self.history)
+        app.router.add_get("/v1/accounts/{account_id}/positions", self.get_positions)
+        app.router.add_get("/v1/accounts/{account_id}/orders", self.get_orders)
+        app.router.add_post("/v1/accounts/{account_id}/orders", self.place_order)
+        app.router.add_get("/_stats", self.get_stats)
+        return app
+
+    def _rate_limit_headers(self, group):
+        window = int(time.time() // 60)
+        count_window, used = self.windows.get(group, (window, 0))
+        used = used + 1 if count_window == window else 1
+        self.windows[group] = (window, used)
+        allowed = self.limits.get(group, DEFAULT_LIMITS["standard"])
+        headers = {
+            "X-Ratelimit-Allowed": str(allowed),
+            "X-Ratelimit-Used": str(used),
+            "X-Ratelimit-Available": str(max(0, allowed - used)),
+            "X-Ratelimit-Expiry": str((window + 1) * 60 * 1000)
+        }
+        return headers, used > allowed
+
+    @web.middleware
+    async def fault_middleware(self, request, handler):
+        if request.path in STREAM_PATHS or not request.path.startswith("/v1/"):
+            return await handler(request)
+        
+        self.stats["requests"] += 1
+        headers, over_limit = self._rate_limit_headers(endpoint_group(request.method, request.path[3:]))
+        fault = self.faults.choose()
+        await asyncio.sleep(self.faults.delay())
+        
+        if fault == "timeout":
+            self.stats["timeouts"] += 1
+            await asyncio.sleep(self.faults.timeout_seconds)
+        elif fault == "rate_limit" or (over_limit and self.enforce_limits):
+            self.stats["rate_limited"] += 1
+            headers["X-Ratelimit-Available"] = "0"
+            return web.Response(status=429, text="Rate limit exceeded", headers=headers)
+        elif fault == "error":
+            self.stats["errors"] += 1
+            return web.Response(status=503, text="Service unavailable", headers=headers)
+        
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def chain(self, root, expiration):
+        key = (root, expiration)
+        if key not in self.chains:
+            spot = spot_price(root)
+            step = strike_step(spot)
+            base = round(spot / step) * step
+            options = []
+            for i in range(-(self.strikes // 2), self.strikes - self.strikes // 2):
+                strike = base + i * step
+                if strike > 0:
+                    options.append(option_quote(root, expiration, "C", strike))
+                    options.append(option_quote(root, expiration, "P", strike))
+            self.chains[key] = options
+        return self.chains[key]
+
+    def quote(self, symbol):
+        match = OCC_SYMBOL.match(symbol)
+        if not match:
+            spot = spot_price(symbol)
+            return {"symbol": symbol, "type": "stock", "bid": round(spot - 0.01, 2), "ask": round(spot + 0.01, 2), "last": spot, "volume": zlib.crc32(symbol.encode()) % 1000000}
+        root, expiry, option_type, strike = match.groups()
+        expiration = f"20{expiry[:2]}-{expiry[2:4]}-{expiry[4:]}"
+        return option_quote(root, expiration, option_type, int(strike) / 1000.0)
+
+    async def clock(self, request):
+        return web.json_response({"clock": {"date": date.today().isoformat(), "state": "open", "timestamp": int(time.time())}})
+
+    async def option_expirations(self, request):
+        dates = upcoming_fridays(self.expirations)
+        return web.json_response({"expirations": {"date": dates}})
+
+    async def option_strikes(self, request):
+        options = self.chain(request.query["symbol"].upper(), request.query["expiration"])
+        return web.json_response({"strikes": {"strike": sorted({option["strike"] for option in options})}})
+
+    async def option_chain(self, request):
+        options = self.chain(request.query["symbol"].upper(), request.query["expiration"])
+        return web.json_response({"options": {"option": options} if options else None})
+
+    async def quotes(self, request):
+        params = await request.post() if request.method == "POST" else request.query
+        quotes = [self.quote(symbol.strip().upper()) for symbol in params.get("symbols", "").split(",") if symbol.strip()]
+        if not quotes:
+            return web.json_response({"quotes": None})
+        return web.json_response({"quotes": {"quote": quotes[0] if len(quotes) == 1 else quotes}})
+
+    async def timesales(self, request):
+        symbol = request.query["symbol"].upper()
+        start = datetime.fromisoformat(request.query["start"])
+        end = datetime.fromisoformat(request.query["end"])
+        if (date.today() - start.date()).days > TIMESALES_DAYS or start.date().weekday() >= 5:
+            return web.json_response({"series": None})
+        
+        bars = []
+        for minute in session_minutes(start.hour * 60 + start.minute, end.hour * 60 + end.minute):
+            price = historical_price(symbol, start.date(), minute)
+            bars.append({
+                "time": f"{start.date().isoformat()}T{minute // 60:02d}:{minute % 60:02d}:00",
+                "timestamp": int(datetime.combine(start.date(), datetime.min.time()).timestamp()) + minute * 60,
+                "price": price,
+                "open": price,
+                "high": price,
+                "low": price,
+                "close": price,
+                "volume": zlib.crc32(f"{symbol}{minute}".encode()) % 50,
+                "vwap": price
+            })
+        return web.json_response({"series": {"data": bars[0] if len(bars) == 1 else bars} if bars else None})
+
+    async def history(self, request):
+        symbol = request.query["symbol"].upper()
+        day = date.fromisoformat(request.query["start"])
+        days = []
+        while day <= date.fromisoformat(request.query["end"]):
+            if day.weekday() < 5:
+                close = historical_price(symbol, day, 16 * 60)
+                days.append({"date": day.isoformat(), "open": historical_price(symbol, day, 9 * 60 + 30), "high": close, "low": close, "close": close, "volume": 0})
+            day += timedelta(days=1)
+        return web.json_response({"history": {"day": days[0] if len(days) == 1 else days} if days else None})
+
+    def _settle_orders(self):
+        now = time.time()
+        for order in self.orders:
+            if order["status"] != "pending" or now - order["created_at"] < self.fill_delay:
+                continue
+            
+            quote = self.quote(order["option_symbol"])
+            buying = order["side"].startswith("buy")
+            price = quote["ask"] if buying else quote["bid"]
+            if order["type"] == "limit" and (price > order["price"] if buying else price < order["price"]):
+                continue
+            
+            order.update(status="filled", exec_quantity=order["quantity"], avg_fill_price=price, last_fill_price=price, remaining_quantity=0)
+            quantity, cost = self.positions.get(order["option_symbol"], (0, 0.0))
+            if buying:
+                self.positions[order["option_symbol"]] = (quantity + order["quantity"], cost + price * order["quantity"] * 100)
+            else:
+                sold = min(quantity, order["quantity"])
+                remaining = quantity - sold
+                self.positions[order["option_symbol"]] = (remaining, cost * remaining / quantity if quantity else 0.0)
+
+    async def get_positions(self, request):
+        self._settle_orders()
+        positions = [
+            {"symbol": symbol, "quantity": quantity, "cost_basis": round(cost, 2)}
+            for symbol, (quantity, cost) in self.positions.items() if quantity > 0
+        ]
+        return web.json_response({"positions": {"position": positions} if positions else "null"})
+
+    async def get_orders(self, request):
+        self._settle_orders()
+        orders = [{key: value for key, value in order.items() if key != "created_at"} for order in self.orders]
+        return web.json_response({"orders": {"order": orders} if orders else "null"})
+
+    async def place_order(self, request):
+        data = await request.post()
+        order = {
+            "id": len(self.orders) + 1,
+            "class": data.get("class"),
+            "symbol": data.get("symbol"),
+            "option_symbol": data.get("option_symbol", "").upper(),
+            "side": data.get("side"),
+            "quantity": int(data.get("quantity", 0)),
+            "type": data.get("type"),
+            "duration": data.get("duration"),
+            "price": float(data["price"]) if data.get("price") else None,
+            "tag": data.get("tag"),
+            "status": "pending",
+            "exec_quantity": 0,
+            "created_at": time.time()
+        }
+        self.orders.append(order)
+        self.stats["orders"] += 1
+        return web.json_response({"order": {"id": order["id"], "status": "ok"}})
+
+    async def get_stats(self, request):
+        return web.json_response(dict(self.stats, orders_open=sum(1 for order in self.orders if order["status"] == "pending")))
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def stream_url(self):
+        return f"ws://{self.host}:{self.port}/v1/markets/events"
+
+    async def create_session(self, request):
+        session_id = str(uuid.uuid4())
+        self.sessions.add(session_id)
+        return web.json_response({"stream": {"url": self.stream_url, "sessionid": session_id}})
+
+    async def events(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.subscriptions[ws] = set()
+        
+        try:
+            async for msg in ws:
+                if msg.type != web.WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                if payload.get("sessionid") not in self.sessions:
+                    await ws.send_str(json.dumps({"error": "invalid session"}))
+                    await ws.close()
+                    break
+                self.subscriptions[ws] = set(payload.get("symbols", []))
+        finally:
+            self.subscriptions.pop(ws, None)
+        
+        return ws
+
+    def subscribed_symbols(self):
+        symbols = set()
+        for subscribed in self.subscriptions.values():
+            symbols |= subscribed
+        return symbols
+
+    async def publish(self, event):
+        line = json.dumps(event) + "\n"
+        for ws, symbols in list(self.subscriptions.items()):
+            if event.get("symbol") in symbols and not ws.closed:
+                await ws.send_str(line)
+
+    async def publish_quote(self, symbol, bid, ask):
+        await self.publish({"type": "quote", "symbol": symbol, "bid": bid, "ask": ask})
+
+    async def publish_trade(self, symbol, price):
+        await self.publish({"type": "trade", "symbol": symbol, "price": str(price), "last": str(price)})
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake Tradier server listening on {self.base_url}")
+
+    async def stop(self):
+        for ws in list(self.subscriptions):
+            await ws.close()
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+async def serve(server):
+    await server.start()
+    print(f"Fake Tradier listening on {server.base_url} (stream {server.stream_url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Tradier API with synthetic chains and injectable faults")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--strikes", type=int, default=40, help="Strikes per chain (each has a call and a put)")
+    parser.add_argument("--expirations", type=int, default=4, help="Number of weekly expirations to list")
+    parser.add_argument("--latency", type=str, default="fixed:0", help="fixed:MS, uniform:LO_MS:HI_MS or lognormal:MEDIAN_MS:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that stall past the client timeout")
+    parser.add_argument("--timeout-seconds", type=float, default=15.0)
+    parser.add_argument("--enforce-limits", action="store_true", help="Answer 429 once a group's per-minute limit is used up")
+    parser.add_argument("--fill-delay", type=float, default=0.0, help="Seconds an order stays pending before it fills")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    faults = FaultProfile(args.latency, args.error_rate, args.rate_429, args.timeout_rate, args.timeout_seconds, args.seed)
+    server = FakeTradierServer(args.host, args.port, args.strikes, args.expirations, faults, enforce_limits=args.enforce_limits, fill_delay=args.fill_delay)
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
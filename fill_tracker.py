@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from config import FILL_POLL_INTERVAL
+from tradier_client import response_items
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"filled", "canceled", "rejected", "expired", "error"}
+
+class FillTracker:
+    def __init__(self, tradier_client, position_tracker, db_client, poll_interval=FILL_POLL_INTERVAL, missing_timeout=600):
+        self.client = tradier_client
+        self.position_tracker = position_tracker
+        self.db_client = db_client
+        self.poll_interval = poll_interval
+        self.missing_timeout = missing_timeout
+        self.pending = {}
+        self.listeners = []
+        self.wakeup = None
+        self.task = None
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def track(self, order_id, ticker, strike, option_type, action, quantity, option_symbol):
+        order_id = str(order_id)
+        self.pending[order_id] = {
+            "ticker": ticker,
+            "strike": strike,
+            "option_type": option_type,
+            "action": action.upper(),
+            "quantity": quantity,
+            "option_symbol": option_symbol,
+            "filled_quantity": 0,
+            "filled_value": 0.0,
+            "last_seen": time.monotonic()
+        }
+        if action.upper() == "SOLD":
+            self.position_tracker.reserve(ticker, strike, option_type, quantity)
+        
+        if self.wakeup:
+            self.wakeup.set()
+        logger.info("Tracking fills for order %s: %s %s %s", order_id, action, quantity, option_symbol)
+
+    def _apply_fill(self, order_id, entry, filled_quantity, avg_fill_price):
+        delta = filled_quantity - entry["filled_quantity"]
+        if delta <= 0:
+            return
+        
+        price = None
+        if avg_fill_price:
+            filled_value = avg_fill_price * filled_quantity
+            price = (filled_value - entry["filled_value"]) / delta
+            entry["filled_value"] = filled_value
+        entry["filled_quantity"] = filled_quantity
+        
+        if entry["action"] == "SOLD":
+            self.position_tracker.release(entry["ticker"], entry["strike"], entry["option_type"], delta)
+        
+        self.position_tracker.update_position(
+            entry["ticker"],
+            entry["strike"],
+            entry["option_type"],
+            entry["action"],
+            delta,
+            price,
+            entry["option_symbol"]
+        )
+        if price:
+            logger.info("Order %s filled %s more contracts at $%.2f", order_id, delta, price)
+        else:
+            logger.info("Order %s filled %s more contracts", order_id, delta)
+
+    def _update_trade(self, order_id, status, avg_fill_price, filled_quantity, terminal):
+        try:
+            if terminal:
+                self.db_client.execute_sync(
+                    "UPDATE trades SET status = ?, price = COALESCE(?, price), contracts = ? WHERE order_id = ?",
+                    (status, avg_fill_price, filled_quantity, order_id)
+                )
+            else:
+                self.db_client.execute_sync(
+                    "UPDATE trades SET status = ?, price = COALESCE(?, price) WHERE order_id = ?",
+                    (status, avg_fill_price, order_id)
+                )
+        except Exception as e:
+            logger.error("Error updating trade for order %s: %s", order_id, e, exc_info=True)
+
+    def apply_orders(self, orders):
+        now = time.monotonic()
+        by_id = {str(order.get("id")): order for order in orders}
+        
+        for order_id, entry in list(self.pending.items()):
+            order = by_id.get(order_id)
+            if order is None:
+                if now - entry["last_seen"] > self.missing_timeout:
+                    logger.warning("Order %s not reported by Tradier for %ss, no longer tracking", order_id, self.missing_timeout)
+                    self._finish(order_id, entry)
+                continue
+            entry["last_seen"] = now
+            
+            status = order.get("status", "unknown")
+            filled_quantity = int(float(order.get("exec_quantity") or 0))
+            avg_fill_price = float(order["avg_fill_price"]) if order.get("avg_fill_price") else None
+            terminal = status in TERMINAL_STATUSES
+            
+            if filled_quantity == entry["filled_quantity"] and not terminal and status == entry.get("status"):
+                continue
+            entry["status"] = status
+            
+            self._apply_fill(order_id, entry, filled_quantity, avg_fill_price)
+            self._update_trade(order_id, status, avg_fill_price, filled_quantity, terminal)
+            
+            if terminal:
+                if filled_quantity < entry["quantity"]:
+                    logger.warning("Order %s ended %s with %s/%s contracts filled", order_id, status, filled_quantity, entry['quantity'])
+                self._finish(order_id, entry)
+
+    def _finish(self, order_id, entry):
+        self.pending.pop(order_id, None)
+        if entry["action"] == "SOLD":
+            remaining = entry["quantity"] - entry["filled_quantity"]
+            if remaining > 0:
+                self.position_tracker.release(entry["ticker"], entry["strike"], entry["option_type"], remaining)
+        
+        for callback in self.listeners:
+            try:
+                callback(order_id, entry)
+            except Exception as e:
+                logger.error("Error in fill listener: %s", e, exc_info=True)
+
+    async def _run(self):
+        while True:
+            if not self.pending:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            
+            try:
+                response = await asyncio.to_thread(self.client.get_orders)
+                self.apply_orders(response_items(response, "orders", "order"))
+            except Exception as e:
+                logger.error("Error polling order fills: %s", e)
+            
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        if self.task is None:
+            self.wakeup = asyncio.Event()
+            if self.pending:
+                self.wakeup.set()
+            self.task = asyncio.create_task(self._run())
+            logger.info("Fill tracker started")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
@@ -20,7 +20,11 @@ const TradeHistory: React.FC = () => {
   });
   const [page, setPage] = useState(1);
   const [total, setTotal] = useState(0);
+  const [hasMore, setHasMore] = useState(false);
   const limit = 50;
+  // cursors[n] is the keyset cursor that starts page n + 1; page 1 has none.
+  const cursorsRef = useRef<(string | undefined)[]>([undefined]);
+  const totalKnownRef = useRef(false);
   const filtersRef = useRef(filters);
   const pageRef = useRef(page);
   const tradesRef = useRef(trades);
@@ -34,10 +38,14 @@ const TradeHistory: React.FC = () => {
   const fetchTrades = async () => {
     try {
       setLoading(true);
-      const params: any = {
-        limit,
-        offset: (page - 1) * limit,
-      };
+      const params: any = { limit };
+      const cursor = cursorsRef.current[page - 1];
+      if (cursor) {
+        params.cursor = cursor;
+      } else if (!totalKnownRef.current) {
+        // The total is counted once per filter set; live updates keep it current afterwards.
+        params.include_total = true;
+      }
 
       if (filters.ticker) params.ticker = filters.ticker;
       if (filters.action) params.action = filters.action;
@@ -46,7 +54,12 @@ const TradeHistory: React.FC = () => {
 
       const data = await tradesApi.getAll(params);
       setTrades(data.trades || []);
-      setTotal(data.total || 0);
+      cursorsRef.current[page] = data.next_cursor || undefined;
+      setHasMore(Boolean(data.next_cursor));
+      if (data.total !== null && data.total !== undefined) {
+        setTotal(data.total);
+        totalKnownRef.current = true;
+      }
     } catch (error) {
       console.error('Error fetching trades:', error);
     } finally {
@@ -84,6 +97,8 @@ const TradeHistory: React.FC = () => {
 
   const handleFilterChange = (field: string, value: string) => {
     setFilters(prev => ({ ...prev, [field]: value }));
+    cursorsRef.current = [undefined];
+    totalKnownRef.current = false;
     setPage(1);
   };
 
@@ -174,7 +189,7 @@ const TradeHistory: React.FC = () => {
           </Table>
         </div>
 
-        {totalPages > 1 && (
+        {(page > 1 || hasMore) && (
           <div className="flex items-center justify-center gap-4">
             <Button
               variant="outline"
@@ -183,11 +198,11 @@ const TradeHistory: React.FC = () => {
             >
               Previous
             </Button>
-            <span className="text-sm text-muted-foreground">Page {page} of {totalPages}</span>
+            <span className="text-sm text-muted-foreground">Page {page} of {Math.max(totalPages, page)}</span>
             <Button
               variant="outline"
-              onClick={() => setPage(prev => Math.min(totalPages, prev + 1))}
-              disabled={page === totalPages}
+              onClick={() => setPage(prev => prev + 1)}
+              disabled={!hasMore}
             >
               Next
             </Button>
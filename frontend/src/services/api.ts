@@ -76,6 +76,8 @@ export const tradesApi = {
     end_date?: string;
     limit?: number;
     offset?: number;
+    cursor?: string;
+    include_total?: boolean;
   }) => {
     const response = await api.get('/trades', { params });
     return response.data;
@@ -0,0 +1,35 @@
+import threading
+from collections import defaultdict, deque
+
+class LatencyTracker:
+    def __init__(self, window=100):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.lock = threading.Lock()
+
+    def record(self, key, seconds):
+        with self.lock:
+            self.samples[key].append(seconds)
+
+    def percentile(self, key, pct=0.95, min_samples=20):
+        with self.lock:
+            samples = sorted(self.samples.get(key, ()))
+        
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(pct * len(samples)))]
+
+    def snapshot(self):
+        with self.lock:
+            keys = list(self.samples)
+        
+        stats = {}
+        for key in keys:
+            p50 = self.percentile(key, 0.5, min_samples=1)
+            if p50 is None:
+                continue
+            stats[key] = {
+                "count": len(self.samples[key]),
+                "p50_ms": round(p50 * 1000, 1),
+                "p95_ms": round(self.percentile(key, 0.95, min_samples=1) * 1000, 1)
+            }
+        return stats
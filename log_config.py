@@ -0,0 +1,98 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from config import LOG_LEVEL, LOG_DIR, LOG_JSON, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        
+        return json.dumps(entry, default=str)
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, when="midnight", backup_count=LOG_BACKUP_COUNT):
+        super().__init__(filename, when=when, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() >= self.max_bytes
+
+    def rotation_filename(self, default_name):
+        if os.path.exists(default_name):
+            return f"{default_name}.{int(time.time())}"
+        return default_name
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Records stay in-process, so message formatting and traceback rendering
+        # are left to the listener thread instead of the caller.
+        return record
+
+def setup_logging(log_file=None, level=None, json_format=LOG_JSON):
+    global _listener
+    
+    if _listener is not None:
+        return _listener
+    
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [console]
+    
+    if log_file:
+        path = log_file if os.path.dirname(log_file) else os.path.join(LOG_DIR, log_file)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        file_handler = SizedTimedRotatingFileHandler(path)
+        file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(level or LOG_LEVEL)
+    
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging():
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,10 +1,15 @@
 import argparse
 import asyncio
 import logging
+import os
 import signal
 import sys
+import time
 from datetime import datetime
-from config import DISCORD_TOKEN, TRADING_MODE
+from config import (
+    DISCORD_TOKEN, TRADING_MODE, QUOTE_STREAM_ENABLED, RISK_ENGINE_ENABLED, FILL_TRACKING_ENABLED,
+    RECONCILE_ENABLED, WARMUP_TICKERS, READY_FILE, CHAIN_RECORD_DIR
+)
 from discord_scraper import DiscordScraper
 from message_parser import MessageParser
 from tradier_client import TradierClient
@@ -13,15 +18,10 @@ from order_executor import OrderExecutor
 from db_logger import DBLogger
 from position_tracker import PositionTracker
 from db_client import DBClient
+from log_config import setup_logging
+from profiler import Profiler, install_signal_handlers
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/trading_bot.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+setup_logging('trading_bot.log')
 
 logger = logging.getLogger(__name__)
 
@@ -31,51 +31,137 @@ class DebugMessage:
         self.content = content
 
 class TradingBot:
-    def __init__(self):
+    def __init__(self, tradier_client=None, db_client=None, live=True):
         self.running = False
+        self.ready = asyncio.Event()
+        self.warm_up_task = None
         self.scraper = DiscordScraper()
         self.parser = MessageParser()
-        self.tradier_client = TradierClient()
-        self.db_client = DBClient()
-        self.option_resolver = OptionResolver(self.tradier_client)
-        self.db_logger = DBLogger(self.db_client, self.option_resolver)
-        self.position_tracker = PositionTracker(self.db_client)
+        self.tradier_client = tradier_client or TradierClient()
+        self.db_client = db_client or DBClient()
+        self.position_tracker = PositionTracker(self.db_client, autoload=False)
+        self.quote_stream = None
+        if QUOTE_STREAM_ENABLED and live:
+            from quote_stream import QuoteStream
+            self.quote_stream = QuoteStream(self.tradier_client, self.position_tracker)
+        self.chain_recorder = None
+        if CHAIN_RECORD_DIR and live:
+            from chain_recorder import ChainRecorder
+            self.chain_recorder = ChainRecorder(CHAIN_RECORD_DIR)
+        self.option_resolver = OptionResolver(self.tradier_client, self.quote_stream, recorder=self.chain_recorder)
+        self.db_logger = DBLogger(self.db_client, self.option_resolver, ensure_tables=False)
         self.order_executor = OrderExecutor(self.tradier_client, self.position_tracker)
+        self.fill_tracker = None
+        if FILL_TRACKING_ENABLED and live:
+            from fill_tracker import FillTracker
+            self.fill_tracker = FillTracker(self.tradier_client, self.position_tracker, self.db_client)
+        self.reconciler = None
+        if RECONCILE_ENABLED and live:
+            from position_reconciler import PositionReconciler
+            self.reconciler = PositionReconciler(self.tradier_client, self.position_tracker, self.fill_tracker)
+        self.profiler = Profiler("bot")
+        self.profiler.add_gauge("chain_cache_entries", lambda: len(self.option_resolver.chain_cache))
+        self.profiler.add_gauge("chain_cache_bytes", lambda: self.option_resolver.chain_cache.bytes)
+        self.profiler.add_gauge("chain_cache_hits", lambda: self.option_resolver.chain_cache.hits)
+        self.profiler.add_gauge("chain_cache_misses", lambda: self.option_resolver.chain_cache.misses)
+        self.profiler.add_gauge("chain_cache_evictions", lambda: self.option_resolver.chain_cache.evictions)
+        self.profiler.add_gauge("expiration_cache_entries", lambda: len(self.option_resolver.expiration_cache))
+        self.profiler.add_gauge("positions", lambda: len(self.position_tracker.positions))
+        if self.quote_stream:
+            self.profiler.add_gauge("streamed_quotes", lambda: len(self.quote_stream.quotes))
+        if self.chain_recorder:
+            self.profiler.add_gauge("chain_snapshots_recorded", lambda: self.chain_recorder.recorded)
+            self.profiler.add_gauge("chain_snapshots_dropped", lambda: self.chain_recorder.dropped)
+        self.risk_engine = None
+        if RISK_ENGINE_ENABLED and live:
+            if self.quote_stream:
+                from risk_engine import RiskEngine
+                self.risk_engine = RiskEngine(self.position_tracker, self.order_executor, self.db_logger, fill_tracker=self.fill_tracker)
+                self.quote_stream.add_listener(self.risk_engine.on_tick)
+            else:
+                logger.warning("RISK_ENGINE_ENABLED requires QUOTE_STREAM_ENABLED; risk engine disabled")
         
     async def initialize(self):
         if not DISCORD_TOKEN:
             logger.error("DISCORD_TOKEN not set. Please set it in .env file or environment variable.")
             sys.exit(1)
         
-        logger.info(f"Starting trading bot in {TRADING_MODE} mode")
-        await self.scraper.connect()
-        await asyncio.sleep(2)
+        logger.info("Starting trading bot in %s mode", TRADING_MODE)
+        start = time.perf_counter()
+        
+        await asyncio.gather(
+            self.scraper.connect(),
+            self.load_state(),
+            self._warm_up_tradier(),
+            self._warm_up_tickers(WARMUP_TICKERS)
+        )
+        
+        self.ready.set()
+        logger.info("Bot ready in %.0fms", (time.perf_counter() - start) * 1000)
+        if READY_FILE:
+            with open(READY_FILE, 'w') as f:
+                f.write(datetime.now().isoformat())
+    
+    def _prepare_database(self):
+        self.db_logger.initialize()
+        self.position_tracker.initialize()
+    
+    async def load_state(self):
+        await asyncio.to_thread(self._prepare_database)
+        if self.risk_engine:
+            self.risk_engine.rebuild()
+        
+        if self.reconciler:
+            await self.reconciler.start()
+        if self.quote_stream:
+            await self.quote_stream.start()
+        if self.fill_tracker:
+            await self.fill_tracker.start()
+        
+        held = {key[0] for key, pos in self.position_tracker.positions.items() if pos["quantity"] > 0}
+        self.warm_up_task = asyncio.create_task(self._warm_up_tickers(held - set(WARMUP_TICKERS)))
+    
+    async def _warm_up_tickers(self, tickers):
+        if not tickers:
+            return
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.option_resolver.warm_up, ticker) for ticker in tickers),
+            return_exceptions=True
+        )
+        warmed = sum(1 for result in results if result and not isinstance(result, Exception))
+        logger.info("Warmed expirations and chains for %s/%s tickers", warmed, len(tickers))
+    
+    async def _warm_up_tradier(self):
+        try:
+            await asyncio.to_thread(self.tradier_client.warm_up)
+        except Exception as e:
+            logger.warning("Tradier warm-up failed: %s", e)
         
     async def process_message(self, message):
         try:
             content = message.content
-            logger.info(f"Processing message {message.id}: {content[:100]}")
+            logger.info("Processing message %s: %s", message.id, content[:100])
             
             trade_data = self.parser.parse(content)
             if not trade_data.get("valid"):
-                logger.warning(f"Message {message.id} did not match trading format: {content}")
-                return
+                logger.warning("Message %s did not match trading format: %s", message.id, content)
+                return "invalid"
             
             if trade_data.get("all_out"):
-                position = self.position_tracker.get_position(
+                position = self.position_tracker.get_sellable_quantity(
                     trade_data["ticker"],
                     trade_data["strike"],
                     trade_data["option_type"]
                 )
                 if position > 0:
                     trade_data["contracts"] = position
-                    logger.info(f"ALL OUT detected: Using current position of {position} contracts")
+                    logger.info("ALL OUT detected: Using current position of %s contracts", position)
                 else:
-                    logger.warning(f"ALL OUT detected but no open position for {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-                    return
+                    logger.warning("ALL OUT detected but no open position for %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
+                    return "no_position"
             
             if trade_data.get("use_fraction"):
-                position = self.position_tracker.get_position(
+                position = self.position_tracker.get_sellable_quantity(
                     trade_data["ticker"],
                     trade_data["strike"],
                     trade_data["option_type"]
@@ -84,33 +170,34 @@ class TradingBot:
                     numerator, denominator = trade_data["fraction"]
                     sold_quantity = int(position * numerator / denominator)
                     if sold_quantity <= 0:
-                        logger.warning(f"Fraction calculation resulted in 0 or negative quantity: {numerator}/{denominator} of {position}")
-                        return
+                        logger.warning("Fraction calculation resulted in 0 or negative quantity: %s/%s of %s", numerator, denominator, position)
+                        return "fraction_zero"
                     trade_data["contracts"] = sold_quantity
-                    logger.info(f"Fraction detected ({numerator}/{denominator}): Position {position}, selling {sold_quantity} contracts")
+                    logger.info("Fraction detected (%s/%s): Position %s, selling %s contracts", numerator, denominator, position, sold_quantity)
                 else:
-                    logger.warning(f"Fraction detected but no open position for {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-                    return
+                    logger.warning("Fraction detected but no open position for %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
+                    return "no_position"
             
-            logger.info(f"Parsed trade: {trade_data['action']} {trade_data['contracts']} {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
+            logger.info("Parsed trade: %s %s %s %s%s", trade_data['action'], trade_data['contracts'], trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
             
             option_symbol = None
             if trade_data["action"] == "BOUGHT" and "price" in trade_data:
                 message_price = trade_data["price"]
-                option_data = self.option_resolver.get_option_price(
+                option_data = await asyncio.to_thread(
+                    self.option_resolver.get_option_price,
                     trade_data["ticker"],
                     trade_data["strike"],
                     trade_data["option_type"]
                 )
                 
                 if not option_data:
-                    logger.error(f"Could not get option price data for {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-                    return
+                    logger.error("Could not get option price data for %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
+                    return "no_price_data"
                 
                 option_symbol = option_data.get("symbol")
                 if not option_symbol:
-                    logger.error(f"Could not extract option symbol from price data for {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-                    return
+                    logger.error("Could not extract option symbol from price data for %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
+                    return "no_symbol"
                 
                 chain_price = None
                 last_price = option_data.get("last")
@@ -124,32 +211,35 @@ class TradingBot:
                 elif ask > 0:
                     chain_price = float(ask)
                 else:
-                    logger.warning(f"Could not determine chain price for {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']} - bid: {bid}, ask: {ask}, last: {last_price}")
-                    return
+                    logger.warning("Could not determine chain price for %s %s%s - bid: %s, ask: %s, last: %s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'], bid, ask, last_price)
+                    return "no_chain_price"
                 
                 price_diff = abs(message_price - chain_price)
                 if price_diff > 0.15:
                     logger.warning(
-                        f"Price validation failed: Message price ${message_price:.2f} differs from chain price ${chain_price:.2f} "
-                        f"by ${price_diff:.2f} (max allowed: $0.15). Order rejected."
+                        "Price validation failed: Message price $%.2f differs from chain price $%.2f "
+                        "by $%.2f (max allowed: $0.15). Order rejected.",
+                        message_price, chain_price, price_diff
                     )
-                    return
+                    return "price_check_failed"
                 else:
-                    logger.info(f"Price validation passed: Message price ${message_price:.2f} vs chain price ${chain_price:.2f} (diff: ${price_diff:.2f})")
+                    logger.info("Price validation passed: Message price $%.2f vs chain price $%.2f (diff: $%.2f)", message_price, chain_price, price_diff)
             else:
-                option_symbol = self.option_resolver.resolve_option_symbol(
+                option_symbol = await asyncio.to_thread(
+                    self.option_resolver.resolve_option_symbol,
                     trade_data["ticker"],
                     trade_data["strike"],
                     trade_data["option_type"]
                 )
                 
                 if not option_symbol:
-                    logger.error(f"Could not resolve option symbol for {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-                    return
+                    logger.error("Could not resolve option symbol for %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
+                    return "unresolved_symbol"
                 
                 if trade_data["action"] == "SOLD" and "price" not in trade_data:
-                    logger.info(f"Fetching price for SOLD trade: {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-                    option_data = self.option_resolver.get_option_price(
+                    logger.info("Fetching price for SOLD trade: %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
+                    option_data = await asyncio.to_thread(
+                        self.option_resolver.get_option_price,
                         trade_data["ticker"],
                         trade_data["strike"],
                         trade_data["option_type"]
@@ -172,36 +262,53 @@ class TradingBot:
                         
                         if chain_price:
                             trade_data["price"] = chain_price
-                            logger.info(f"Fetched price for SOLD trade: ${chain_price:.2f}")
+                            logger.info("Fetched price for SOLD trade: $%.2f", chain_price)
                         else:
-                            logger.warning(f"Could not determine price for SOLD trade {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']} - bid: {bid}, ask: {ask}, last: {last_price}")
+                            logger.warning("Could not determine price for SOLD trade %s %s%s - bid: %s, ask: %s, last: %s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'], bid, ask, last_price)
                     else:
-                        logger.warning(f"Could not fetch option data for SOLD trade {trade_data['ticker']} {trade_data['strike']}{trade_data['option_type']}")
-            
-            order_result = self.order_executor.execute_order(trade_data, option_symbol)
+                        logger.warning("Could not fetch option data for SOLD trade %s %s%s", trade_data['ticker'], trade_data['strike'], trade_data['option_type'])
             
-            if order_result.get("success"):
-                actual_quantity = order_result.get("actual_quantity", trade_data["contracts"])
-                trade_data_for_log = trade_data.copy()
-                if actual_quantity != trade_data["contracts"]:
-                    trade_data_for_log["contracts"] = actual_quantity
+            async with self.order_executor.lock:
+                order_result = await asyncio.to_thread(self.order_executor.execute_order, trade_data, option_symbol)
                 
-                self.db_logger.log_trade(message.id, trade_data_for_log, option_symbol, order_result)
-                
-                price = trade_data_for_log.get("price")
-                self.position_tracker.update_position(
-                    trade_data["ticker"],
-                    trade_data["strike"],
-                    trade_data["option_type"],
-                    trade_data["action"],
-                    actual_quantity,
-                    price
-                )
-            else:
-                logger.error(f"Order failed: {order_result.get('error', 'Unknown error')}")
+                if order_result.get("success"):
+                    actual_quantity = order_result.get("actual_quantity", trade_data["contracts"])
+                    trade_data_for_log = trade_data.copy()
+                    if actual_quantity != trade_data["contracts"]:
+                        trade_data_for_log["contracts"] = actual_quantity
+                    
+                    self.db_logger.log_trade(message.id, trade_data_for_log, option_symbol, order_result)
+                    
+                    order_id = order_result.get("order_id")
+                    if self.fill_tracker and order_id not in (None, "unknown"):
+                        self.fill_tracker.track(
+                            order_id,
+                            trade_data["ticker"],
+                            trade_data["strike"],
+                            trade_data["option_type"],
+                            trade_data["action"],
+                            actual_quantity,
+                            option_symbol
+                        )
+                    else:
+                        price = trade_data_for_log.get("price")
+                        self.position_tracker.update_position(
+                            trade_data["ticker"],
+                            trade_data["strike"],
+                            trade_data["option_type"],
+                            trade_data["action"],
+                            actual_quantity,
+                            price,
+                            option_symbol
+                        )
+                    return "executed"
+                else:
+                    logger.error("Order failed: %s", order_result.get('error', 'Unknown error'))
+                    return "order_failed"
                 
         except Exception as e:
-            logger.error(f"Error processing message {message.id}: {e}", exc_info=True)
+            logger.error("Error processing message %s: %s", message.id, e, exc_info=True)
+            return "error"
 
     async def run(self):
         self.running = True
@@ -218,11 +325,11 @@ class TradingBot:
                 logger.info("Received interrupt signal")
                 break
             except Exception as e:
-                logger.error(f"Error in main loop: {e}", exc_info=True)
+                logger.error("Error in main loop: %s", e, exc_info=True)
                 await asyncio.sleep(1)
 
     async def process_debug_text(self, text):
-        logger.info(f"Debug mode: Processing text: {text}")
+        logger.info("Debug mode: Processing text: %s", text)
         debug_message = DebugMessage(text)
         await self.process_message(debug_message)
         logger.info("Debug mode: Processing complete")
@@ -230,8 +337,20 @@ class TradingBot:
     async def shutdown(self):
         logger.info("Shutting down bot...")
         self.running = False
+        if READY_FILE and os.path.exists(READY_FILE):
+            os.remove(READY_FILE)
+        if self.quote_stream:
+            await self.quote_stream.stop()
+        if self.fill_tracker:
+            await self.fill_tracker.stop()
+        if self.reconciler:
+            await self.reconciler.stop()
+        if self.warm_up_task and not self.warm_up_task.done():
+            self.warm_up_task.cancel()
         if self.scraper.session:
             await self.scraper.close()
+        if self.chain_recorder:
+            await asyncio.to_thread(self.chain_recorder.close)
 
 def signal_handler(signum, frame):
     logger.info("Signal received, shutting down...")
@@ -244,27 +363,54 @@ async def main():
         type=str,
         help="Debug mode: Parse the provided text instead of scraping Discord messages"
     )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        help="Replay mode: Feed recorded Discord messages (JSONL) through the pipeline against a simulated broker"
+    )
+    parser.add_argument(
+        "--chains",
+        type=str,
+        help="Recorded option chain snapshots (JSONL) the simulated broker serves during --replay"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Keep INFO logging during --replay"
+    )
     args = parser.parse_args()
     
+    if args.replay:
+        if not args.chains:
+            parser.error("--replay requires --chains")
+        from replay import ReplayEngine, load_chain_snapshots, load_messages, print_report
+        if not args.verbose:
+            logging.getLogger().setLevel(logging.CRITICAL)
+        engine = ReplayEngine(load_messages(args.replay), load_chain_snapshots(args.chains))
+        print_report(await engine.run())
+        return
+    
     bot = TradingBot()
     
     if args.debug:
         logger.info("Running in DEBUG mode")
         try:
+            await asyncio.to_thread(bot._prepare_database)
             await bot.process_debug_text(args.debug)
             logger.info("Debug mode finished successfully")
         except Exception as e:
-            logger.error(f"Fatal error in debug mode: {e}", exc_info=True)
+            logger.error("Fatal error in debug mode: %s", e, exc_info=True)
             sys.exit(1)
     else:
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
+        install_signal_handlers(bot.profiler, asyncio.get_running_loop())
         
         try:
             await bot.initialize()
             await bot.run()
         except Exception as e:
-            logger.error(f"Fatal error: {e}", exc_info=True)
+            logger.error("Fatal error: %s", e, exc_info=True)
         finally:
             await bot.shutdown()
 
@@ -172,6 +172,6 @@ class MessageParser:
                 "valid": True
             }
         
-        logger.debug(f"Message did not match any pattern: {message_content[:100]}")
+        logger.debug("Message did not match any pattern: %.100s", message_content)
         return {"valid": False}
 
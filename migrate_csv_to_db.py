@@ -1,6 +1,9 @@
+import argparse
 import csv
+import json
 import os
 import sys
+import time
 import logging
 from db_client import DBClient
 from db_logger import DBLogger
@@ -12,71 +15,151 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def migrate_csv_to_turso(csv_file="trades.csv"):
+# Rows already present with the same message_id and order_id are skipped, so
+# re-running a chunk after a crash never duplicates trades.
+INSERT_QUERY = """
+INSERT INTO trades (
+    timestamp, message_id, ticker, strike, option_type, action,
+    contracts, price, option_symbol, order_id, status, account_id, order_type
+)
+SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+WHERE NOT EXISTS (SELECT 1 FROM trades WHERE message_id = ? AND order_id = ?)
+"""
+
+def convert_row(row):
+    price = None
+    if "price" in row and row["price"]:
+        try:
+            price = float(row["price"])
+        except (ValueError, TypeError):
+            price = None
+    
+    order_type = "market"
+    if "order_type" in row and row["order_type"]:
+        order_type = row["order_type"]
+    
+    message_id = row.get("message_id", "")
+    order_id = row.get("order_id") or "N/A"
+    if not message_id:
+        raise ValueError("missing message_id")
+    
+    return (
+        row.get("timestamp", ""),
+        message_id,
+        row.get("ticker", ""),
+        float(row.get("strike", 0)),
+        row.get("option_type", ""),
+        row.get("action", ""),
+        int(row.get("contracts", 0)),
+        price,
+        row.get("option_symbol", ""),
+        order_id,
+        row.get("status", "N/A"),
+        row.get("account_id", ""),
+        order_type,
+        message_id,
+        order_id
+    )
+
+def load_checkpoint(path, csv_file):
+    if not os.path.exists(path):
+        return 0
+    
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return 0
+    
+    if checkpoint.get("csv_file") != os.path.abspath(csv_file) or os.path.getsize(csv_file) < checkpoint.get("size", 0):
+        logger.warning(f"Checkpoint {path} is for a different or truncated file, starting over")
+        return 0
+    return checkpoint.get("rows", 0)
+
+def save_checkpoint(path, csv_file, rows):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"csv_file": os.path.abspath(csv_file), "size": os.path.getsize(csv_file), "rows": rows}, f)
+    os.replace(tmp_path, path)
+
+def migrate_csv_to_turso(csv_file="trades.csv", chunk_size=1000, resume=True):
     if not os.path.exists(csv_file):
         logger.warning(f"CSV file {csv_file} does not exist. Nothing to migrate.")
         return
     
+    checkpoint_file = f"{csv_file}.checkpoint"
+    rejects_file = f"{csv_file}.rejects.csv"
+    
     try:
         db_client = DBClient()
-        db_logger = DBLogger(db_client)
+        DBLogger(db_client)
+        db_client.execute_sync("CREATE INDEX IF NOT EXISTS idx_trades_message_order ON trades (message_id, order_id)")
+        
+        start_row = load_checkpoint(checkpoint_file, csv_file) if resume else 0
+        if start_row:
+            logger.info(f"Resuming migration of {csv_file} after row {start_row}")
+        else:
+            logger.info(f"Starting migration from {csv_file} to Turso database")
         
-        logger.info(f"Starting migration from {csv_file} to Turso database")
+        start = time.perf_counter()
+        processed = start_row
+        last_row = start_row
+        inserted = 0
+        rejected = 0
         
-        with open(csv_file, 'r', newline='') as f:
+        with open(csv_file, 'r', newline='') as f, open(rejects_file, 'a' if start_row else 'w', newline='') as rejects:
             reader = csv.DictReader(f)
-            count = 0
+            reject_writer = None
+            chunk = []
             
-            for row in reader:
+            for row_number, row in enumerate(reader, start=1):
+                if row_number <= start_row:
+                    continue
+                last_row = row_number
+                
                 try:
-                    insert_query = """
-                    INSERT INTO trades (
-                        timestamp, message_id, ticker, strike, option_type, action,
-                        contracts, price, option_symbol, order_id, status, account_id, order_type
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """
-                    
-                    price = None
-                    if "price" in row and row["price"]:
-                        try:
-                            price = float(row["price"])
-                        except (ValueError, TypeError):
-                            price = None
-                    
-                    order_type = "market"
-                    if "order_type" in row and row["order_type"]:
-                        order_type = row["order_type"]
-                    
-                    db_client.execute_sync(
-                        insert_query,
-                        (
-                            row.get("timestamp", ""),
-                            row.get("message_id", ""),
-                            row.get("ticker", ""),
-                            float(row.get("strike", 0)),
-                            row.get("option_type", ""),
-                            row.get("action", ""),
-                            int(row.get("contracts", 0)),
-                            price,
-                            row.get("option_symbol", ""),
-                            row.get("order_id", "N/A"),
-                            row.get("status", "N/A"),
-                            row.get("account_id", ""),
-                            order_type
-                        )
-                    )
-                    count += 1
-                    
+                    chunk.append(convert_row(row))
                 except Exception as e:
-                    logger.warning(f"Error migrating row: {e}. Row: {row}")
-                    continue
+                    if reject_writer is None:
+                        reject_writer = csv.DictWriter(rejects, fieldnames=list(row.keys()) + ["error"], extrasaction="ignore")
+                        if rejects.tell() == 0:
+                            reject_writer.writeheader()
+                    reject_writer.writerow(dict(row, error=str(e)))
+                    rejected += 1
+                
+                if row_number - processed >= chunk_size:
+                    inserted += db_client.execute_many(INSERT_QUERY, chunk) if chunk else 0
+                    processed = row_number
+                    save_checkpoint(checkpoint_file, csv_file, processed)
+                    chunk = []
+                    
+                    elapsed = time.perf_counter() - start
+                    logger.info(f"Imported through row {processed} ({(processed - start_row) / elapsed:.0f} rows/s, {inserted} new, {rejected} rejected)")
+            
+            if chunk:
+                inserted += db_client.execute_many(INSERT_QUERY, chunk)
         
-        logger.info(f"Successfully migrated {count} trades from CSV to Turso database")
+        elapsed = time.perf_counter() - start
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        if rejected == 0 and os.path.exists(rejects_file) and os.path.getsize(rejects_file) == 0:
+            os.remove(rejects_file)
         
+        rate = (last_row - start_row) / elapsed if elapsed > 0 else 0
+        logger.info(f"Successfully migrated {inserted} new trades from CSV to Turso database: {last_row - start_row} rows in {elapsed:.1f}s ({rate:.0f} rows/s)")
+        if rejected:
+            logger.warning(f"{rejected} rows could not be converted and were written to {rejects_file}")
+    
     except Exception as e:
         logger.error(f"Error during migration: {e}", exc_info=True)
         sys.exit(1)
 
 if __name__ == "__main__":
-    migrate_csv_to_turso()
+    parser = argparse.ArgumentParser(description="Import a trades CSV into the database in resumable, idempotent chunks")
+    parser.add_argument("csv_file", nargs="?", default="trades.csv")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the first row")
+    args = parser.parse_args()
 
+    migrate_csv_to_turso(args.csv_file, args.chunk_size, resume=not args.restart)
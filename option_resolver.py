@@ -1,28 +1,35 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from tradier_client import TradierClient
+from chain_cache import CompactChain, LRUCache
+from config import CHAIN_CACHE_MAX_ENTRIES, CHAIN_CACHE_MAX_BYTES, EXPIRATION_CACHE_MAX_ENTRIES, QUOTE_STREAM_MAX_AGE
 
 logger = logging.getLogger(__name__)
 
+EXPIRATION_CACHE_SECONDS = 3600
+CHAIN_CACHE_SECONDS = 300
+
 class OptionResolver:
-    def __init__(self, tradier_client):
+    def __init__(self, tradier_client, quote_stream=None, clock=datetime.now, recorder=None):
         self.client = tradier_client
-        self.expiration_cache = {}
-        self.chain_cache = {}
+        self.quote_stream = quote_stream
+        self.clock = clock
+        self.recorder = recorder
+        self.expiration_cache = LRUCache(max_entries=EXPIRATION_CACHE_MAX_ENTRIES)
+        self.chain_cache = LRUCache(max_entries=CHAIN_CACHE_MAX_ENTRIES, max_bytes=CHAIN_CACHE_MAX_BYTES, sizeof=lambda chain: chain.nbytes)
 
     def _parse_expiration_date(self, date_str):
         try:
             return datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
-            logger.error(f"Failed to parse expiration date: {date_str}")
+            logger.error("Failed to parse expiration date: %s", date_str)
             return None
 
     def _get_expirations(self, symbol):
         cache_key = symbol
-        if cache_key in self.expiration_cache:
-            cache_time, expirations = self.expiration_cache[cache_key]
-            if datetime.now() - cache_time < timedelta(hours=1):
-                return expirations
+        expirations = self.expiration_cache.get(cache_key, max_age=EXPIRATION_CACHE_SECONDS)
+        if expirations is not None:
+            return expirations
         
         try:
             response = self.client.get_option_expirations(symbol)
@@ -32,19 +39,19 @@ class OptionResolver:
                     dates = [dates]
                 expirations = [self._parse_expiration_date(d) for d in dates if d]
                 expirations = [d for d in expirations if d is not None]
-                self.expiration_cache[cache_key] = (datetime.now(), expirations)
-                logger.info(f"Retrieved {len(expirations)} expirations for {symbol}")
+                self.expiration_cache.put(cache_key, expirations)
+                logger.info("Retrieved %s expirations for %s", len(expirations), symbol)
                 return expirations
             else:
-                logger.warning(f"No expirations found in response for {symbol}: {response}")
+                logger.warning("No expirations found in response for %s: %s", symbol, response)
                 return []
         except Exception as e:
-            logger.error(f"Error fetching expirations for {symbol}: {e}")
+            logger.error("Error fetching expirations for %s: %s", symbol, e)
             return []
 
     def _find_closest_expiration(self, symbol, today=None):
         if today is None:
-            today = datetime.now().date()
+            today = self.clock().date()
         
         expirations = self._get_expirations(symbol)
         if not expirations:
@@ -62,15 +69,15 @@ class OptionResolver:
         
         if closest is None:
             closest = max(expirations)
-            logger.warning(f"No future expiration found for {symbol}, using latest: {closest}")
+            logger.warning("No future expiration found for %s, using latest: %s", symbol, closest)
         
         return closest
 
     def _get_option_chain(self, symbol, expiration_date, use_cache=True):
         cache_key = f"{symbol}_{expiration_date}"
-        if use_cache and cache_key in self.chain_cache:
-            cache_time, chain_data = self.chain_cache[cache_key]
-            if datetime.now() - cache_time < timedelta(minutes=5):
+        if use_cache:
+            chain_data = self.chain_cache.get(cache_key, max_age=CHAIN_CACHE_SECONDS)
+            if chain_data is not None:
                 return chain_data
         
         try:
@@ -82,17 +89,22 @@ class OptionResolver:
                 if isinstance(options, dict):
                     options = [options]
                 if use_cache:
-                    self.chain_cache[cache_key] = (datetime.now(), options)
-                logger.info(f"Retrieved {len(options)} options from chain for {symbol} exp {expiration_str}")
+                    self.chain_cache.put(cache_key, CompactChain(options))
+                if self.recorder:
+                    self.recorder.record(symbol, expiration_str, options)
+                logger.info("Retrieved %s options from chain for %s exp %s", len(options), symbol, expiration_str)
                 return options
             else:
-                logger.warning(f"No options found in chain response for {symbol} exp {expiration_str}: {response}")
+                logger.warning("No options found in chain response for %s exp %s: %s", symbol, expiration_str, response)
                 return []
         except Exception as e:
-            logger.error(f"Error fetching option chain for {symbol} exp {expiration_date}: {e}")
+            logger.error("Error fetching option chain for %s exp %s: %s", symbol, expiration_date, e)
             return []
 
     def _find_option_in_chain(self, chain, strike, option_type, return_full_option=False):
+        if isinstance(chain, CompactChain):
+            return chain.find(strike, option_type, return_full_option)
+        
         option_type_upper = option_type.upper()
         option_type_map = {"C": "call", "P": "put"}
         target_type = option_type_map.get(option_type_upper)
@@ -113,22 +125,56 @@ class OptionResolver:
                         return symbol
         return None
 
+    def _find_cached_symbol(self, symbol, expiration_date, strike, option_type):
+        # Symbols don't change within an expiration, so a chain past its
+        # freshness window is still good for this lookup.
+        chain_data = self.chain_cache.get(f"{symbol}_{expiration_date}")
+        if not chain_data:
+            return None
+        return self._find_option_in_chain(chain_data, strike, option_type)
+
+    def warm_up(self, symbol):
+        exp_date = self._find_closest_expiration(symbol)
+        if exp_date is not None:
+            self._get_option_chain(symbol, exp_date)
+        return exp_date
+
+    def get_quotes(self, symbols):
+        if not symbols:
+            return {}
+        try:
+            quotes = self.client.get_quotes(symbols)
+            return {quote["symbol"]: quote for quote in quotes if quote.get("symbol")}
+        except Exception as e:
+            logger.error("Error fetching quotes for %s symbols: %s", len(symbols), e)
+            return {}
+
     def get_option_price(self, ticker, strike, option_type):
         try:
             option_type_upper = option_type.upper()
             
             if option_type_upper not in ["C", "P"]:
-                logger.error(f"Invalid option type: {option_type}")
+                logger.error("Invalid option type: %s", option_type)
                 return None
             
             exp_date = self._find_closest_expiration(ticker)
             if exp_date is None:
-                logger.error(f"Could not find expiration for {ticker}")
+                logger.error("Could not find expiration for %s", ticker)
                 return None
             
+            option_symbol = self._find_cached_symbol(ticker, exp_date, strike, option_type)
+            if option_symbol:
+                if self.quote_stream:
+                    quote = self.quote_stream.get_quote(option_symbol, max_age=QUOTE_STREAM_MAX_AGE)
+                    if quote:
+                        return quote
+                quote = self.get_quotes([option_symbol]).get(option_symbol)
+                if quote:
+                    return quote
+            
             chain = self._get_option_chain(ticker, exp_date, use_cache=False)
             if not chain:
-                logger.error(f"Could not retrieve option chain for {ticker} exp {exp_date}")
+                logger.error("Could not retrieve option chain for %s exp %s", ticker, exp_date)
                 return None
             
             option = self._find_option_in_chain(chain, strike, option_type, return_full_option=True)
@@ -136,39 +182,75 @@ class OptionResolver:
             if option:
                 return option
             else:
-                logger.error(f"Could not find option in chain: {ticker} {strike}{option_type} (exp: {exp_date})")
+                logger.error("Could not find option in chain: %s %s%s (exp: %s)", ticker, strike, option_type, exp_date)
                 return None
         except Exception as e:
-            logger.error(f"Error getting option price for {ticker} {strike}{option_type}: {e}", exc_info=True)
+            logger.error("Error getting option price for %s %s%s: %s", ticker, strike, option_type, e, exc_info=True)
             return None
 
+    def get_option_prices(self, ticker, contracts):
+        try:
+            exp_date = self._find_closest_expiration(ticker)
+            if exp_date is None:
+                logger.error("Could not find expiration for %s", ticker)
+                return {}
+            
+            symbols = {}
+            for strike, option_type in contracts:
+                option_symbol = self._find_cached_symbol(ticker, exp_date, strike, option_type)
+                if not option_symbol:
+                    break
+                symbols[(strike, option_type)] = option_symbol
+            else:
+                quotes = self.get_quotes(list(symbols.values()))
+                if all(option_symbol in quotes for option_symbol in symbols.values()):
+                    return {contract: quotes[option_symbol] for contract, option_symbol in symbols.items()}
+            
+            chain = self._get_option_chain(ticker, exp_date, use_cache=False)
+            if not chain:
+                logger.error("Could not retrieve option chain for %s exp %s", ticker, exp_date)
+                return {}
+            
+            prices = {}
+            for strike, option_type in contracts:
+                option = self._find_option_in_chain(chain, strike, option_type, return_full_option=True)
+                if option:
+                    prices[(strike, option_type)] = option
+                else:
+                    logger.error("Could not find option in chain: %s %s%s (exp: %s)", ticker, strike, option_type, exp_date)
+            
+            return prices
+        except Exception as e:
+            logger.error("Error getting option prices for %s: %s", ticker, e, exc_info=True)
+            return {}
+
     def resolve_option_symbol(self, ticker, strike, option_type):
         try:
             option_type_upper = option_type.upper()
             
             if option_type_upper not in ["C", "P"]:
-                logger.error(f"Invalid option type: {option_type}")
+                logger.error("Invalid option type: %s", option_type)
                 return None
             
             exp_date = self._find_closest_expiration(ticker)
             if exp_date is None:
-                logger.error(f"Could not find expiration for {ticker}")
+                logger.error("Could not find expiration for %s", ticker)
                 return None
-            logger.info(f"Found expiration for {ticker}: {exp_date}")
+            logger.info("Found expiration for %s: %s", ticker, exp_date)
             chain = self._get_option_chain(ticker, exp_date)
             if not chain:
-                logger.error(f"Could not retrieve option chain for {ticker} exp {exp_date}")
+                logger.error("Could not retrieve option chain for %s exp %s", ticker, exp_date)
                 return None
             
             option_symbol = self._find_option_in_chain(chain, strike, option_type)
             
             if option_symbol:
-                logger.info(f"Resolved option symbol: {ticker} {strike}{option_type} -> {option_symbol} (exp: {exp_date})")
+                logger.info("Resolved option symbol: %s %s%s -> %s (exp: %s)", ticker, strike, option_type, option_symbol, exp_date)
                 return option_symbol
             else:
-                logger.error(f"Could not find option in chain: {ticker} {strike}{option_type} (exp: {exp_date})")
+                logger.error("Could not find option in chain: %s %s%s (exp: %s)", ticker, strike, option_type, exp_date)
                 return None
         except Exception as e:
-            logger.error(f"Error resolving option symbol for {ticker} {strike}{option_type}: {e}", exc_info=True)
+            logger.error("Error resolving option symbol for %s %s%s: %s", ticker, strike, option_type, e, exc_info=True)
             return None
 
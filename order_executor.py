@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from tradier_client import TradierClient
 
@@ -7,6 +8,9 @@ class OrderExecutor:
     def __init__(self, tradier_client, position_tracker=None):
         self.client = tradier_client
         self.position_tracker = position_tracker
+        # Orders run in worker threads; holding this from placement until the
+        # fill is tracked keeps the sellable-quantity check from racing another exit.
+        self.lock = asyncio.Lock()
 
     def _map_action_to_side(self, action):
         action_upper = action.upper()
@@ -27,10 +31,10 @@ class OrderExecutor:
             actual_quantity = requested_quantity
 
             if action == "SOLD" and self.position_tracker:
-                available = self.position_tracker.get_position(ticker, strike, option_type)
+                available = self.position_tracker.get_sellable_quantity(ticker, strike, option_type)
                 
                 if available <= 0:
-                    logger.warning(f"Cannot execute SOLD order: No open position for {ticker} {strike}{option_type}")
+                    logger.warning("Cannot execute SOLD order: No open position for %s %s%s", ticker, strike, option_type)
                     return {
                         "success": False,
                         "error": f"No open position for {ticker} {strike}{option_type}",
@@ -39,9 +43,9 @@ class OrderExecutor:
                 
                 if available < requested_quantity:
                     actual_quantity = self.position_tracker.get_available_quantity(ticker, strike, option_type, requested_quantity)
-                    logger.warning(f"Partial fill: Requested {requested_quantity} contracts, but only {available} available. Executing {actual_quantity} contracts.")
+                    logger.warning("Partial fill: Requested %s contracts, but only %s available. Executing %s contracts.", requested_quantity, available, actual_quantity)
                 else:
-                    logger.info(f"Position validated: {available} contracts available for {ticker} {strike}{option_type}")
+                    logger.info("Position validated: %s contracts available for %s %s%s", available, ticker, strike, option_type)
 
             side = self._map_action_to_side(action)
             
@@ -60,9 +64,9 @@ class OrderExecutor:
                 order_type = "limit"
                 order_data["type"] = "limit"
                 order_data["price"] = str(trade_data["price"])
-                logger.info(f"Using limit order for SOLD: price ${trade_data['price']}")
+                logger.info("Using limit order for SOLD: price $%s", trade_data['price'])
             
-            logger.info(f"Placing order: {action} {actual_quantity} {option_symbol} ({side})")
+            logger.info("Placing order: %s %s %s (%s)", action, actual_quantity, option_symbol, side)
             
             response = self.client.place_order(order_data)
             
@@ -70,7 +74,7 @@ class OrderExecutor:
                 order_info = response["order"]
                 order_id = order_info.get("id", "unknown")
                 status = order_info.get("status", "unknown")
-                logger.info(f"Order placed successfully - ID: {order_id}, Status: {status}")
+                logger.info("Order placed successfully - ID: %s, Status: %s", order_id, status)
                 
                 result = {
                     "success": True,
@@ -87,14 +91,14 @@ class OrderExecutor:
                 
                 return result
             else:
-                logger.error(f"Unexpected response format: {response}")
+                logger.error("Unexpected response format: %s", response)
                 return {
                     "success": False,
                     "error": "Unexpected response format",
                     "response": response
                 }
         except Exception as e:
-            logger.error(f"Error executing order: {e}")
+            logger.error("Error executing order: %s", e)
             return {
                 "success": False,
                 "error": str(e),
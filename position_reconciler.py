@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import re
+from config import RECONCILE_INTERVAL
+from tradier_client import response_items
+
+logger = logging.getLogger(__name__)
+
+OCC_SYMBOL = re.compile(r"^([A-Z.]{1,6})(\d{6})([CP])(\d{8})$")
+
+def parse_option_symbol(symbol):
+    match = OCC_SYMBOL.match(symbol or "")
+    if not match:
+        return None
+    root, _, option_type, strike = match.groups()
+    return root, int(strike) / 1000.0, option_type
+
+class PositionReconciler:
+    def __init__(self, tradier_client, position_tracker, fill_tracker=None, interval=RECONCILE_INTERVAL):
+        self.client = tradier_client
+        self.position_tracker = position_tracker
+        self.fill_tracker = fill_tracker
+        self.interval = interval
+        self.task = None
+
+    def fetch_broker_positions(self):
+        response = self.client.get_positions()
+        return response_items(response, "positions", "position")
+
+    def _busy_keys(self):
+        busy = set(self.position_tracker.reserved)
+        if self.fill_tracker:
+            for entry in self.fill_tracker.pending.values():
+                busy.add(self.position_tracker._get_position_key(entry["ticker"], entry["strike"], entry["option_type"]))
+        return busy
+
+    def _match_root(self, local, root, strike, option_type):
+        # Index options trade under weekly roots (SPXW, NDXP) that differ from
+        # the ticker a position was opened with; match those by prefix.
+        key = self.position_tracker._get_position_key(root, strike, option_type)
+        if key in local:
+            return key
+        candidates = [
+            local_key for local_key, pos in local.items()
+            if local_key[1:] == key[1:] and root.startswith(local_key[0]) and not pos.get("option_symbol")
+        ]
+        return max(candidates, key=lambda local_key: len(local_key[0])) if candidates else key
+
+    def diff(self, broker_positions, versions=None):
+        local = self.position_tracker.positions
+        keys_by_symbol = {pos["option_symbol"]: key for key, pos in local.items() if pos.get("option_symbol")}
+        
+        broker = {}
+        for position in broker_positions:
+            symbol = position.get("symbol")
+            key = keys_by_symbol.get(symbol)
+            if key is None:
+                parsed = parse_option_symbol(symbol)
+                if parsed is None:
+                    continue
+                key = self._match_root(local, *parsed)
+            
+            quantity = int(float(position.get("quantity") or 0))
+            cost_basis = position.get("cost_basis")
+            avg_entry_price = float(cost_basis) / (quantity * 100) if cost_basis and quantity else None
+            broker[key] = (quantity, avg_entry_price, symbol)
+        
+        busy = self._busy_keys()
+        if versions is not None:
+            # Positions that changed while the broker was being queried (a fill
+            # landing mid-fetch) may not be reflected in its answer yet.
+            current = self.position_tracker.versions
+            busy.update(key for key in set(current) | set(versions) if current.get(key) != versions.get(key))
+        changes = []
+        
+        for key, (quantity, avg_entry_price, symbol) in broker.items():
+            if key in busy:
+                continue
+            current = local.get(key)
+            if current and current["quantity"] == quantity:
+                continue
+            changes.append((key, quantity, avg_entry_price, symbol))
+        
+        for key, current in local.items():
+            if key in busy or key in broker or current["quantity"] <= 0:
+                continue
+            changes.append((key, 0, None, current.get("option_symbol")))
+        
+        return changes
+
+    def apply(self, broker_positions, versions=None):
+        changes = self.diff(broker_positions, versions)
+        if not changes:
+            logger.info(f"Positions match broker ({len(broker_positions)} broker positions)")
+            return []
+        
+        for key, quantity, _, symbol in changes:
+            current = self.position_tracker.positions.get(key)
+            logger.warning(f"Reconciling {key[0]} {key[1]}{key[2]} ({symbol}): local {current['quantity'] if current else 0} -> broker {quantity}")
+        
+        self.position_tracker.replace_positions(changes)
+        return changes
+
+    async def reconcile(self):
+        try:
+            versions = dict(self.position_tracker.versions)
+            broker_positions = await asyncio.to_thread(self.fetch_broker_positions)
+            changes = self.apply(broker_positions, versions)
+            if changes:
+                await asyncio.to_thread(self.position_tracker.persist_positions, [key for key, *_ in changes])
+            return changes
+        except Exception as e:
+            logger.error(f"Error reconciling positions with broker: {e}", exc_info=True)
+            return None
+
+    async def _run(self):
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
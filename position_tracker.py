@@ -1,12 +1,23 @@
 import logging
+import threading
 from db_client import DBClient
 
 logger = logging.getLogger(__name__)
 
 class PositionTracker:
-    def __init__(self, db_client=None):
+    def __init__(self, db_client=None, autoload=True):
         self.db_client = db_client or DBClient()
         self.positions = {}
+        self.listeners = []
+        self.reserved = {}
+        # Bumped on every change to a position, so a reconciler can tell which
+        # positions moved while it was waiting on the broker.
+        self.versions = {}
+        self.write_lock = threading.Lock()
+        if autoload:
+            self.initialize()
+    
+    def initialize(self):
         self._ensure_tables_exist()
         self.load_positions_from_db()
     
@@ -30,13 +41,20 @@ class PositionTracker:
             self.db_client.execute_sync(create_positions_table)
             logger.info("Positions table initialized")
         except Exception as e:
-            logger.error(f"Error creating positions table: {e}")
+            logger.error("Error creating positions table: %s", e)
             raise
     
     def load_positions_from_db(self):
         try:
             select_query = """
-            SELECT ticker, strike, option_type, quantity, avg_entry_price
+            SELECT ticker, strike, option_type, quantity, avg_entry_price,
+                (SELECT t.option_symbol FROM trades t
+                 WHERE t.ticker = positions.ticker
+                     AND t.strike = positions.strike
+                     AND t.option_type = positions.option_type
+                     AND t.action = 'BOUGHT'
+                 ORDER BY t.timestamp DESC
+                 LIMIT 1)
             FROM positions
             WHERE quantity > 0
             """
@@ -49,33 +67,66 @@ class PositionTracker:
                 option_type = row[2]
                 quantity = int(row[3])
                 avg_entry_price = float(row[4]) if row[4] is not None else None
+                option_symbol = row[5]
                 
                 key = self._get_position_key(ticker, strike, option_type)
                 self.positions[key] = {
                     "quantity": quantity,
-                    "avg_entry_price": avg_entry_price
+                    "avg_entry_price": avg_entry_price,
+                    "option_symbol": option_symbol
                 }
             
-            logger.info(f"Loaded {len(self.positions)} open positions from database")
+            logger.info("Loaded %s open positions from database", len(self.positions))
         except Exception as e:
-            logger.error(f"Error loading positions from database: {e}")
+            logger.error("Error loading positions from database: %s", e)
+    
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+    
+    def _notify_listeners(self, key, position):
+        for callback in self.listeners:
+            try:
+                callback(key, position)
+            except Exception as e:
+                logger.error("Error in position listener: %s", e, exc_info=True)
+    
+    def get_option_symbol(self, ticker, strike, option_type):
+        key = self._get_position_key(ticker, strike, option_type)
+        pos = self.positions.get(key)
+        return pos.get("option_symbol") if pos else None
     
     def get_position(self, ticker, strike, option_type):
         key = self._get_position_key(ticker, strike, option_type)
         pos = self.positions.get(key)
         return pos["quantity"] if pos else 0
     
+    def reserve(self, ticker, strike, option_type, quantity):
+        key = self._get_position_key(ticker, strike, option_type)
+        self.reserved[key] = self.reserved.get(key, 0) + quantity
+    
+    def release(self, ticker, strike, option_type, quantity):
+        key = self._get_position_key(ticker, strike, option_type)
+        remaining = self.reserved.get(key, 0) - quantity
+        if remaining > 0:
+            self.reserved[key] = remaining
+        else:
+            self.reserved.pop(key, None)
+    
+    def get_sellable_quantity(self, ticker, strike, option_type):
+        key = self._get_position_key(ticker, strike, option_type)
+        return max(0, self.get_position(ticker, strike, option_type) - self.reserved.get(key, 0))
+    
     def get_avg_entry_price(self, ticker, strike, option_type):
         key = self._get_position_key(ticker, strike, option_type)
         pos = self.positions.get(key)
         return pos["avg_entry_price"] if pos and pos["avg_entry_price"] else None
     
     def can_sell(self, ticker, strike, option_type, quantity):
-        available = self.get_position(ticker, strike, option_type)
+        available = self.get_sellable_quantity(ticker, strike, option_type)
         return available >= quantity
     
     def get_available_quantity(self, ticker, strike, option_type, requested):
-        available = self.get_position(ticker, strike, option_type)
+        available = self.get_sellable_quantity(ticker, strike, option_type)
         return min(requested, available) if available > 0 else 0
     
     def _calculate_avg_entry_price(self, ticker, strike, option_type, new_price, new_quantity):
@@ -93,13 +144,54 @@ class PositionTracker:
         
         return total_cost / total_quantity if total_quantity > 0 else new_price
     
-    def update_position(self, ticker, strike, option_type, action, quantity, price=None):
+    def _position_statement(self, key, position, last_updated):
+        ticker, strike, option_type = key
+        if position and position["quantity"] > 0:
+            return (
+                """
+                INSERT INTO positions (ticker, strike, option_type, quantity, avg_entry_price, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, strike, option_type) DO UPDATE SET
+                    quantity = excluded.quantity,
+                    avg_entry_price = excluded.avg_entry_price,
+                    last_updated = excluded.last_updated
+                """,
+                (ticker, strike, option_type, position["quantity"], position["avg_entry_price"], last_updated)
+            )
+        return (
+            "DELETE FROM positions WHERE ticker = ? AND strike = ? AND option_type = ?",
+            (ticker, strike, option_type)
+        )
+    
+    def replace_positions(self, changes):
+        for key, quantity, avg_entry_price, option_symbol in changes:
+            self.positions[key] = {
+                "quantity": quantity,
+                "avg_entry_price": avg_entry_price if quantity > 0 else None,
+                "option_symbol": option_symbol
+            }
+            self.versions[key] = self.versions.get(key, 0) + 1
+            self._notify_listeners(key, self.positions[key])
+    
+    def persist_positions(self, keys):
+        from datetime import datetime
+        
+        # Meant to run in a worker thread. It writes whatever is in memory when
+        # it takes the lock, so a fill applied meanwhile is never overwritten.
+        last_updated = datetime.now().isoformat()
+        with self.write_lock:
+            statements = [self._position_statement(key, self.positions.get(key), last_updated) for key in keys]
+            if statements:
+                self.db_client.execute_batch(statements)
+    
+    def update_position(self, ticker, strike, option_type, action, quantity, price=None, option_symbol=None):
         from datetime import datetime
         
         key = self._get_position_key(ticker, strike, option_type)
         current_pos = self.positions.get(key, {"quantity": 0, "avg_entry_price": None})
         current_quantity = current_pos["quantity"]
         current_avg_price = current_pos["avg_entry_price"]
+        option_symbol = option_symbol or current_pos.get("option_symbol")
         
         action_upper = action.upper()
         new_quantity = current_quantity
@@ -114,13 +206,15 @@ class PositionTracker:
             if new_quantity <= 0:
                 new_avg_price = None
         else:
-            logger.warning(f"Unknown action for position update: {action}")
+            logger.warning("Unknown action for position update: %s", action)
             return
         
         self.positions[key] = {
             "quantity": new_quantity,
-            "avg_entry_price": new_avg_price
+            "avg_entry_price": new_avg_price,
+            "option_symbol": option_symbol
         }
+        self.versions[key] = self.versions.get(key, 0) + 1
         
         last_updated = datetime.now().isoformat()
         
@@ -134,23 +228,30 @@ class PositionTracker:
                 last_updated = ?
             """
             
-            self.db_client.execute_sync(
-                upsert_query,
-                (
-                    ticker.upper(), strike, option_type.upper(),
-                    new_quantity, new_avg_price, last_updated,
-                    new_quantity, new_avg_price, last_updated
+            with self.write_lock:
+                self.db_client.execute_sync(
+                    upsert_query,
+                    (
+                        ticker.upper(), strike, option_type.upper(),
+                        new_quantity, new_avg_price, last_updated,
+                        new_quantity, new_avg_price, last_updated
+                    )
                 )
-            )
         else:
             delete_query = """
             DELETE FROM positions
             WHERE ticker = ? AND strike = ? AND option_type = ?
             """
             
-            self.db_client.execute_sync(
-                delete_query,
-                (ticker.upper(), strike, option_type.upper())
-            )
+            with self.write_lock:
+                self.db_client.execute_sync(
+                    delete_query,
+                    (ticker.upper(), strike, option_type.upper())
+                )
+        
+        self._notify_listeners(key, self.positions[key])
         
-        logger.info(f"Position updated: {ticker} {strike}{option_type} - {action} {quantity} contracts. New position: {new_quantity}, Avg entry: ${new_avg_price:.2f}" if new_avg_price else f"Position updated: {ticker} {strike}{option_type} - {action} {quantity} contracts. New position: {new_quantity}")
+        if new_avg_price:
+            logger.info("Position updated: %s %s%s - %s %s contracts. New position: %s, Avg entry: $%.2f", ticker, strike, option_type, action, quantity, new_quantity, new_avg_price)
+        else:
+            logger.info("Position updated: %s %s%s - %s %s contracts. New position: %s", ticker, strike, option_type, action, quantity, new_quantity)
@@ -0,0 +1,117 @@
+import bisect
+import logging
+import os
+import threading
+from array import array
+from datetime import datetime
+from config import PRICE_HISTORY_DIR
+from tradier_client import response_items
+
+logger = logging.getLogger(__name__)
+
+MARKET_CLOSE_MINUTE = 16 * 60
+
+# Where a day's prices came from: one-minute timesales, or only the daily
+# close for days older than Tradier's minute history.
+TIMESALES = "timesales"
+DAILY_CLOSE = "close"
+
+def minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+def bar_price(minutes, prices, when):
+    # Last bar at or before the trade. A trade before the first bar has no
+    # price yet; using a later bar would price it with hindsight.
+    i = bisect.bisect_right(minutes, minute_of_day(when)) - 1
+    if i < 0:
+        return None
+    return round(float(prices[i]), 4)
+
+class TimesalesCache:
+    # Each (symbol, day) is stored as two native arrays: minutes since midnight
+    # (uint16) and the bar close (float32), 6 bytes per one-minute bar.
+    def __init__(self, tradier_client, cache_dir=PRICE_HISTORY_DIR, clock=datetime.now):
+        self.client = tradier_client
+        self.cache_dir = cache_dir
+        self.clock = clock
+        self.hits = 0
+        self.fetches = 0
+        self.lock = threading.Lock()
+
+    def _path(self, symbol, day, source=TIMESALES):
+        extension = "bars" if source == TIMESALES else "close"
+        return os.path.join(self.cache_dir, symbol, f"{day.isoformat()}.{extension}")
+
+    def _read(self, path):
+        minutes = array("H")
+        prices = array("f")
+        with open(path, "rb") as f:
+            count = os.fstat(f.fileno()).st_size // (minutes.itemsize + prices.itemsize)
+            minutes.fromfile(f, count)
+            prices.fromfile(f, count)
+        return minutes, prices
+
+    def _write(self, path, minutes, prices):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            minutes.tofile(f)
+            prices.tofile(f)
+        os.replace(tmp_path, path)
+
+    def _fetch(self, symbol, day):
+        response = self.client.get_timesales(symbol, f"{day.isoformat()} 00:00", f"{day.isoformat()} 23:59")
+        data = response_items(response, "series", "data")
+        
+        bars = {}
+        for row in data:
+            price = row.get("close") or row.get("price")
+            if row.get("time") and price:
+                bars[minute_of_day(datetime.fromisoformat(row["time"]))] = float(price)
+        source = TIMESALES
+        
+        if not bars:
+            # Minute bars only go back a few weeks; older days fall back to the daily close.
+            response = self.client.get_history(symbol, day.isoformat(), day.isoformat())
+            for row in response_items(response, "history", "day"):
+                if row.get("close"):
+                    bars[MARKET_CLOSE_MINUTE] = float(row["close"])
+            source = DAILY_CLOSE
+        
+        minutes = array("H", sorted(bars))
+        prices = array("f", (bars[minute] for minute in minutes))
+        return minutes, prices, source
+
+    def get_day(self, symbol, day):
+        for source in (TIMESALES, DAILY_CLOSE):
+            path = self._path(symbol, day, source)
+            if os.path.exists(path):
+                with self.lock:
+                    self.hits += 1
+                return self._read(path) + (source,)
+        
+        minutes, prices, source = self._fetch(symbol, day)
+        with self.lock:
+            self.fetches += 1
+        if day < self.clock().date():
+            # Today's bars are still growing, so only finished days are cached.
+            self._write(self._path(symbol, day, source), minutes, prices)
+        logger.debug("Fetched %d %s bars for %s on %s", len(minutes), source, symbol, day)
+        return minutes, prices, source
+
+    def prices_at(self, symbol, day, times):
+        # Returns (price, source) per time. A daily close is the same for every
+        # trade that day, so it is marked rather than passed off as the price
+        # at the trade's timestamp.
+        minutes, prices, source = self.get_day(symbol, day)
+        if source == DAILY_CLOSE:
+            close = round(float(prices[0]), 4) if prices else None
+            return [(close, DAILY_CLOSE) if close else None for _ in times]
+        results = []
+        for when in times:
+            price = bar_price(minutes, prices, when)
+            results.append((price, TIMESALES) if price else None)
+        return results
+
+    def price_at(self, symbol, when):
+        return self.prices_at(symbol, when.date(), [when])[0]
@@ -0,0 +1,181 @@
+import cProfile
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from config import PROFILE_DIR, PROFILE_DEFAULT_SECONDS, PROFILE_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class StackSampler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _collapse(self, frame, thread_name):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        return ";".join(reversed(stack))
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.counts[self._collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.samples += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Profiler:
+    def __init__(self, name, output_dir=PROFILE_DIR, default_seconds=PROFILE_DEFAULT_SECONDS, max_seconds=PROFILE_MAX_SECONDS):
+        self.name = name
+        self.output_dir = output_dir
+        self.default_seconds = default_seconds
+        self.max_seconds = max_seconds
+        self.session = None
+        self.stop_handle = None
+        self.last_snapshot = None
+        self.gauges = {}
+        self.lock = threading.Lock()
+
+    def add_gauge(self, name, callback):
+        self.gauges[name] = callback
+
+    def _output_path(self, extension):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+    def start(self, seconds=None, mode="sample", call_later=None):
+        seconds = min(seconds or self.default_seconds, self.max_seconds)
+        
+        if mode == "cprofile" and call_later is None:
+            raise ValueError("cprofile mode only covers the thread that starts it and needs that thread's event loop to stop it; use sample mode")
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        
+        with self.lock:
+            if self.session:
+                raise RuntimeError(f"A {self.session[0]} profiling session is already running")
+            
+            if mode == "cprofile":
+                collector = cProfile.Profile()
+                collector.enable()
+            else:
+                collector = StackSampler()
+                collector.start()
+            self.session = (mode, collector, time.monotonic())
+        
+        if call_later:
+            self.stop_handle = call_later(seconds, self.stop)
+        else:
+            self.stop_handle = threading.Timer(seconds, self.stop)
+            self.stop_handle.daemon = True
+            self.stop_handle.start()
+        
+        logger.warning(f"Started {mode} profiling for {seconds:g}s")
+        return {"mode": mode, "seconds": seconds}
+
+    def stop(self):
+        with self.lock:
+            if not self.session:
+                return None
+            mode, collector, started = self.session
+            self.session = None
+            if self.stop_handle:
+                self.stop_handle.cancel()
+                self.stop_handle = None
+        
+        if mode == "cprofile":
+            collector.disable()
+            path = self._output_path("prof")
+            collector.dump_stats(path)
+        else:
+            collector.stop()
+            path = self._output_path("folded")
+            collector.dump(path)
+        
+        logger.warning(f"Stopped {mode} profiling after {time.monotonic() - started:.1f}s, wrote {path}")
+        return {"mode": mode, "path": path}
+
+    def toggle(self, call_later=None):
+        if self.session:
+            return self.stop()
+        return self.start(mode="cprofile" if call_later else "sample", call_later=call_later)
+
+    def memory_snapshot(self, limit=25):
+        gauges = {}
+        for name, callback in self.gauges.items():
+            try:
+                gauges[name] = callback()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            logger.warning("Started tracemalloc; take another snapshot to see allocations")
+            return {"tracing": "started", "gauges": gauges}
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+        path = self._output_path("tracemalloc")
+        snapshot.dump(path)
+        
+        if self.last_snapshot:
+            stats = snapshot.compare_to(self.last_snapshot, "lineno")
+        else:
+            stats = snapshot.statistics("lineno")
+        self.last_snapshot = snapshot
+        
+        current, peak = tracemalloc.get_traced_memory()
+        top = [str(stat) for stat in stats[:limit]]
+        logger.warning(f"Memory snapshot written to {path} (current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB)")
+        for line in top[:10]:
+            logger.warning(f"  {line}")
+        
+        return {
+            "path": path,
+            "current_mb": round(current / 1e6, 2),
+            "peak_mb": round(peak / 1e6, 2),
+            "top": top,
+            "gauges": gauges
+        }
+
+def install_signal_handlers(profiler, loop=None):
+    if not hasattr(signal, "SIGUSR1"):
+        return
+    
+    if loop:
+        loop.add_signal_handler(signal.SIGUSR1, profiler.toggle, loop.call_later)
+        loop.add_signal_handler(signal.SIGUSR2, profiler.memory_snapshot)
+    else:
+        signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.toggle())
+        signal.signal(signal.SIGUSR2, lambda signum, frame: profiler.memory_snapshot())
+    logger.info(f"Profiling signals installed: SIGUSR1 toggles CPU profiling, SIGUSR2 takes a memory snapshot (pid {os.getpid()})")
@@ -0,0 +1,159 @@
+import aiohttp
+import asyncio
+import json
+import logging
+import time
+from config import TRADIER_STREAM_URL
+
+logger = logging.getLogger(__name__)
+
+class QuoteStream:
+    def __init__(self, tradier_client, position_tracker, stream_url=None, reconnect_delay=5):
+        self.client = tradier_client
+        self.position_tracker = position_tracker
+        self.stream_url = stream_url or TRADIER_STREAM_URL
+        self.reconnect_delay = reconnect_delay
+        self.quotes = {}
+        self.subscribed_symbols = set()
+        self.listeners = []
+        self.running = False
+        self.task = None
+        self._resubscribe = None
+        position_tracker.add_listener(self._on_position_change)
+
+    def _held_symbols(self):
+        return {
+            pos["option_symbol"]
+            for pos in self.position_tracker.positions.values()
+            if pos["quantity"] > 0 and pos.get("option_symbol")
+        }
+
+    def _on_position_change(self, key, position):
+        if self._resubscribe is not None and self._held_symbols() != self.subscribed_symbols:
+            self._resubscribe.set()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def get_quote(self, symbol, max_age=None):
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            return None
+        if max_age is not None and (quote["updated_at"] is None or time.time() - quote["updated_at"] > max_age):
+            return None
+        return quote
+
+    def _handle_event(self, event):
+        symbol = event.get("symbol")
+        if symbol not in self.subscribed_symbols:
+            return
+        
+        quote = self.quotes.setdefault(symbol, {"symbol": symbol, "bid": None, "ask": None, "last": None, "updated_at": None})
+        event_type = event.get("type")
+        
+        if event_type == "quote":
+            quote["bid"] = float(event["bid"]) if event.get("bid") is not None else quote["bid"]
+            quote["ask"] = float(event["ask"]) if event.get("ask") is not None else quote["ask"]
+        elif event_type in ("trade", "timesale"):
+            last = event.get("last") or event.get("price")
+            if last is not None:
+                quote["last"] = float(last)
+        else:
+            return
+        
+        quote["updated_at"] = time.time()
+        
+        for callback in self.listeners:
+            try:
+                callback(symbol, quote)
+            except Exception as e:
+                logger.error("Error in quote listener: %s", e, exc_info=True)
+
+    async def _subscribe(self, ws, session_id, symbols):
+        payload = {
+            "symbols": sorted(symbols),
+            "sessionid": session_id,
+            "filter": ["quote", "trade"],
+            "linebreak": True
+        }
+        await ws.send_str(json.dumps(payload))
+        
+        for symbol in self.subscribed_symbols - symbols:
+            self.quotes.pop(symbol, None)
+        self.subscribed_symbols = set(symbols)
+        logger.info("Subscribed quote stream to %s held contracts", len(symbols))
+
+    async def _consume(self, ws, session_id):
+        receive = asyncio.ensure_future(ws.receive())
+        resubscribe = asyncio.ensure_future(self._resubscribe.wait())
+        
+        try:
+            while self.running:
+                done, _ = await asyncio.wait({receive, resubscribe}, return_when=asyncio.FIRST_COMPLETED)
+                
+                if resubscribe in done:
+                    self._resubscribe.clear()
+                    symbols = self._held_symbols()
+                    if not symbols:
+                        return
+                    if symbols != self.subscribed_symbols:
+                        await self._subscribe(ws, session_id, symbols)
+                    resubscribe = asyncio.ensure_future(self._resubscribe.wait())
+                
+                if receive in done:
+                    msg = receive.result()
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        for line in msg.data.splitlines():
+                            if line.strip():
+                                self._handle_event(json.loads(line))
+                    elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                        raise ConnectionError(f"Quote stream closed: {msg.type}")
+                    receive = asyncio.ensure_future(ws.receive())
+        finally:
+            receive.cancel()
+            resubscribe.cancel()
+
+    async def _run(self):
+        async with aiohttp.ClientSession() as session:
+            while self.running:
+                symbols = self._held_symbols()
+                if not symbols:
+                    self.subscribed_symbols = set()
+                    self.quotes.clear()
+                    self._resubscribe.clear()
+                    await self._resubscribe.wait()
+                    continue
+                
+                try:
+                    response = await asyncio.to_thread(self.client.create_streaming_session)
+                    session_id = response["stream"]["sessionid"]
+                    
+                    async with session.ws_connect(self.stream_url) as ws:
+                        logger.info("Quote stream connected to %s", self.stream_url)
+                        await self._subscribe(ws, session_id, symbols)
+                        await self._consume(ws, session_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Nothing updates the book while disconnected, so drop it
+                    # rather than let callers price off frozen quotes.
+                    self.quotes.clear()
+                    logger.error("Quote stream error, reconnecting in %ss: %s", self.reconnect_delay, e)
+                    await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self):
+        self.running = True
+        self._resubscribe = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+        logger.info("Quote stream started")
+
+    async def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        logger.info("Quote stream stopped")
@@ -0,0 +1,130 @@
+import fcntl
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from config import RATE_LIMIT_STATE_FILE
+
+logger = logging.getLogger(__name__)
+
+# Share of each bucket a lane must leave untouched, so lower lanes back off first.
+PRIORITY_LANES = {
+    "orders": 0.0,
+    "validation": 0.1,
+    "dashboard": 0.3,
+    "backfill": 0.5,
+}
+
+LANE_MAX_WAIT = {
+    "orders": 5.0,
+    "validation": 5.0,
+    "dashboard": 2.0,
+    "backfill": 60.0,
+}
+
+# Requests per minute for each Tradier rate limit group.
+DEFAULT_LIMITS = {
+    "market": 120,
+    "trading": 60,
+    "standard": 120,
+}
+
+def endpoint_group(method, endpoint):
+    if endpoint.startswith("/markets"):
+        return "market"
+    if method == "POST" and endpoint.endswith("/orders"):
+        return "trading"
+    return "standard"
+
+class RateLimiter:
+    def __init__(self, state_file=None, limits=None, window=60.0):
+        self.state_file = state_file or RATE_LIMIT_STATE_FILE
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.window = window
+
+    @contextmanager
+    def _locked_state(self):
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o666)
+        with os.fdopen(fd, "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _bucket(self, state, group, now):
+        bucket = state.get(group)
+        if bucket is None:
+            capacity = self.limits.get(group, DEFAULT_LIMITS["standard"])
+            bucket = {"capacity": capacity, "tokens": capacity, "updated": now, "blocked_until": 0}
+            state[group] = bucket
+        
+        if bucket["blocked_until"] and now >= bucket["blocked_until"]:
+            bucket["tokens"] = bucket["capacity"]
+            bucket["blocked_until"] = 0
+        
+        elapsed = max(0.0, now - bucket["updated"])
+        bucket["tokens"] = min(bucket["capacity"], bucket["tokens"] + elapsed * bucket["capacity"] / self.window)
+        bucket["updated"] = now
+        return bucket
+
+    def acquire(self, group, lane):
+        reserve_share = PRIORITY_LANES.get(lane, PRIORITY_LANES["backfill"])
+        deadline = time.time() + LANE_MAX_WAIT.get(lane, LANE_MAX_WAIT["backfill"])
+        
+        while True:
+            now = time.time()
+            try:
+                with self._locked_state() as state:
+                    bucket = self._bucket(state, group, now)
+                    reserve = bucket["capacity"] * reserve_share
+                    
+                    if now >= bucket["blocked_until"] and bucket["tokens"] - 1 >= reserve:
+                        bucket["tokens"] -= 1
+                        return True
+                    
+                    if bucket["blocked_until"]:
+                        wait = bucket["blocked_until"] - now
+                    else:
+                        wait = max((reserve + 1 - bucket["tokens"]) * self.window / bucket["capacity"], 0.01)
+            except OSError as e:
+                logger.warning(f"Rate limiter state unavailable, not throttling: {e}")
+                return True
+            
+            if now + wait > deadline:
+                logger.warning(f"Rate limiter could not grant a {group} request for lane {lane} within {LANE_MAX_WAIT.get(lane)}s, sending anyway")
+                return False
+            time.sleep(min(wait, 0.25))
+
+    def update_from_headers(self, group, headers, status_code=None):
+        available = headers.get("X-Ratelimit-Available")
+        allowed = headers.get("X-Ratelimit-Allowed")
+        expiry = headers.get("X-Ratelimit-Expiry")
+        
+        if available is None and status_code != 429:
+            return
+        
+        now = time.time()
+        try:
+            with self._locked_state() as state:
+                bucket = self._bucket(state, group, now)
+                if allowed is not None:
+                    bucket["capacity"] = float(allowed)
+                if available is not None:
+                    bucket["tokens"] = min(bucket["tokens"], float(available))
+                if status_code == 429 or (available is not None and float(available) <= 0):
+                    bucket["tokens"] = 0
+                    bucket["blocked_until"] = float(expiry) / 1000.0 if expiry else now + 1.0
+                    logger.warning(f"Tradier {group} rate limit exhausted, blocking until {bucket['blocked_until']:.0f}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not record rate limit headers: {e}")
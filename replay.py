@@ -0,0 +1,230 @@
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from discord_scraper import Message
+
+logger = logging.getLogger(__name__)
+
+def utc_naive(value):
+    # Replay runs on naive UTC; offset-aware times are converted, not truncated.
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def parse_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    return utc_naive(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+def load_messages(path):
+    messages = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                messages.append(Message(json.loads(line)))
+    messages.sort(key=lambda message: utc_naive(message.timestamp or datetime.min))
+    return messages
+
+def load_chain_snapshots(path):
+    if os.path.isdir(path):
+        from chain_recorder import ChainArchive
+        return list(ChainArchive(path).export())
+    
+    snapshots = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                snapshots.append(json.loads(line))
+    return snapshots
+
+class MemoryDB:
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+
+    def execute_sync(self, query, params=None):
+        cursor = self.conn.execute(query, params or ())
+        rows = cursor.fetchall()
+        self.conn.commit()
+
+        class Result:
+            pass
+        result = Result()
+        result.rows = rows
+        return result
+
+    def execute_batch(self, statements):
+        for query, params in statements:
+            self.conn.execute(query, params or ())
+        self.conn.commit()
+
+class SimulatedBroker:
+    def __init__(self, snapshots, start_time=None):
+        self.now = start_time or datetime.now()
+        self.chains = defaultdict(lambda: ([], []))
+        self.expirations = defaultdict(set)
+        self.symbol_index = {}
+        self.orders = []
+        self.holdings = {}
+        self.realized_pl = 0.0
+        self.unfilled = 0
+        
+        for snapshot in sorted(snapshots, key=lambda s: s["timestamp"]):
+            underlying = snapshot["symbol"].upper()
+            expiration = snapshot["expiration"]
+            timestamps, chains = self.chains[(underlying, expiration)]
+            timestamps.append(parse_timestamp(snapshot["timestamp"]))
+            chains.append({option["symbol"]: option for option in snapshot["options"]})
+            self.expirations[underlying].add(expiration)
+            for option in snapshot["options"]:
+                self.symbol_index[option["symbol"]] = (underlying, expiration)
+
+    def current_time(self):
+        return self.now
+
+    def _chain_at(self, underlying, expiration):
+        timestamps, chains = self.chains.get((underlying, expiration), ([], []))
+        i = bisect.bisect_right(timestamps, self.now)
+        if i == 0:
+            return None
+        return chains[i - 1]
+
+    def _option(self, option_symbol):
+        location = self.symbol_index.get(option_symbol)
+        if location is None:
+            return None
+        chain = self._chain_at(*location)
+        return chain.get(option_symbol) if chain else None
+
+    def warm_up(self):
+        return {}
+
+    def get_option_expirations(self, symbol, include_all_roots=True):
+        dates = sorted(self.expirations.get(symbol.upper(), ()))
+        return {"expirations": {"date": dates} if dates else None}
+
+    def get_option_chain(self, symbol, expiration, greeks=False):
+        chain = self._chain_at(symbol.upper(), expiration)
+        return {"options": {"option": list(chain.values())} if chain else None}
+
+    def get_option_strikes(self, symbol, expiration):
+        chain = self._chain_at(symbol.upper(), expiration) or {}
+        return {"strikes": {"strike": sorted({option["strike"] for option in chain.values()})}}
+
+    def get_quotes(self, symbols, greeks=False):
+        return [option for option in (self._option(symbol) for symbol in symbols) if option]
+
+    def get_positions(self):
+        positions = [
+            {"symbol": symbol, "quantity": quantity, "cost_basis": round(cost * quantity * 100, 2)}
+            for symbol, (quantity, cost) in self.holdings.items() if quantity > 0
+        ]
+        return {"positions": {"position": positions} if positions else "null"}
+
+    def get_orders(self):
+        return {"orders": {"order": self.orders} if self.orders else "null"}
+
+    def place_order(self, order_data):
+        option_symbol = order_data["option_symbol"]
+        quantity = int(order_data["quantity"])
+        option = self._option(option_symbol) or {}
+        bid = float(option.get("bid") or 0)
+        ask = float(option.get("ask") or 0)
+        order_id = len(self.orders) + 1
+        
+        if order_data["side"] == "buy_to_open":
+            fill_price = ask or float(option.get("last") or 0)
+        elif order_data["type"] == "limit":
+            limit = float(order_data["price"])
+            fill_price = limit if bid >= limit else None
+        else:
+            fill_price = bid
+        
+        order = {
+            "id": order_id,
+            "option_symbol": option_symbol,
+            "side": order_data["side"],
+            "quantity": quantity,
+            "tag": order_data.get("tag")
+        }
+        
+        if fill_price is None or not option:
+            self.unfilled += 1
+            order.update(status="open", exec_quantity=0)
+        else:
+            order.update(status="filled", exec_quantity=quantity, avg_fill_price=fill_price)
+            self._apply_fill(option_symbol, order_data["side"], quantity, fill_price)
+        
+        self.orders.append(order)
+        return {"order": {"id": order_id, "status": "ok"}}
+
+    def _apply_fill(self, option_symbol, side, quantity, price):
+        held, cost = self.holdings.get(option_symbol, (0, 0.0))
+        if side == "buy_to_open":
+            total = held + quantity
+            self.holdings[option_symbol] = (total, (cost * held + price * quantity) / total)
+        else:
+            sold = min(quantity, held)
+            self.realized_pl += (price - cost) * sold * 100
+            self.holdings[option_symbol] = (held - sold, cost)
+
+    def unrealized_pl(self):
+        total = 0.0
+        for option_symbol, (quantity, cost) in self.holdings.items():
+            option = self._option(option_symbol)
+            if quantity > 0 and option and option.get("bid") is not None:
+                total += (float(option["bid"]) - cost) * quantity * 100
+        return total
+
+class ReplayEngine:
+    def __init__(self, messages, snapshots):
+        from main import TradingBot
+        
+        self.messages = messages
+        self.broker = SimulatedBroker(snapshots)
+        self.bot = TradingBot(tradier_client=self.broker, db_client=MemoryDB(), live=False)
+        self.bot.option_resolver.clock = self.broker.current_time
+        self.bot._prepare_database()
+        self.outcomes = Counter()
+
+    async def run(self):
+        start = time.perf_counter()
+        
+        for message in self.messages:
+            if message.timestamp:
+                self.broker.now = utc_naive(message.timestamp)
+            outcome = await self.bot.process_message(message) or "unknown"
+            self.outcomes[outcome] += 1
+        
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        count = len(self.messages)
+        executed = self.bot.db_client.execute_sync("SELECT action, COUNT(*) FROM trades GROUP BY action").rows
+        return {
+            "messages": count,
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(count / elapsed) if elapsed > 0 else None,
+            "outcomes": dict(self.outcomes.most_common()),
+            "executed": dict(executed),
+            "orders": len(self.broker.orders),
+            "unfilled_limit_orders": self.broker.unfilled,
+            "realized_pl": round(self.broker.realized_pl, 2),
+            "unrealized_pl": round(self.broker.unrealized_pl(), 2),
+            "open_positions": {symbol: quantity for symbol, (quantity, _) in self.broker.holdings.items() if quantity > 0}
+        }
+
+def print_report(report):
+    print(f"messages:              {report['messages']} in {report['elapsed_seconds']}s ({report['messages_per_second']} msg/s)")
+    print("outcomes:")
+    for outcome, count in report["outcomes"].items():
+        print(f"  {outcome:<22} {count}")
+    print(f"executed:              {report['executed']}")
+    print(f"orders:                {report['orders']} ({report['unfilled_limit_orders']} limit orders not filled)")
+    print(f"realized P/L:          ${report['realized_pl']:,.2f}")
+    print(f"unrealized P/L:        ${report['unrealized_pl']:,.2f} across {len(report['open_positions'])} open positions")
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from config import RISK_STOP_LOSS_PCT, RISK_TAKE_PROFIT_PCT
+
+logger = logging.getLogger(__name__)
+
+class RiskEngine:
+    def __init__(self, position_tracker, order_executor, db_logger=None,
+                 stop_loss_pct=RISK_STOP_LOSS_PCT, take_profit_pct=RISK_TAKE_PROFIT_PCT, retry_cooldown=30, fill_tracker=None):
+        self.position_tracker = position_tracker
+        self.order_executor = order_executor
+        self.db_logger = db_logger
+        self.fill_tracker = fill_tracker
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.retry_cooldown = retry_cooldown
+        self.rules = {}
+        self.thresholds = {}
+        self.watched = {}
+        self.pending = {}
+        self.exits = set()
+        position_tracker.add_listener(self._on_position_change)
+        if fill_tracker:
+            fill_tracker.add_listener(self._on_order_finished)
+        self.rebuild()
+
+    def set_rule(self, ticker, strike, option_type, stop_price=None, target_price=None):
+        key = self.position_tracker._get_position_key(ticker, strike, option_type)
+        self.rules[key] = {"stop_price": stop_price, "target_price": target_price}
+        position = self.position_tracker.positions.get(key)
+        if position:
+            self._on_position_change(key, position)
+
+    def clear_rule(self, ticker, strike, option_type):
+        key = self.position_tracker._get_position_key(ticker, strike, option_type)
+        self.rules.pop(key, None)
+        position = self.position_tracker.positions.get(key)
+        if position:
+            self._on_position_change(key, position)
+
+    def _compute_thresholds(self, key, position):
+        avg_entry_price = position.get("avg_entry_price")
+        rule = self.rules.get(key, {})
+        
+        stop_price = rule.get("stop_price")
+        if stop_price is None and avg_entry_price and self.stop_loss_pct > 0:
+            stop_price = avg_entry_price * (1 - self.stop_loss_pct)
+        
+        target_price = rule.get("target_price")
+        if target_price is None and avg_entry_price and self.take_profit_pct > 0:
+            target_price = avg_entry_price * (1 + self.take_profit_pct)
+        
+        return stop_price, target_price
+
+    def rebuild(self):
+        self.thresholds = {}
+        self.watched = {}
+        for key, position in self.position_tracker.positions.items():
+            self._on_position_change(key, position)
+        logger.info("Risk engine watching %s positions", len(self.thresholds))
+
+    def _on_position_change(self, key, position):
+        watched_symbol = self.watched.pop(key, None)
+        if watched_symbol:
+            self.thresholds.pop(watched_symbol, None)
+        self.pending.pop(key, None)
+        
+        option_symbol = position.get("option_symbol")
+        if position["quantity"] <= 0 or not option_symbol:
+            return
+        
+        stop_price, target_price = self._compute_thresholds(key, position)
+        if stop_price is None and target_price is None:
+            return
+        
+        self.thresholds[option_symbol] = (key, stop_price, target_price)
+        self.watched[key] = option_symbol
+
+    def _on_order_finished(self, order_id, entry):
+        if entry["action"] != "SOLD" or entry["filled_quantity"] >= entry["quantity"]:
+            return
+        
+        # An exit that ends canceled or rejected leaves the position as it was,
+        # so nothing else would re-arm the rule; retry after the cooldown.
+        key = self.position_tracker._get_position_key(entry["ticker"], entry["strike"], entry["option_type"])
+        if key in self.pending:
+            logger.warning("Exit order %s for %s %s%s ended %s unfilled, re-arming in %ss", order_id, key[0], key[1], key[2], entry.get('status', 'untracked'), self.retry_cooldown)
+            self.pending[key] = time.monotonic() + self.retry_cooldown
+
+    def on_tick(self, symbol, quote):
+        entry = self.thresholds.get(symbol)
+        if entry is None:
+            return None
+        
+        key, stop_price, target_price = entry
+        if key in self.pending and time.monotonic() < self.pending[key]:
+            return None
+        
+        price = quote["bid"] if quote["bid"] is not None else quote["last"]
+        if price is None:
+            return None
+        
+        if stop_price is not None and price <= stop_price:
+            reason = "stop_loss"
+        elif target_price is not None and price >= target_price:
+            reason = "take_profit"
+        else:
+            return None
+        
+        self.pending[key] = float("inf")
+        self._submit_exit(key, symbol, price, reason)
+        return reason
+
+    def evaluate(self, quotes):
+        triggered = []
+        for symbol in list(self.thresholds):
+            quote = quotes.get(symbol)
+            if quote and self.on_tick(symbol, quote):
+                triggered.append(symbol)
+        return triggered
+
+    def _submit_exit(self, key, symbol, price, reason):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._exit_position(key, symbol, price, reason)
+            return
+        task = loop.create_task(self._exit_position_async(key, symbol, price, reason))
+        self.exits.add(task)
+        task.add_done_callback(self.exits.discard)
+
+    def _prepare_exit(self, key, price, reason):
+        ticker, strike, option_type = key
+        quantity = self.position_tracker.get_sellable_quantity(ticker, strike, option_type)
+        if quantity <= 0:
+            self.pending.pop(key, None)
+            return None
+        
+        logger.warning("Risk engine %s triggered for %s %s%s at $%.2f, selling %s contracts", reason, ticker, strike, option_type, price, quantity)
+        
+        return {
+            "action": "SOLD",
+            "ticker": ticker,
+            "strike": strike,
+            "option_type": option_type,
+            "contracts": quantity
+        }
+
+    def _exit_position(self, key, symbol, price, reason):
+        trade_data = self._prepare_exit(key, price, reason)
+        if trade_data:
+            self._record_exit(key, symbol, price, reason, trade_data, self.order_executor.execute_order(trade_data, symbol))
+
+    async def _exit_position_async(self, key, symbol, price, reason):
+        # The order (and any retries) runs in a worker thread so quote ticks,
+        # fill polling and signals keep flowing while Tradier answers.
+        async with self.order_executor.lock:
+            trade_data = self._prepare_exit(key, price, reason)
+            if trade_data:
+                order_result = await asyncio.to_thread(self.order_executor.execute_order, trade_data, symbol)
+                self._record_exit(key, symbol, price, reason, trade_data, order_result)
+
+    def _record_exit(self, key, symbol, price, reason, trade_data, order_result):
+        ticker, strike, option_type = key
+        if order_result.get("success"):
+            actual_quantity = order_result.get("actual_quantity", trade_data["contracts"])
+            trade_data_for_log = dict(trade_data, contracts=actual_quantity, price=price)
+            if self.db_logger:
+                self.db_logger.log_trade(f"risk-{reason}", trade_data_for_log, symbol, order_result)
+            order_id = order_result.get("order_id")
+            if self.fill_tracker and order_id not in (None, "unknown"):
+                self.fill_tracker.track(order_id, ticker, strike, option_type, "SOLD", actual_quantity, symbol)
+            else:
+                self.position_tracker.update_position(ticker, strike, option_type, "SOLD", actual_quantity, price, symbol)
+        else:
+            logger.error("Risk engine exit order failed for %s %s%s: %s", ticker, strike, option_type, order_result.get('error', 'Unknown error'))
+            self.pending[key] = time.monotonic() + self.retry_cooldown
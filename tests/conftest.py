@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("TRADING_MODE", "live")
+os.environ.setdefault("TRADIER_LIVE_API_KEY", "test")
+os.environ.setdefault("TRADIER_LIVE_ACCOUNT_ID", "VA00000000")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+from db_client import DBClient
+from db_logger import DBLogger
+from position_tracker import PositionTracker
+
+@pytest.fixture
+def db_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("TURSO_DATABASE_URL", str(tmp_path / "bot.db"))
+    monkeypatch.setenv("TURSO_AUTH_TOKEN", "test")
+    client = DBClient()
+    yield client
+    client.close()
+
+@pytest.fixture
+def db_logger(db_client):
+    return DBLogger(db_client)
+
+@pytest.fixture
+def position_tracker(db_client, db_logger):
+    return PositionTracker(db_client)
@@ -0,0 +1,62 @@
+import pytest
+
+from fill_tracker import FillTracker
+from position_tracker import PositionTracker
+
+SYMBOL = "SPY260116C00500000"
+
+def log_order(db_logger, order_id, action, contracts):
+    trade_data = {"action": action, "ticker": "SPY", "strike": 500.0, "option_type": "C", "contracts": contracts, "price": 1.0}
+    db_logger.log_trade(f"msg-{order_id}", trade_data, SYMBOL, {"order_id": order_id, "status": "ok"})
+
+def trade_row(db_client, order_id):
+    return db_client.execute_sync("SELECT status, contracts, price FROM trades WHERE order_id = ?", (str(order_id),)).rows[0]
+
+@pytest.fixture
+def fill_tracker(position_tracker, db_client):
+    return FillTracker(None, position_tracker, db_client)
+
+def test_partial_fills_update_position_incrementally(fill_tracker, position_tracker, db_logger, db_client):
+    log_order(db_logger, 1, "BOUGHT", 5)
+    fill_tracker.track(1, "SPY", 500.0, "C", "BOUGHT", 5, SYMBOL)
+
+    fill_tracker.apply_orders([{"id": 1, "status": "partially_filled", "exec_quantity": 2, "avg_fill_price": 1.0}])
+    assert position_tracker.get_position("SPY", 500.0, "C") == 2
+    assert position_tracker.get_avg_entry_price("SPY", 500.0, "C") == pytest.approx(1.0)
+
+    fill_tracker.apply_orders([{"id": 1, "status": "filled", "exec_quantity": 5, "avg_fill_price": 1.3}])
+    assert position_tracker.get_position("SPY", 500.0, "C") == 5
+    assert position_tracker.get_avg_entry_price("SPY", 500.0, "C") == pytest.approx(1.3)
+    assert fill_tracker.pending == {}
+
+    status, contracts, price = trade_row(db_client, 1)
+    assert (status, contracts) == ("filled", 5)
+    assert price == pytest.approx(1.3)
+    assert PositionTracker(db_client).get_position("SPY", 500.0, "C") == 5
+
+def test_sell_reserves_until_filled_and_releases_the_rest_on_cancel(fill_tracker, position_tracker, db_logger, db_client):
+    position_tracker.update_position("SPY", 500.0, "C", "BOUGHT", 4, 1.0, SYMBOL)
+    log_order(db_logger, 2, "SOLD", 4)
+    fill_tracker.track(2, "SPY", 500.0, "C", "SOLD", 4, SYMBOL)
+    assert position_tracker.get_sellable_quantity("SPY", 500.0, "C") == 0
+
+    fill_tracker.apply_orders([{"id": 2, "status": "partially_filled", "exec_quantity": 1, "avg_fill_price": 2.0}])
+    assert position_tracker.get_position("SPY", 500.0, "C") == 3
+    assert position_tracker.get_sellable_quantity("SPY", 500.0, "C") == 0
+
+    fill_tracker.apply_orders([{"id": 2, "status": "canceled", "exec_quantity": 1, "avg_fill_price": 2.0}])
+    assert position_tracker.get_position("SPY", 500.0, "C") == 3
+    assert position_tracker.get_sellable_quantity("SPY", 500.0, "C") == 3
+    assert position_tracker.reserved == {}
+    assert trade_row(db_client, 2)[:2] == ("canceled", 1)
+
+def test_finished_orders_notify_listeners(fill_tracker, position_tracker):
+    finished = []
+    fill_tracker.add_listener(lambda order_id, entry: finished.append((order_id, entry["filled_quantity"])))
+    position_tracker.update_position("SPY", 500.0, "C", "BOUGHT", 2, 1.0, SYMBOL)
+    fill_tracker.track(3, "SPY", 500.0, "C", "SOLD", 2, SYMBOL)
+
+    fill_tracker.apply_orders([{"id": 3, "status": "rejected", "exec_quantity": 0}])
+
+    assert finished == [("3", 0)]
+    assert position_tracker.get_sellable_quantity("SPY", 500.0, "C") == 2
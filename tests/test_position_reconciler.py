@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+
+from fill_tracker import FillTracker
+from position_reconciler import PositionReconciler, parse_option_symbol
+from position_tracker import PositionTracker
+
+SYMBOL = "SPY260116C00500000"
+
+class StubBroker:
+    def __init__(self, positions):
+        self.positions = positions
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_positions(self):
+        self.fetching.set()
+        self.release.wait(5)
+        return {"positions": {"position": self.positions} if self.positions else "null"}
+
+@pytest.fixture
+def fill_tracker(position_tracker, db_client):
+    return FillTracker(None, position_tracker, db_client)
+
+def test_parse_option_symbol():
+    assert parse_option_symbol(SYMBOL) == ("SPY", 500.0, "C")
+    assert parse_option_symbol("SPXW260116P05900000") == ("SPXW", 5900.0, "P")
+    assert parse_option_symbol("SPY") is None
+
+def test_reconcile_adopts_broker_quantities(position_tracker, fill_tracker, db_client):
+    position_tracker.update_position("SPY", 500.0, "C", "BOUGHT", 3, 1.0, SYMBOL)
+    position_tracker.update_position("QQQ", 400.0, "P", "BOUGHT", 1, 1.0, "QQQ260116P00400000")
+    broker = StubBroker([{"symbol": SYMBOL, "quantity": 2, "cost_basis": 220.0}])
+    reconciler = PositionReconciler(broker, position_tracker, fill_tracker)
+
+    changes = asyncio.run(reconciler.reconcile())
+
+    assert len(changes) == 2
+    assert position_tracker.get_position("SPY", 500.0, "C") == 2
+    assert position_tracker.get_avg_entry_price("SPY", 500.0, "C") == pytest.approx(1.1)
+    assert position_tracker.get_position("QQQ", 400.0, "P") == 0
+    reloaded = PositionTracker(db_client)
+    assert reloaded.get_position("SPY", 500.0, "C") == 2
+    assert reloaded.get_position("QQQ", 400.0, "P") == 0
+
+def test_reconcile_skips_positions_filled_during_the_fetch(position_tracker, fill_tracker, db_client):
+    position_tracker.update_position("SPY", 500.0, "C", "BOUGHT", 2, 1.0, SYMBOL)
+    fill_tracker.track(1, "SPY", 500.0, "C", "BOUGHT", 3, SYMBOL)
+    # The broker's answer predates the fill that lands while it is in flight.
+    broker = StubBroker([{"symbol": SYMBOL, "quantity": 2, "cost_basis": 200.0}])
+    broker.release.clear()
+    reconciler = PositionReconciler(broker, position_tracker, fill_tracker)
+
+    async def reconcile_while_filling():
+        task = asyncio.create_task(reconciler.reconcile())
+        await asyncio.to_thread(broker.fetching.wait, 5)
+        fill_tracker.apply_orders([{"id": 1, "status": "filled", "exec_quantity": 3, "avg_fill_price": 1.0}])
+        broker.release.set()
+        return await task
+
+    assert asyncio.run(reconcile_while_filling()) == []
+    assert position_tracker.get_position("SPY", 500.0, "C") == 5
+    assert PositionTracker(db_client).get_position("SPY", 500.0, "C") == 5
+
+def test_reconcile_skips_positions_with_open_orders(position_tracker, fill_tracker):
+    position_tracker.update_position("SPY", 500.0, "C", "BOUGHT", 2, 1.0, SYMBOL)
+    fill_tracker.track(1, "SPY", 500.0, "C", "SOLD", 2, SYMBOL)
+    reconciler = PositionReconciler(StubBroker([]), position_tracker, fill_tracker)
+
+    assert asyncio.run(reconciler.reconcile()) == []
+    assert position_tracker.get_position("SPY", 500.0, "C") == 2
+
+def test_weekly_index_root_matches_the_ticker_position(position_tracker, fill_tracker):
+    position_tracker.update_position("SPX", 5900.0, "P", "BOUGHT", 1, 10.0)
+    broker = StubBroker([{"symbol": "SPXW260116P05900000", "quantity": 1, "cost_basis": 1000.0}])
+    reconciler = PositionReconciler(broker, position_tracker, fill_tracker)
+
+    assert asyncio.run(reconciler.reconcile()) == []
+    assert set(position_tracker.positions) == {("SPX", 5900.0, "P")}
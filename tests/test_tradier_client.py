@@ -0,0 +1,145 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+
+from tradier_client import TradierClient
+
+ACCOUNT_ID = "VA00000000"
+ORDER = {
+    "class": "option",
+    "symbol": "SPY",
+    "option_symbol": "SPY260116C00500000",
+    "side": "buy_to_open",
+    "quantity": "1",
+    "type": "market",
+    "duration": "day"
+}
+
+class StubBroker(ThreadingHTTPServer):
+    # Just enough of Tradier's order endpoints to script how a POST fails.
+    daemon_threads = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), StubBrokerHandler)
+        self.behaviours = []
+        self.posts = []
+        self.orders = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class StubBrokerHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        orders = self.server.orders
+        self._reply(200, {"orders": {"order": orders} if orders else "null"})
+
+    def do_POST(self):
+        data = {key: values[0] for key, values in parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode()).items()}
+        self.server.posts.append(data)
+        behaviour = self.server.behaviours.pop(0) if self.server.behaviours else "ok"
+
+        if behaviour == "error":
+            self._reply(503, {"error": "Service unavailable"})
+            return
+
+        order = {"id": len(self.server.orders) + 1, "status": "pending", "tag": data.get("tag")}
+        self.server.orders.append(order)
+        if behaviour == "slow":
+            # Accepted, but the response never arrives before the client gives up.
+            time.sleep(1.0)
+        self._reply(200, {"order": {"id": order["id"], "status": "ok"}})
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def make_client(base_url):
+    client = TradierClient()
+    client.base_url = base_url
+    client.account_id = ACCOUNT_ID
+    client.timeout = (0.5, 0.3)
+    client.retry_backoff = 0.05
+    return client
+
+@pytest.fixture
+def broker():
+    server = StubBroker()
+    yield server
+    server.stop()
+
+def test_order_that_never_connected_is_resent():
+    port = free_port()
+    servers = []
+    # Nothing listens on the port for the first attempt, so the connection is
+    # refused; the broker comes up before the retry.
+    client = make_client(f"http://127.0.0.1:{port}/v1")
+    client.retry_backoff = 0.4
+    timer = threading.Timer(0.15, lambda: servers.append(StubBroker(port)))
+    timer.start()
+    start = time.monotonic()
+    try:
+        response = client.place_order(ORDER)
+    finally:
+        timer.join()
+        for server in servers:
+            server.stop()
+
+    assert time.monotonic() - start >= client.retry_backoff
+    assert response["order"]["id"] == 1
+    assert len(servers[0].posts) == 1
+
+def test_order_that_timed_out_is_found_by_tag_not_resent(broker):
+    broker.behaviours = ["slow"]
+    client = make_client(broker.base_url)
+
+    response = client.place_order(ORDER)
+
+    assert response["order"]["id"] == 1
+    assert len(broker.posts) == 1
+    assert broker.orders[0]["tag"] == broker.posts[0]["tag"]
+
+def test_order_that_may_have_been_sent_is_never_resent(broker):
+    broker.behaviours = ["error", "ok"]
+    client = make_client(broker.base_url)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.place_order(ORDER)
+
+    assert len(broker.posts) == 1
+    assert broker.orders == []
+
+def test_never_sent_only_for_connection_failures(broker):
+    client = make_client(f"http://127.0.0.1:{free_port()}/v1")
+    with pytest.raises(requests.exceptions.ConnectionError) as refused:
+        requests.get(f"{client.base_url}/markets/clock", timeout=client.timeout)
+    assert client._never_sent(refused.value)
+
+    broker.behaviours = ["slow"]
+    with pytest.raises(requests.exceptions.ReadTimeout) as timed_out:
+        requests.post(f"{broker.base_url}/accounts/{ACCOUNT_ID}/orders", data=ORDER, timeout=client.timeout)
+    assert not client._never_sent(timed_out.value)
@@ -1,12 +1,38 @@
 import requests
 import logging
+import urllib3
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from config import get_tradier_api_key, get_tradier_base_url, get_tradier_account_id
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from latency_tracker import LatencyTracker
+from config import get_tradier_api_key, get_tradier_base_url, get_tradier_account_id, RATE_LIMIT_ENABLED
+from rate_limiter import RateLimiter, endpoint_group
 
 logger = logging.getLogger(__name__)
 
+def response_items(response, collection, item):
+    # Tradier sends the string "null" for an empty collection and a bare
+    # object instead of a list when there is exactly one item.
+    container = response.get(collection) if isinstance(response, dict) else None
+    items = container.get(item) if isinstance(container, dict) else None
+    if isinstance(items, dict):
+        return [items]
+    return items if isinstance(items, list) else []
+
 class TradierClient:
-    def __init__(self):
+    quotes_chunk_size = 100
+    timeout = (3.05, 10)
+    max_retries = 2
+    retry_backoff = 0.5
+    hedge_min_samples = 20
+    hedge_min_delay = 0.25
+    throttled_wait = 0.01
+    hedge_max_workers = 8
+    pool_size = 20
+
+    def __init__(self, priority="validation", rate_limiter=None):
         self.api_key = get_tradier_api_key()
         self.base_url = get_tradier_base_url()
         self.account_id = get_tradier_account_id()
@@ -14,26 +40,162 @@ class TradierClient:
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json"
         }
-        logger.info(f"Initialized Tradier client - Mode: {self.base_url}, Account: {self.account_id}")
+        self.priority = priority
+        self.rate_limiter = rate_limiter or (RateLimiter() if RATE_LIMIT_ENABLED else None)
+        self.circuit_breakers = {}
+        self.latency = LatencyTracker()
+        self.hedge_executor = None
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size))
+        logger.info("Initialized Tradier client - Mode: %s, Account: %s", self.base_url, self.account_id)
 
-    def _make_request(self, method, endpoint, params=None, data=None):
+    def _circuit_breaker(self, group):
+        if group not in self.circuit_breakers:
+            self.circuit_breakers[group] = CircuitBreaker(group)
+        return self.circuit_breakers[group]
+
+    def _is_transient(self, error):
+        if isinstance(error, CircuitOpenError):
+            return False
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        response = getattr(error, "response", None)
+        return response is not None and response.status_code >= 500
+
+    def _acquire(self, group):
+        # Returns True when the limiter had to hold the request back.
+        if not self.rate_limiter:
+            return False
+        start = time.monotonic()
+        self.rate_limiter.acquire(group, "orders" if group == "trading" else self.priority)
+        return time.monotonic() - start >= self.throttled_wait
+
+    def _send(self, method, endpoint, group, params=None, data=None, acquire=True):
+        if acquire:
+            self._acquire(group)
+        
         url = f"{self.base_url}{endpoint}"
-        try:
-            if method == "GET":
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            elif method == "POST":
-                response = requests.post(url, headers=self.headers, data=data, timeout=10)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        start = time.monotonic()
+        if method == "GET":
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        else:
+            response = self.session.post(url, data=data, timeout=self.timeout)
+        self.latency.record(f"{method} {endpoint}", time.monotonic() - start)
+        
+        if self.rate_limiter:
+            self.rate_limiter.update_from_headers(group, response.headers, response.status_code)
+        
+        response.raise_for_status()
+        return response
+
+    def _hedged_send(self, method, endpoint, group, params=None, data=None):
+        hedge_delay = self.latency.percentile(f"{method} {endpoint}", 0.95, self.hedge_min_samples)
+        if hedge_delay is None:
+            return self._send(method, endpoint, group, params, data)
+        
+        if self.hedge_executor is None:
+            self.hedge_executor = ThreadPoolExecutor(max_workers=self.hedge_max_workers, thread_name_prefix="tradier-hedge")
+        
+        # The hedge duplicates the primary request, so it rides on the primary's
+        # token; when the limiter is already holding requests back, don't hedge.
+        throttled = self._acquire(group)
+        primary = self.hedge_executor.submit(self._send, method, endpoint, group, params, data, False)
+        done, _ = wait([primary], timeout=max(hedge_delay, self.hedge_min_delay))
+        if done or throttled:
+            return primary.result()
+        
+        logger.info("Hedging %s %s after %.0fms (p95)", method, endpoint, hedge_delay * 1000)
+        pending = {primary, self.hedge_executor.submit(self._send, method, endpoint, group, params, data, False)}
+        error = None
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        
+        raise error
+
+    def _find_order_by_tag(self, tag):
+        response = self.get_orders()
+        for order in response_items(response, "orders", "order"):
+            if order.get("tag") == tag:
+                return order
+        return None
+
+    def _never_sent(self, error):
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            return isinstance(getattr(error.args[0], "reason", None), urllib3.exceptions.NewConnectionError)
+        return False
+
+    def _await_tagged_order(self, tag, error):
+        # The POST may have reached Tradier and still be in flight, so an
+        # immediate lookup can miss it. Poll over the backoff schedule, and
+        # never resend: a second POST could place a duplicate live order.
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self.retry_backoff * (2 ** attempt))
+            try:
+                existing = self._find_order_by_tag(tag)
+            except requests.exceptions.RequestException as lookup_error:
+                logger.warning("Could not look up order %s: %s", tag, lookup_error)
+                continue
             
-            response.raise_for_status()
-            return response.json()
+            if existing:
+                logger.info("Order %s was accepted despite the failed response (ID: %s)", tag, existing.get('id'))
+                return {"order": {"id": existing.get("id"), "status": existing.get("status")}}
+        
+        logger.error("Order %s may have reached Tradier but is not listed; not resending to avoid a duplicate order", tag)
+        raise error
+
+    def _send_with_retry(self, method, endpoint, group, params=None, data=None):
+        tag = (data or {}).get("tag") if group == "trading" else None
+        attempts = 1 if group == "trading" and not tag else self.max_retries + 1
+        
+        for attempt in range(attempts):
+            try:
+                if group == "trading":
+                    return self._send(method, endpoint, group, params, data).json()
+                return self._hedged_send(method, endpoint, group, params, data).json()
+            except requests.exceptions.RequestException as e:
+                if tag and self._is_transient(e) and not self._never_sent(e):
+                    return self._await_tagged_order(tag, e)
+                if attempt == attempts - 1 or not self._is_transient(e):
+                    raise
+                
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning("Retrying %s %s in %.1fs after transient failure: %s", method, endpoint, delay, e)
+                time.sleep(delay)
+
+    def _make_request(self, method, endpoint, params=None, data=None):
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        group = endpoint_group(method, endpoint)
+        circuit_breaker = self._circuit_breaker(group)
+        
+        try:
+            circuit_breaker.check()
+            result = self._send_with_retry(method, endpoint, group, params, data)
+            circuit_breaker.record_success()
+            return result
         except requests.exceptions.RequestException as e:
-            logger.error(f"Tradier API request failed: {e}")
+            if self._is_transient(e):
+                circuit_breaker.record_failure()
+            elif not isinstance(e, CircuitOpenError):
+                circuit_breaker.record_success()
+            
+            logger.error("Tradier API request failed: %s", e)
             if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"Response: {e.response.text}")
+                logger.error("Response: %s", e.response.text)
             raise
 
+    def warm_up(self):
+        return self._make_request("GET", "/markets/clock")
+
     def get_account_info(self):
         endpoint = f"/accounts/{self.account_id}"
         return self._make_request("GET", endpoint)
@@ -63,7 +225,59 @@ class TradierClient:
         }
         return self._make_request("GET", endpoint, params=params)
 
+    def get_timesales(self, symbol, start, end, interval="1min", session_filter="all"):
+        endpoint = "/markets/timesales"
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "start": start,
+            "end": end,
+            "session_filter": session_filter
+        }
+        return self._make_request("GET", endpoint, params=params)
+
+    def get_history(self, symbol, start, end, interval="daily"):
+        endpoint = "/markets/history"
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "start": start,
+            "end": end
+        }
+        return self._make_request("GET", endpoint, params=params)
+
+    def get_quotes(self, symbols, greeks=False):
+        endpoint = "/markets/quotes"
+        symbols = list(dict.fromkeys(symbols))
+        quotes = []
+        
+        for i in range(0, len(symbols), self.quotes_chunk_size):
+            chunk = symbols[i:i + self.quotes_chunk_size]
+            data = {
+                "symbols": ",".join(chunk),
+                "greeks": str(greeks).lower()
+            }
+            response = self._make_request("POST", endpoint, data=data)
+            
+            quotes.extend(response_items(response, "quotes", "quote"))
+        
+        return quotes
+
+    def create_streaming_session(self):
+        endpoint = "/markets/events/session"
+        return self._make_request("POST", endpoint)
+
+    def get_positions(self):
+        endpoint = f"/accounts/{self.account_id}/positions"
+        return self._make_request("GET", endpoint)
+
+    def get_orders(self):
+        endpoint = f"/accounts/{self.account_id}/orders"
+        return self._make_request("GET", endpoint)
+
     def place_order(self, order_data):
         endpoint = f"/accounts/{self.account_id}/orders"
+        order_data = dict(order_data)
+        order_data.setdefault("tag", f"bot-{uuid.uuid4().hex[:20]}")
         return self._make_request("POST", endpoint, data=order_data)
 